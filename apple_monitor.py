@@ -5,11 +5,38 @@ No hardcoded products or stores - everything discovered dynamically
 """
 
 import json
+import os
+import queue
+import stat
+import sys
+import tempfile
+import threading
 import time
 from datetime import datetime
-from typing import Dict, List
-from dynamic_apple_monitor import DynamicAppleMonitor
-from restock_analyzer import RestockAnalyzer
+from functools import cached_property
+from typing import (
+    TYPE_CHECKING,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    TextIO,
+    Tuple,
+)
+from metrics import METRICS
+from scheduler import OVERRUN_COMPRESS, OVERRUN_SKIP, CycleScheduler
+from snapshot_store import SnapshotStore
+
+if TYPE_CHECKING:
+    from stock_events import StockEvent
+
+CONFIG_POLL_SECONDS = 5  # how often a running monitor looks for config edits
+REQUEST_TIMEOUT = 30  # seconds, further capped by the cycle deadline
+CHECK_DEADLINE_SECONDS = 120  # default deadline of a one-shot check
+WATCH_MAX_PENDING = 1000  # change events buffered for a slow watch() consumer
+WATCH_STOP_POLL_SECONDS = 0.5  # how often a blocked publisher checks for stop
 
 
 class AppleStockMonitor:
@@ -17,13 +44,41 @@ class AppleStockMonitor:
 
     def __init__(self, config_file: str = "config.json"):
         self.config_file = config_file
-        self.monitor = DynamicAppleMonitor()
-        self.analyzer = RestockAnalyzer()
+        # Set to a stream to emit one JSON line per pair result and cycle
+        self.jsonl_out: Optional[TextIO] = None
+        # Called with (product, store, result) for every pair as it is checked
+        self.result_listener: Optional[Callable[[Dict, Dict, Dict], None]] = None
+        # Receives the check cycle's progress messages; watch() logs them instead
+        self.progress: Callable[[str], None] = print
+        self._config_mtime = None
         self.config = self._load_or_create_config()
+        self._last_results: Optional[Dict] = None
+
+    @property
+    def snapshots(self) -> SnapshotStore:
+        """Store of the last completed check, at the configured snapshot_file."""
+        return SnapshotStore(self.config.get("snapshot_file", "last_snapshot.json.gz"))
+
+    # The API client and analyzer pull in requests and open their databases,
+    # so they are built on first use; status and add-* commands never need them
+    @cached_property
+    def monitor(self):
+        """Dynamic API monitor, created on first use."""
+        from dynamic_apple_monitor import DynamicAppleMonitor
+
+        return DynamicAppleMonitor()
+
+    @cached_property
+    def analyzer(self):
+        """Restock pattern analyzer, created on first use."""
+        from restock_analyzer import RestockAnalyzer
+
+        return RestockAnalyzer()
 
     def _load_or_create_config(self) -> Dict:
         """Load configuration or create default."""
         try:
+            self._config_mtime = self._stat_config()
             with open(self.config_file, "r") as f:
                 return json.load(f)
         except FileNotFoundError:
@@ -38,12 +93,148 @@ class AppleStockMonitor:
             return default_config
 
     def _save_config(self, config: Dict = None):
-        """Save configuration."""
+        """Atomically save configuration."""
         if config is None:
             config = self.config
 
-        with open(self.config_file, "w") as f:
-            json.dump(config, f, indent=2)
+        # Replace the file in one rename so a crash never truncates the config
+        directory = os.path.dirname(os.path.abspath(self.config_file))
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(config, f, indent=2)
+            # mkstemp creates 0600; keep the mode the config file already had
+            try:
+                mode = stat.S_IMODE(os.stat(self.config_file).st_mode)
+            except FileNotFoundError:
+                mode = 0o644
+            os.chmod(temp_path, mode)
+            os.replace(temp_path, self.config_file)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+        # Our own writes are not edits to reload
+        self._config_mtime = self._stat_config()
+
+    def _stat_config(self) -> Optional[int]:
+        """Return the config file's modification time, or None if it is missing."""
+        try:
+            return os.stat(self.config_file).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def reload_config_if_changed(self) -> bool:
+        """Apply edits made to the config file since it was last read or written.
+
+        Returns True if the config changed. A file caught mid-edit that is
+        not valid JSON, or fails validation, is ignored until it is written
+        again.
+        """
+        mtime = self._stat_config()
+        if mtime is None or mtime == self._config_mtime:
+            return False
+
+        self._config_mtime = mtime
+        try:
+            with open(self.config_file, "r") as f:
+                config = json.load(f)
+        except (OSError, ValueError) as e:
+            self.progress(f"⚠️  Ignoring unreadable {self.config_file}: {e}")
+            return False
+
+        # A bad edit must not take down the running monitor
+        problems = self._validate_config(config)
+        if problems:
+            self.progress(
+                f"⚠️  Ignoring invalid {self.config_file}, keeping the previous "
+                f"config: {'; '.join(problems)}"
+            )
+            return False
+
+        changes = self._diff_config(self.config, config)
+        self.config = config
+        if changes:
+            self.progress(f"🔄 Reloaded {self.config_file}: {', '.join(changes)}")
+        return bool(changes)
+
+    @staticmethod
+    def _validate_config(config) -> List[str]:
+        """Return what is wrong with a config, or an empty list if it is usable."""
+        if not isinstance(config, dict):
+            return ["not a JSON object"]
+
+        problems = []
+        for key, fields in (
+            ("products_to_monitor", ("product_code", "product_name")),
+            ("stores_to_monitor", ("store_code", "store_name")),
+        ):
+            entries = config.get(key)
+            if not isinstance(entries, list):
+                problems.append(f"{key} must be a list")
+                continue
+            for i, entry in enumerate(entries):
+                missing = [
+                    field
+                    for field in fields
+                    if not isinstance(entry, dict) or not entry.get(field)
+                ]
+                if missing:
+                    problems.append(f"{key}[{i}] needs {', '.join(missing)}")
+
+        # (key, accepted types, smallest allowed value or None for > 0); all optional
+        for key, types, minimum in (
+            ("check_interval_minutes", (int, float), None),
+            ("check_jitter_seconds", (int, float), 0),
+            ("cycle_deadline_seconds", (int, float), None),
+            ("requests_per_second", (int, float), None),
+            ("workers", int, 1),
+        ):
+            if key not in config:
+                continue
+            value = config[key]
+            if (
+                not isinstance(value, types)
+                or isinstance(value, bool)
+                or (value <= 0 if minimum is None else value < minimum)
+            ):
+                kind = "an integer" if types is int else "a number"
+                bound = "> 0" if minimum is None else f">= {minimum}"
+                problems.append(f"{key} must be {kind} {bound}, not {value!r}")
+
+        for key in ("metrics_file", "snapshot_file"):
+            if not isinstance(config.get(key, ""), str):
+                problems.append(f"{key} must be a path, not {config[key]!r}")
+
+        if config.get("overrun_policy", OVERRUN_SKIP) not in (
+            OVERRUN_SKIP,
+            OVERRUN_COMPRESS,
+        ):
+            problems.append(f"unknown overrun_policy {config['overrun_policy']!r}")
+
+        return problems
+
+    @staticmethod
+    def _diff_config(old: Dict, new: Dict) -> List[str]:
+        """Describe what changed between two configs, watchlist first."""
+        changes = []
+        for key, code, label in (
+            ("products_to_monitor", "product_code", "products"),
+            ("stores_to_monitor", "store_code", "stores"),
+        ):
+            old_codes = {entry[code] for entry in old.get(key, [])}
+            new_codes = {entry[code] for entry in new.get(key, [])}
+            if new_codes - old_codes:
+                changes.append(f"+{len(new_codes - old_codes)} {label}")
+            if old_codes - new_codes:
+                changes.append(f"-{len(old_codes - new_codes)} {label}")
+
+        watchlist_keys = ("products_to_monitor", "stores_to_monitor")
+        for key in sorted(set(old) | set(new)):
+            if key not in watchlist_keys and old.get(key) != new.get(key):
+                changes.append(f"{key} {old.get(key)} → {new.get(key)}")
+
+        return changes
 
     def discover_products(self, search_term: str = None) -> List[Dict]:
         """Discover Apple products dynamically."""
@@ -71,17 +262,18 @@ class AppleStockMonitor:
 
         return stores
 
+    def crawl_stores(self, seeds: List[str] = None) -> Dict:
+        """Crawl seed locations to fill the nationwide store catalog."""
+        from store_crawler import StoreCatalogCrawler
+
+        crawler = StoreCatalogCrawler(self.monitor, seeds=seeds)
+        return crawler.crawl()
+
     def add_product(self, product_code: str, product_name: str):
         """Add a product to monitoring."""
-        product = {
-            "product_code": product_code,
-            "product_name": product_name,
-            "category": self._detect_category(product_name),
-        }
+        product = {"product_code": product_code, "product_name": product_name}
 
-        if product not in self.config["products_to_monitor"]:
-            self.config["products_to_monitor"].append(product)
-            self._save_config()
+        if self.import_watchlist([product], [])[0]:
             print(f"✅ Added product: {product_name}")
         else:
             print(f"⚠️  Product already being monitored: {product_name}")
@@ -97,13 +289,85 @@ class AppleStockMonitor:
             "state": state,
         }
 
-        if store not in self.config["stores_to_monitor"]:
-            self.config["stores_to_monitor"].append(store)
-            self._save_config()
+        if self.import_watchlist([], [store])[1]:
             print(f"✅ Added store: {store_name}")
         else:
             print(f"⚠️  Store already being monitored: {store_name}")
 
+    def import_watchlist(
+        self, products: List[Dict], stores: List[Dict]
+    ) -> Tuple[int, int]:
+        """Add products and stores not yet monitored; returns how many of each.
+
+        Entries are deduped by code, against the watchlist and each other,
+        and the config is written once at the end.
+        """
+        product_index = {
+            product["product_code"]: product
+            for product in self.config["products_to_monitor"]
+        }
+        store_index = {
+            store["store_code"]: store for store in self.config["stores_to_monitor"]
+        }
+        added_products = 0
+        added_stores = 0
+
+        for product in products:
+            code = product["product_code"]
+            if code in product_index:
+                continue
+
+            name = product.get("product_name") or code
+            product_index[code] = {
+                "product_code": code,
+                "product_name": name,
+                "category": product.get("category") or self._detect_category(name),
+            }
+            self.config["products_to_monitor"].append(product_index[code])
+            added_products += 1
+
+        for store in stores:
+            code = store["store_code"]
+            if code in store_index:
+                continue
+
+            store_index[code] = {
+                "store_code": code,
+                "store_name": store.get("store_name") or code,
+                "city": store.get("city", ""),
+                "state": store.get("state", ""),
+            }
+            self.config["stores_to_monitor"].append(store_index[code])
+            added_stores += 1
+
+        if added_products or added_stores:
+            self._save_config()
+
+        return added_products, added_stores
+
+    def import_watchlist_file(self, path: str = "-"):
+        """Import products and stores from a CSV or JSON file, or stdin."""
+        from watchlist_io import read_watchlist
+
+        products, stores = read_watchlist(path)
+        added_products, added_stores = self.import_watchlist(products, stores)
+        print(
+            f"✅ Imported {added_products} products and {added_stores} stores "
+            f"({len(products) - added_products + len(stores) - added_stores} "
+            f"already monitored)"
+        )
+
+    def export_watchlist(self, path: str = "-", fmt: str = None):
+        """Write the monitored products and stores as CSV or JSON."""
+        from watchlist_io import write_watchlist
+
+        write_watchlist(
+            self.config["products_to_monitor"],
+            self.config["stores_to_monitor"],
+            path,
+            fmt,
+        )
+
     def _detect_category(self, product_name: str) -> str:
         """Detect product category."""
         name_lower = product_name.lower()
@@ -119,107 +383,492 @@ class AppleStockMonitor:
             return "airpods"
         return "unknown"
 
-    def check_stock(self) -> Dict:
-        """Check stock for all configured products and stores."""
+    def check_stock(self, deadline_seconds: Optional[float] = None) -> Dict:
+        """Check stock for all configured products and stores.
+
+        The check publishes what it has after deadline_seconds, by default
+        cycle_deadline_seconds from the config or CHECK_DEADLINE_SECONDS.
+        """
         if not self.config["products_to_monitor"]:
-            print("❌ No products configured for monitoring")
+            self.progress("❌ No products configured for monitoring")
             return {"error": "No products configured"}
 
         if not self.config["stores_to_monitor"]:
-            print("❌ No stores configured for monitoring")
+            self.progress("❌ No stores configured for monitoring")
             return {"error": "No stores configured"}
 
-        print(
+        self.progress(
             f"🔄 Checking {len(self.config['products_to_monitor'])} products at {len(self.config['stores_to_monitor'])} stores..."
         )
 
+        cycle_start = time.perf_counter()
         results = {
             "timestamp": datetime.now().isoformat(),
             "available_items": [],
             "individual_results": {},
         }
 
-        for product in self.config["products_to_monitor"]:
-            for store in self.config["stores_to_monitor"]:
-                try:
-                    result = self.monitor.check_product_availability(
-                        product["product_code"], store["store_code"]
-                    )
+        # Past the deadline the cycle publishes what it has, so one hung
+        # request cannot hold up the results or push back the schedule
+        if deadline_seconds is None:
+            deadline_seconds = self.config.get(
+                "cycle_deadline_seconds", CHECK_DEADLINE_SECONDS
+            )
+        deadline = time.monotonic() + deadline_seconds
 
-                    key = f"{product['product_code']}_{store['store_code']}"
-                    results["individual_results"][key] = {
-                        "product_name": product["product_name"],
-                        "store_name": store["store_name"],
-                        "available": result.get("available", False),
-                        "status": result.get("status", "unknown"),
-                        "timestamp": result.get(
-                            "timestamp", datetime.now().isoformat()
-                        ),
-                    }
+        workers = self.config.get("workers", 1)
+        if workers > 1:
+            self._check_sharded(results, workers, deadline)
+        else:
+            self._check_sequential(results, deadline)
 
-                    if result.get("available", False):
-                        results["available_items"].append(
-                            {
-                                "product": product["product_name"],
-                                "store": store["store_name"],
-                                "product_code": product["product_code"],
-                                "store_code": store["store_code"],
-                            }
-                        )
+        timed_out = self._record_timeouts(results)
 
-                        print(
-                            f"✅ {product['product_name']} available at {store['store_name']}"
-                        )
+        total_available = len(results["available_items"])
+        self.progress(f"📊 Check complete: {total_available} items available")
+
+        with METRICS.phase("persist"):
+            self.snapshots.save(results)
+
+        # The rate-limit sleeps are part of the cycle a user waits for
+        cycle_seconds = time.perf_counter() - cycle_start
+        METRICS.record_cycle(cycle_seconds)
+        self._write_metrics()
+
+        individual_results = results["individual_results"].values()
+        self._emit(
+            {
+                "type": "cycle",
+                "timestamp": results["timestamp"],
+                "pairs": len(individual_results),
+                "available": total_available,
+                "errors": sum(r["status"] == "error" for r in individual_results),
+                "timeouts": timed_out,
+                "duration_seconds": round(cycle_seconds, 3),
+            }
+        )
 
-                    # Record for pattern analysis
-                    self.analyzer.record_stock_check(
-                        store["store_code"],
+        self._last_results = results
+        return results
+
+    def _check_sequential(self, results: Dict, deadline: float):
+        """Check every pair in turn, rate limited, until the deadline."""
+        pairs = queue.Queue()
+        outcomes = queue.Queue()
+
+        def check_pairs():
+            # One thread for the whole cycle, so its HTTP session is reused
+            for product, store, timeout in iter(pairs.get, None):
+                outcomes.put(
+                    self.monitor.check_product_availability(
                         product["product_code"],
-                        result.get("available", False),
+                        store["store_code"],
+                        timeout=timeout,
+                        deadline=deadline,
                     )
+                )
 
-                except Exception as e:
-                    print(
-                        f"❌ Error checking {product['product_name']} at {store['store_name']}: {e}"
-                    )
+        # Requests run in a daemon thread so the cycle stops waiting at the
+        # deadline; the request itself gives up then too
+        threading.Thread(target=check_pairs, name="stock-check", daemon=True).start()
+        try:
+            for product in self.config["products_to_monitor"]:
+                for store in self.config["stores_to_monitor"]:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return
+
+                    pairs.put((product, store, min(REQUEST_TIMEOUT, remaining)))
+                    try:
+                        result = outcomes.get(timeout=remaining)
+                        self._record_result(results, product, store, result)
+                    except queue.Empty:
+                        self.progress(
+                            f"⏱️  Cycle deadline reached checking "
+                            f"{product['product_name']} at {store['store_name']}"
+                        )
+                        return
+                    except Exception as e:
+                        self.progress(
+                            f"❌ Error checking {product['product_name']} at {store['store_name']}: {e}"
+                        )
 
-                time.sleep(1)  # Rate limiting
+                    # Rate limiting
+                    time.sleep(min(1, max(deadline - time.monotonic(), 0)))
+        finally:
+            pairs.put(None)
+
+    def _record_timeouts(self, results: Dict) -> int:
+        """Mark pairs the cycle deadline cut off as stale; returns how many.
+
+        A cut-off pair keeps its last known result, flagged stale, or gets
+        status "timeout" if it was never checked.
+        """
+        missing = [
+            (product, store)
+            for product in self.config["products_to_monitor"]
+            for store in self.config["stores_to_monitor"]
+            if f"{product['product_code']}_{store['store_code']}"
+            not in results["individual_results"]
+        ]
+        if not missing:
+            return 0
+
+        if self._last_results is None:
+            self._last_results = self.snapshots.load() or {}
+        previous = self._last_results.get("individual_results", {})
+
+        for product, store in missing:
+            key = f"{product['product_code']}_{store['store_code']}"
+            individual_result = previous.get(key)
+            if individual_result is None or individual_result["status"] in (
+                "error",
+                "timeout",
+            ):
+                individual_result = {
+                    "product_name": product["product_name"],
+                    "store_name": store["store_name"],
+                    "available": False,
+                    "status": "timeout",
+                    "timestamp": results["timestamp"],
+                }
+
+            individual_result = dict(individual_result, stale=True)
+            results["individual_results"][key] = individual_result
+            if individual_result["available"]:
+                results["available_items"].append(
+                    {
+                        "product": product["product_name"],
+                        "store": store["store_name"],
+                        "product_code": product["product_code"],
+                        "store_code": store["store_code"],
+                        "stale": True,
+                    }
+                )
+
+            self._emit(
+                dict(
+                    type="pair",
+                    product_code=product["product_code"],
+                    store_code=store["store_code"],
+                    **individual_result,
+                )
+            )
 
-        total_available = len(results["available_items"])
-        print(f"📊 Check complete: {total_available} items available")
+        results["stale"] = True
+        METRICS.inc("apple_stock_cycle_timeouts", len(missing))
+        self.progress(f"⏱️  Cycle deadline cut off {len(missing)} checks; kept as stale")
+        return len(missing)
+
+    def _check_sharded(self, results: Dict, workers: int, deadline: float):
+        """Check every pair with worker processes sharing the request budget."""
+        from store_crawler import StoreCatalogCrawler
+        from workers import ShardedChecker, build_query_plan
+
+        products = {p["product_code"]: p for p in self.config["products_to_monitor"]}
+        stores = {s["store_code"]: s for s in self.config["stores_to_monitor"]}
+
+        # Query from seeds whose results include the stores; ones no crawled
+        # seed covers fall back to the default location
+        locations = StoreCatalogCrawler(self.monitor).seeds_covering(stores)
+        covered = {code for codes in locations.values() for code in codes}
+        uncovered = sorted(set(stores) - covered)
+        if uncovered:
+            locations.setdefault(self.monitor.DEFAULT_LOCATION, []).extend(uncovered)
+
+        plan = build_query_plan(list(products), locations)
+
+        self.progress(f"🧵 Sharding {len(plan)} queries across {workers} workers")
+        checker = ShardedChecker(
+            self.monitor,
+            workers,
+            self.config.get("requests_per_second", 1),
+            progress=self.progress,
+        )
+        for product_code, store_code, result in checker.check(plan, deadline):
+            self._record_result(
+                results, products[product_code], stores[store_code], result
+            )
 
-        return results
+    def _record_result(self, results: Dict, product: Dict, store: Dict, result: Dict):
+        """Add one pair's availability to a cycle's results."""
+        key = f"{product['product_code']}_{store['store_code']}"
+        results["individual_results"][key] = {
+            "product_name": product["product_name"],
+            "store_name": store["store_name"],
+            "available": result.get("available", False),
+            "status": result.get("status", "unknown"),
+            "timestamp": result.get("timestamp", datetime.now().isoformat()),
+        }
+        self._emit(
+            dict(
+                type="pair",
+                product_code=product["product_code"],
+                store_code=store["store_code"],
+                **results["individual_results"][key],
+                **({"error": result["error"]} if "error" in result else {}),
+            )
+        )
+        # Read once; watch() may clear it from another thread
+        listener = self.result_listener
+        if listener is not None:
+            listener(product, store, result)
+
+        if result.get("available", False):
+            results["available_items"].append(
+                {
+                    "product": product["product_name"],
+                    "store": store["store_name"],
+                    "product_code": product["product_code"],
+                    "store_code": store["store_code"],
+                }
+            )
+
+            self.progress(
+                f"✅ {product['product_name']} available at {store['store_name']}"
+            )
+
+        # Record for pattern analysis
+        with METRICS.phase("analyze"):
+            self.analyzer.record_stock_check(
+                store["store_code"],
+                product["product_code"],
+                result.get("available", False),
+            )
+
+    def _emit(self, record: Dict):
+        """Write one compact JSON line, flushed so consumers see it at once."""
+        if self.jsonl_out is None:
+            return
+
+        self.jsonl_out.write(
+            json.dumps(record, separators=(",", ":"), ensure_ascii=False) + "\n"
+        )
+        self.jsonl_out.flush()
+
+    def _write_metrics(self):
+        """Write the OpenMetrics text file a scraper or node exporter can read."""
+        metrics_file = self.config.get("metrics_file", "metrics.prom")
+        if not metrics_file:
+            return
+
+        try:
+            METRICS.write(metrics_file)
+        except OSError as e:
+            self.progress(f"⚠️  Could not write metrics to {metrics_file}: {e}")
+
+    def show_last_snapshot(self) -> bool:
+        """Print the last persisted result, marked stale; return False if none."""
+        results = self.snapshots.load()
+        if results is None:
+            return False
+
+        available_items = results.get("available_items", [])
+        self.progress(
+            f"📦 Last known result (stale, checked {results.get('timestamp')}): "
+            f"{len(available_items)} items available"
+        )
+        for item in available_items:
+            self.progress(f"   • {item['product']} at {item['store']}")
+
+        return True
 
     def run_continuous_monitoring(self):
-        """Run continuous monitoring."""
+        """Run continuous monitoring on a fixed, drift-free schedule."""
         interval_minutes = self.config.get("check_interval_minutes", 10)
-        interval_seconds = interval_minutes * 60
+        self.progress(
+            f"🚀 Starting continuous monitoring (every {interval_minutes} minutes)"
+        )
+        self.progress("Press Ctrl+C to stop")
 
-        print(f"🚀 Starting continuous monitoring (every {interval_minutes} minutes)")
-        print("Press Ctrl+C to stop")
+        # Show what was known at shutdown while the first real check runs
+        self.show_last_snapshot()
 
         try:
-            cycle = 0
-            while True:
-                cycle += 1
-                print(f"\n{'='*50}")
-                print(f"MONITORING CYCLE #{cycle}")
-                print(f"{'='*50}")
+            self._run_cycles()
+        except KeyboardInterrupt:
+            self.progress(f"\n🛑 Monitoring stopped")
+
+    def _run_cycles(self, stop: Optional[threading.Event] = None):
+        """Run check cycles on the schedule until stop is set."""
+        scheduler = CycleScheduler(*self._schedule_settings())
+
+        def interrupted() -> bool:
+            stopping = stop is not None and stop.is_set()
+            return stopping or self.reload_config_if_changed()
+
+        cycle = 1
+        while stop is None or not stop.is_set():
+            self.progress(f"\n{'='*50}")
+            self.progress(f"MONITORING CYCLE #{cycle}")
+            self.progress(f"{'='*50}")
+
+            # A scheduled check may use its whole slot unless configured otherwise
+            results = self.check_stock(
+                self.config.get("cycle_deadline_seconds", scheduler.interval)
+            )
 
-                results = self.check_stock()
+            if results.get("available_items"):
+                self.progress(
+                    f"🎉 Found {len(results['available_items'])} available items!"
+                )
+            else:
+                self.progress("😴 No items currently available")
+
+            next_cycle = scheduler.next_cycle()
+            if next_cycle.skipped:
+                METRICS.inc("apple_stock_skipped_cycles", next_cycle.skipped)
+                self.progress(
+                    f"⚠️  Cycle overran its slot by {-next_cycle.slack:.1f}s, "
+                    f"skipped {next_cycle.skipped} check(s)"
+                )
+
+            self.progress(
+                f"⏰ Next check in {next_cycle.delay:.0f}s "
+                f"(slack {next_cycle.slack:.1f}s)"
+            )
 
-                if results.get("available_items"):
-                    print(
-                        f"🎉 Found {len(results['available_items'])} available items!"
+            # Config edits apply without a restart: watchlist changes at
+            # the next check, schedule changes to the pending one
+            while not scheduler.wait(next_cycle, interrupted, CONFIG_POLL_SECONDS):
+                if stop is not None and stop.is_set():
+                    return
+
+                settings = self._schedule_settings()
+                if settings != (
+                    scheduler.interval,
+                    scheduler.jitter,
+                    scheduler.overrun,
+                ):
+                    try:
+                        scheduler.reschedule(*settings)
+                    except ValueError as e:
+                        self.progress(f"⚠️  Keeping the current schedule: {e}")
+                        continue
+                    next_cycle = scheduler.next_cycle()
+                    self.progress(
+                        f"⏰ Next check rescheduled to {next_cycle.delay:.0f}s"
                     )
-                else:
-                    print("😴 No items currently available")
 
-                print(f"⏰ Next check in {interval_minutes} minutes...")
-                time.sleep(interval_seconds)
+            cycle = next_cycle.number
 
-        except KeyboardInterrupt:
-            print(f"\n🛑 Monitoring stopped")
+    def watch(self, max_pending: int = WATCH_MAX_PENDING) -> Iterator["StockEvent"]:
+        """Run the monitor and yield a StockEvent for each availability change.
+
+        Checks run on the configured schedule in a background thread. At most
+        max_pending events are buffered; when a consumer falls behind, checks
+        pause until it catches up. Closing the generator stops the monitor
+        after the check in progress.
+        """
+        events = queue.Queue(max_pending)
+        stop = threading.Event()
+
+        def publish(event):
+            # Block the checks rather than buffer without bound
+            while not stop.is_set():
+                try:
+                    events.put(event, timeout=WATCH_STOP_POLL_SECONDS)
+                    return
+                except queue.Full:
+                    continue
+
+        stop_watch = self._start_watch(publish, stop)
+        try:
+            while True:
+                event = events.get()
+                if isinstance(event, BaseException):
+                    raise event
+                yield event
+        finally:
+            # Also runs when the generator is closed or garbage-collected
+            stop_watch()
+
+    async def awatch(
+        self, max_pending: int = WATCH_MAX_PENDING
+    ) -> AsyncIterator["StockEvent"]:
+        """Async iterator version of watch() for use inside an event loop."""
+        import asyncio
+        from concurrent.futures import TimeoutError as FutureTimeout
+
+        loop = asyncio.get_running_loop()
+        events = asyncio.Queue(max_pending)
+        stop = threading.Event()
+
+        def publish(event):
+            # Block the checks until the loop has room for the event
+            future = asyncio.run_coroutine_threadsafe(events.put(event), loop)
+            while not stop.is_set():
+                try:
+                    future.result(timeout=WATCH_STOP_POLL_SECONDS)
+                    return
+                except FutureTimeout:
+                    continue
+            future.cancel()
+
+        stop_watch = self._start_watch(publish, stop)
+        try:
+            while True:
+                event = await events.get()
+                if isinstance(event, BaseException):
+                    raise event
+                yield event
+        finally:
+            stop_watch()
+
+    def _start_watch(
+        self, publish: Callable, stop: threading.Event
+    ) -> Callable[[], None]:
+        """Run scheduled checks in a thread, publishing change events.
+
+        Progress goes to logging instead of stdout while watching. Returns a
+        function that stops the watch and detaches it from this monitor.
+        """
+        import logging
+
+        from stock_events import StockEventTracker
+
+        tracker = StockEventTracker()
+        # A restart should not announce what was already known
+        last_results = self.snapshots.load()
+        if last_results:
+            tracker.seed(last_results)
+
+        def on_result(product: Dict, store: Dict, result: Dict):
+            event = tracker.observe(product, store, result)
+            if event is not None:
+                publish(event)
+
+        progress = logging.getLogger(__name__).info
+        previous_progress = self.progress
+
+        def run():
+            try:
+                self._run_cycles(stop)
+            except Exception as e:
+                # Hand the failure to the consumer instead of hanging it
+                publish(e)
+            finally:
+                # The check in progress may outlive the consumer; restore after it
+                if self.progress == progress:
+                    self.progress = previous_progress
+
+        def stop_watch():
+            stop.set()
+            if self.result_listener is on_result:
+                self.result_listener = None
+
+        self.result_listener = on_result
+        self.progress = progress
+        threading.Thread(target=run, name="apple-monitor-watch", daemon=True).start()
+        return stop_watch
+
+    def _schedule_settings(self) -> Tuple[float, float, str]:
+        """Return the scheduler's (interval, jitter, overrun policy) from config."""
+        return (
+            self.config.get("check_interval_minutes", 10) * 60,
+            self.config.get("check_jitter_seconds", 30),
+            self.config.get("overrun_policy", OVERRUN_SKIP),
+        )
 
     def show_status(self):
         """Show current configuration and status."""
@@ -238,10 +887,22 @@ class AppleStockMonitor:
             f"\n⚙️  Check interval: {self.config.get('check_interval_minutes', 10)} minutes"
         )
 
+        print()
+        if not self.show_last_snapshot():
+            print("📦 No stock check recorded yet")
+
 
 def main():
     """Main entry point."""
-    import sys
+    import argparse
+    from contextlib import redirect_stdout
+
+    # Only the options are parsed here; the commands below read sys.argv
+    parser = argparse.ArgumentParser(add_help=False, allow_abbrev=False)
+    parser.add_argument("--format", choices=["text", "jsonl"], default="text")
+    options, args = parser.parse_known_args()
+    output_format = options.format
+    sys.argv[1:] = args
 
     monitor = AppleStockMonitor()
 
@@ -250,12 +911,16 @@ def main():
         print("Usage:")
         print("  python apple_monitor.py discover <search_term>  - Find products")
         print("  python apple_monitor.py stores <zipcode>        - Find stores")
+        print("  python apple_monitor.py crawl-stores [zip...]   - Crawl all stores")
         print("  python apple_monitor.py add-product <code> <name> - Add product")
         print("  python apple_monitor.py add-store <code> <name>   - Add store")
+        print("  python apple_monitor.py import <file|->         - Bulk add CSV/JSON")
+        print("  python apple_monitor.py export [file|-] [csv|json] - Export watchlist")
         print("  python apple_monitor.py check                   - Check stock once")
         print(
             "  python apple_monitor.py run                     - Continuous monitoring"
         )
+        print("    (check and run take --format jsonl for one JSON record per line)")
         print("  python apple_monitor.py status                  - Show configuration")
         return
 
@@ -282,6 +947,10 @@ def main():
                 f"   {store['store_code']} - {store['store_name']} ({store['city']}, {store['state']})"
             )
 
+    elif command == "crawl-stores":
+        seeds = sys.argv[2:] or None
+        monitor.crawl_stores(seeds)
+
     elif command == "add-product":
         if len(sys.argv) < 4:
             print("Usage: python apple_monitor.py add-product <code> <name>")
@@ -300,11 +969,27 @@ def main():
         store_name = " ".join(sys.argv[3:])
         monitor.add_store(store_code, store_name)
 
-    elif command == "check":
-        monitor.check_stock()
+    elif command == "import":
+        monitor.import_watchlist_file(sys.argv[2] if len(sys.argv) > 2 else "-")
 
-    elif command == "run":
-        monitor.run_continuous_monitoring()
+    elif command == "export":
+        path = sys.argv[2] if len(sys.argv) > 2 else "-"
+        fmt = sys.argv[3] if len(sys.argv) > 3 else None
+        monitor.export_watchlist(path, fmt)
+
+    elif command in ("check", "run"):
+        run = (
+            monitor.check_stock
+            if command == "check"
+            else monitor.run_continuous_monitoring
+        )
+        if output_format == "jsonl":
+            # Records own stdout; the human-readable progress goes to stderr
+            monitor.jsonl_out = sys.stdout
+            with redirect_stdout(sys.stderr):
+                run()
+        else:
+            run()
 
     elif command == "status":
         monitor.show_status()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark - Keep CLI startup fast by guarding what apple_monitor imports
+"""
+
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+# Cumulative import time budget for `import apple_monitor`, in milliseconds
+IMPORT_BUDGET_MS = 50
+
+# Heavy modules only checks and discovery need; they must stay lazy
+LAZY_MODULES = ("requests", "bs4", "sqlite3", "dynamic_apple_monitor")
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def import_times(module: str) -> Dict[str, int]:
+    """Return the cumulative import time in microseconds of each module it loads."""
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+
+    times = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        name = name.strip()
+        if name == "site":
+            # Everything so far was interpreter startup, not the module
+            times = {}
+            continue
+        times[name] = int(cumulative)
+    return times
+
+
+def command_time(args: List[str], runs: int = 5) -> float:
+    """Return the best wall time in milliseconds of a CLI command."""
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "apple_monitor.py"] + args,
+            cwd=REPO_DIR,
+            stdout=subprocess.DEVNULL,
+            check=True,
+        )
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main() -> int:
+    """Print the startup profile; exit non-zero if a budget is exceeded."""
+    times = import_times("apple_monitor")
+    total_ms = times["apple_monitor"] / 1000
+    slowest: List[Tuple[str, int]] = sorted(
+        times.items(), key=lambda item: item[1], reverse=True
+    )[:10]
+
+    print(f"⏱️  import apple_monitor: {total_ms:.1f} ms (budget {IMPORT_BUDGET_MS} ms)")
+    for name, cumulative in slowest:
+        print(f"   {cumulative / 1000:8.1f} ms  {name}")
+
+    status_ms = command_time(["status"])
+    print(f"⏱️  apple_monitor.py status: {status_ms:.0f} ms wall, interpreter included")
+
+    failures = []
+    if total_ms > IMPORT_BUDGET_MS:
+        failures.append(f"import took {total_ms:.1f} ms")
+    eager = [module for module in LAZY_MODULES if module in times]
+    if eager:
+        failures.append(f"imported eagerly: {', '.join(eager)}")
+
+    if failures:
+        print(f"❌ Startup budget exceeded: {'; '.join(failures)}")
+        return 1
+
+    print("✅ Startup within budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
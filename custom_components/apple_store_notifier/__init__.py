@@ -1,13 +1,33 @@
 """Apple Store Stock Notifier integration for Home Assistant."""
 
 import logging
+import time
 from datetime import timedelta
+from typing import Any, Dict, Mapping, Optional, Set, Tuple
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
-from .const import DOMAIN, PLATFORMS
+from .const import (
+    CONF_ALERT_COOLDOWN,
+    CONF_HOME_ZIPCODE,
+    CONF_REALERT_INTERVAL,
+    DEFAULT_ALERT_COOLDOWN,
+    DEFAULT_CHECK_INTERVAL,
+    DEFAULT_REALERT_INTERVAL,
+    DOMAIN,
+    PLATFORMS,
+    SIGNIFICANT_RESULT_FIELDS,
+    SNAPSHOT_SAVE_DELAY,
+    SNAPSHOT_STORAGE_VERSION,
+    SUMMARY_KEY,
+)
+from .hub import AppleStoreHub
+from .snapshot import build_snapshot
+from .watchlist import WatchlistPair
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -15,51 +35,195 @@ _LOGGER = logging.getLogger(__name__)
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Apple Store Notifier from a config entry."""
 
-    coordinator = AppleStoreCoordinator(hass, entry)
-    await coordinator.async_config_entry_first_refresh()
+    from .apple_monitor import AppleStoreMonitor
+
+    # Every entry polls through one hub, so requests scale with unique
+    # products rather than with the number of entries
+    hub = await AppleStoreHub.async_get(hass)
+    await _async_migrate_unique_ids(hass, entry)
+
+    try:
+        # Opening the databases and resolving names is blocking work
+        monitor = await hass.async_add_executor_job(
+            AppleStoreMonitor,
+            entry.data.get("stores", []),
+            entry.data.get("products", []),
+            entry.data.get("sms_gateway_url"),
+            hub.dynamic_monitor,
+            hub.store_index,
+            *_alert_policy(entry),
+            hub.outbox,
+            entry.data.get(CONF_HOME_ZIPCODE),
+        )
+        await hass.async_add_executor_job(monitor.compile_watchlist)
+
+        coordinator = AppleStoreCoordinator(hass, entry, monitor, hub)
+
+        # With a last-known result the entities come up at once, marked stale,
+        # and the first real check runs in the background
+        restored = await coordinator.async_restore_snapshot()
+        if not restored:
+            await coordinator.async_config_entry_first_refresh()
+    except Exception:
+        # A hub created for this entry alone must not outlive a failed setup
+        hub.async_unregister(entry.entry_id)
+        raise
 
-    hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.entry_id] = coordinator
+    hub.async_register(coordinator)
+
+    entry.async_on_unload(entry.add_update_listener(async_update_entry))
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    if restored:
+        hass.async_create_task(coordinator.async_refresh())
+
     # Service registration removed to fix services.yaml error
 
     return True
 
 
+async def async_update_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Recompile the watchlist when the config entry changes."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    await coordinator.async_update_watchlist()
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
 
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator.hub.async_unregister(entry.entry_id)
 
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Delete the persisted snapshot of a removed config entry."""
+    await _snapshot_store(hass, entry).async_remove()
+
+
+async def _async_migrate_unique_ids(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Scope sensor unique IDs from before multiple entries to their entry."""
+    prefix = f"{DOMAIN}_"
+    entry_prefix = f"{DOMAIN}_{entry.entry_id}_"
+
+    @callback
+    def _migrate(entity_entry: er.RegistryEntry) -> Optional[Dict[str, Any]]:
+        unique_id = entity_entry.unique_id
+        if not unique_id.startswith(prefix) or unique_id.startswith(entry_prefix):
+            return None
+        return {"new_unique_id": entry_prefix + unique_id[len(prefix) :]}
+
+    await er.async_migrate_entries(hass, entry.entry_id, _migrate)
+
+
+def _alert_policy(entry: ConfigEntry) -> Tuple[timedelta, Optional[timedelta]]:
+    """Return an entry's alert cooldown and re-alert interval (None = never)."""
+    cooldown = entry.data.get(CONF_ALERT_COOLDOWN, DEFAULT_ALERT_COOLDOWN)
+    realert = entry.data.get(CONF_REALERT_INTERVAL, DEFAULT_REALERT_INTERVAL)
+    return timedelta(minutes=cooldown), timedelta(minutes=realert) if realert else None
+
+
+def _snapshot_store(hass: HomeAssistant, entry: ConfigEntry) -> Store:
+    """Return the storage holding an entry's last completed result."""
+    return Store(hass, SNAPSHOT_STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}")
+
+
 class AppleStoreCoordinator(DataUpdateCoordinator):
     """Class to manage fetching Apple Store stock data."""
 
-    def __init__(self, hass: HomeAssistant, entry: ConfigEntry):
+    def __init__(
+        self, hass: HomeAssistant, entry: ConfigEntry, monitor, hub: AppleStoreHub
+    ):
         """Initialize."""
         self.entry = entry
+        self.hub = hub
 
-        # Create the monitor instance once and reuse it
-        stores = entry.data.get("stores", [])
-        products = entry.data.get("products", [])
-        sms_gateway_url = entry.data.get("sms_gateway_url")
+        # The monitor instance is created once and reused
+        self.monitor = monitor
+        self.changed_keys: Set[str] = set()
+        self.snapshot: Optional[Mapping[str, Any]] = None
+        self._store = _snapshot_store(hass, entry)
 
-        from .apple_monitor import AppleStoreMonitor
+        # The hub schedules polling for all entries, so there is no own interval
+        super().__init__(hass, _LOGGER, name=DOMAIN)
+
+    @property
+    def check_interval(self) -> timedelta:
+        """Return how often this entry wants its watchlist checked."""
+        return timedelta(
+            minutes=self.entry.data.get("check_interval", DEFAULT_CHECK_INTERVAL)
+        )
+
+    @property
+    def pairs(self) -> Dict[str, WatchlistPair]:
+        """Return the watched product/store pairs by key."""
+        watchlist = self.monitor.watchlist
+        return {pair.key: pair for pair in watchlist.pairs} if watchlist else {}
+
+    async def async_update_watchlist(self):
+        """Apply a changed config entry without a reload or a full re-check."""
+        stores = self.entry.data.get("stores", [])
+        products = self.entry.data.get("products", [])
+        self.hub.async_reschedule()
 
-        self._monitor = AppleStoreMonitor(stores, products, sms_gateway_url)
+        # Alerts for the added pairs already go out under the new settings
+        self.monitor.sms_gateway_url = self.entry.data.get("sms_gateway_url")
+        self.monitor.set_alert_policy(*_alert_policy(self.entry))
+        self.monitor.home_zipcode = self.entry.data.get(CONF_HOME_ZIPCODE)
 
-        super().__init__(
-            hass,
-            _LOGGER,
-            name=DOMAIN,
-            update_interval=timedelta(minutes=entry.data.get("check_interval", 10)),
+        previous_keys = set(self.pairs)
+        await self.hass.async_add_executor_job(
+            self.monitor.update_watchlist, stores, products
         )
+        watchlist = self.monitor.watchlist
+
+        # Only pairs the change added need a stock check
+        added_keys = set(self.pairs) - previous_keys
+        update = await self.hub.async_check_pairs(self, watchlist.subset(added_keys))
+
+        result = self.monitor.merge_results(self.data, update, watchlist)
+        await self._async_prepare_publish(result)
+        self.async_set_updated_data(result)
+
+    async def async_restore_snapshot(self) -> bool:
+        """Publish the last persisted result marked stale; return False if none."""
+        result = await self._store.async_load()
+        if not result:
+            return False
+
+        result["stale"] = True
+        for individual_result in result.get("individual_results", {}).values():
+            individual_result["stale"] = True
+
+        _LOGGER.info(f"📦 Restored last known result from {result.get('timestamp')}")
+
+        await self._async_prepare_publish(result, persist=False)
+        self.async_set_updated_data(result)
+        return True
+
+    async def _async_prepare_publish(self, result: Dict, persist: bool = True):
+        """Compute the snapshot and changed keys before a result is published."""
+        # Entity states, attributes and predictions are computed once here,
+        # off the event loop, so entity properties are plain lookups
+        with self.hub.phase("analyze"):
+            self.snapshot = await self.hass.async_add_executor_job(
+                self._build_snapshot, result
+            )
+        self.changed_keys = self._diff_results(self.data, result)
+
+        if persist:
+            self._store.async_delay_save(lambda: result, SNAPSHOT_SAVE_DELAY)
+
+    async def async_publish_result(self, result: Dict):
+        """Publish a result the hub fetched for this entry."""
+        await self._async_prepare_publish(result)
+        self._log_result(result)
+        self.async_set_updated_data(result)
 
     async def _async_update_data(self):
         """Fetch data from Apple Store with individual product tracking."""
@@ -69,9 +233,24 @@ class AppleStoreCoordinator(DataUpdateCoordinator):
         _LOGGER.info(
             f"🍎 Starting stock check: {len(stores)} stores, {len(products)} products"
         )
+        start = time.perf_counter()
 
-        result = await self.hass.async_add_executor_job(self._monitor.check_stock)
+        # First and manual refreshes check only this entry, still through
+        # the hub so they share its session and never overlap a poll
+        results = await self.hub.async_check([self])
+        result = results[self.entry.entry_id]
 
+        await self._async_prepare_publish(result)
+        self._log_result(result)
+
+        if self.hub.metrics:
+            self.hub.metrics.record_cycle(time.perf_counter() - start)
+
+        return result
+
+    @staticmethod
+    def _log_result(result: Dict):
+        """Log the outcome of a stock check."""
         available_count = result.get("total_available", 0)
         individual_results = result.get("individual_results", {})
 
@@ -94,4 +273,52 @@ class AppleStoreCoordinator(DataUpdateCoordinator):
                 f"   {individual_result['product_name']} at {individual_result['store_name']}: {status}"
             )
 
-        return result
+    def _build_snapshot(self, result: Dict) -> Mapping[str, Any]:
+        """Build the entity snapshot for a result, including restock predictions."""
+        predictions = {
+            f"{prediction['product_code']}_{prediction['store_code']}": prediction[
+                "prediction"
+            ]
+            for prediction in self.monitor.get_restock_predictions().get(
+                "predictions", []
+            )
+        }
+
+        return build_snapshot(
+            result,
+            self.entry.data.get("stores", []),
+            self.entry.data.get("products", []),
+            predictions,
+        )
+
+    def has_changed(self, key: str) -> bool:
+        """Return True if the last refresh changed the result for a key."""
+        return key in self.changed_keys
+
+    @staticmethod
+    def _diff_results(previous: Optional[Dict], current: Dict) -> Set[str]:
+        """Return the product/store keys whose significant fields changed."""
+        if not previous:
+            return set(current.get("individual_results", {})) | {SUMMARY_KEY}
+
+        old_results = previous.get("individual_results", {})
+        new_results = current.get("individual_results", {})
+
+        def significant(result: Optional[Dict]):
+            if result is None:
+                return None
+            return tuple(result.get(field) for field in SIGNIFICANT_RESULT_FIELDS)
+
+        changed = {
+            key
+            for key in old_results.keys() | new_results.keys()
+            if significant(old_results.get(key)) != significant(new_results.get(key))
+        }
+
+        if changed or any(
+            previous.get(field) != current.get(field)
+            for field in ("stores_checked", "products_checked", "stale")
+        ):
+            changed.add(SUMMARY_KEY)
+
+        return changed
@@ -0,0 +1,169 @@
+"""Persisted per-pair alert state so each restock is announced once."""
+
+import logging
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+_LOGGER = logging.getLogger(__name__)
+
+# (recipient, product_code, store_code) -> (available, last_alerted)
+AlertKey = Tuple[str, str, str]
+AlertState = Tuple[bool, Optional[datetime]]
+
+
+class AlertStateTracker:
+    """Decide which available items warrant an alert, backed by a SQLite table.
+
+    An item alerts when it goes from unavailable (or never seen) to
+    available, unless the recipient was alerted about it within the
+    cooldown. While an item stays available it only alerts again once the
+    re-alert interval has passed, if one is set.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        cooldown: timedelta,
+        realert_interval: Optional[timedelta] = None,
+    ):
+        """Initialize the tracker and load the persisted state."""
+        self.db_path = db_path
+        self.cooldown = cooldown
+        self.realert_interval = realert_interval
+        self._state: Dict[AlertKey, AlertState] = {}
+        self._lock = threading.Lock()
+        self._init_database()
+        self._load()
+
+    def _init_database(self):
+        """Create the persisted alert state table."""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS alert_state (
+                recipient TEXT NOT NULL,
+                product_code TEXT NOT NULL,
+                store_code TEXT NOT NULL,
+                available BOOLEAN NOT NULL,
+                last_alerted TEXT,
+                updated TEXT,
+                PRIMARY KEY (recipient, product_code, store_code)
+            )
+        """
+        )
+
+        conn.commit()
+        conn.close()
+
+    def _load(self):
+        """Load the persisted state into memory."""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute(
+            """
+            SELECT recipient, product_code, store_code, available, last_alerted
+            FROM alert_state
+        """
+        )
+        rows = cursor.fetchall()
+        conn.close()
+
+        self._state = {
+            (row[0], row[1], row[2]): (
+                bool(row[3]),
+                datetime.fromisoformat(row[4]) if row[4] else None,
+            )
+            for row in rows
+        }
+
+    def due_alerts(self, recipient: str, results: Dict) -> List[Dict]:
+        """Return the available items to alert about and record the new state.
+
+        Pairs whose check failed or was cut off by the cycle deadline keep
+        their previous state, so neither counts as a restock afterwards.
+        """
+        now = datetime.now()
+        due = []
+        changed = []
+
+        with self._lock:
+            available_items = {
+                (item["product_code"], item["store_code"]): item
+                for item in results.get("available_items", [])
+            }
+
+            for individual_result in results.get("individual_results", {}).values():
+                if individual_result["status"] == "error" or individual_result.get(
+                    "stale"
+                ):
+                    continue
+
+                pair = (
+                    individual_result["product_code"],
+                    individual_result["store_code"],
+                )
+                key = (recipient,) + pair
+                was_available, last_alerted = self._state.get(key, (False, None))
+                available = pair in available_items
+
+                if available and self._is_due(was_available, last_alerted, now):
+                    due.append(available_items[pair])
+                    last_alerted = now
+
+                state = (available, last_alerted)
+                if self._state.get(key) != state:
+                    self._state[key] = state
+                    changed.append(
+                        key
+                        + (
+                            available,
+                            last_alerted.isoformat() if last_alerted else None,
+                            now.isoformat(),
+                        )
+                    )
+
+            if changed:
+                self._save(changed)
+
+        if len(due) < len(available_items):
+            _LOGGER.debug(
+                f"Suppressed {len(available_items) - len(due)} repeat alerts "
+                f"for {recipient}"
+            )
+
+        return due
+
+    def _is_due(
+        self, was_available: bool, last_alerted: Optional[datetime], now: datetime
+    ) -> bool:
+        """Apply the transition, cooldown and re-alert policy to one pair."""
+        if last_alerted is None:
+            return True
+
+        if not was_available:
+            return now - last_alerted >= self.cooldown
+
+        return (
+            self.realert_interval is not None
+            and now - last_alerted >= self.realert_interval
+        )
+
+    def _save(self, rows: List[tuple]):
+        """Persist changed pair states in one batch."""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.executemany(
+            """
+            INSERT OR REPLACE INTO alert_state
+            (recipient, product_code, store_code, available, last_alerted, updated)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """,
+            rows,
+        )
+        conn.commit()
+        conn.close()
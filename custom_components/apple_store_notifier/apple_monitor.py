@@ -1,10 +1,10 @@
 """Apple Store stock monitoring logic - API-based, no hardcoded data."""
 
+import json
 import logging
-import requests
-import time
-from datetime import datetime
-from typing import Dict, List, Optional
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
 import sys
 import os
 
@@ -13,10 +13,28 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
 try:
     from dynamic_apple_monitor import DynamicAppleMonitor
+    from metrics import METRICS
 
     DYNAMIC_FEATURES_AVAILABLE = True
 except ImportError:
     DYNAMIC_FEATURES_AVAILABLE = False
+    METRICS = None
+
+from .alert_state import AlertStateTracker
+from .const import (
+    CYCLE_DEADLINE,
+    DEFAULT_ALERT_COOLDOWN,
+    PRODUCT_MISS_TTL,
+    STORE_DISCOVERY_ZIPCODES,
+    STORE_INDEX_MAX_AGE,
+)
+from .digest import build_digest
+from .outbox import NotificationOutbox
+from .sms_dispatcher import SMSMessage
+from .stock_fetcher import CycleDeadlineExceeded
+from .store_index import StoreNameIndex
+from .watchlist import CompiledWatchlist, WatchlistPair
+from .zipcode_utils import StoreSpatialIndex, get_zipcode_coordinates
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -29,25 +47,233 @@ class AppleStoreMonitor:
         stores: List[str],
         products: List[str],
         sms_gateway_url: Optional[str] = None,
+        dynamic_monitor: Optional["DynamicAppleMonitor"] = None,
+        store_index: Optional[StoreNameIndex] = None,
+        alert_cooldown: timedelta = timedelta(minutes=DEFAULT_ALERT_COOLDOWN),
+        realert_interval: Optional[timedelta] = None,
+        outbox: Optional[NotificationOutbox] = None,
+        home_zipcode: Optional[str] = None,
     ):
-        """Initialize the monitor."""
+        """Initialize the monitor, optionally sharing another monitor's resources."""
         self.stores = stores
         self.products = products
         self.sms_gateway_url = sms_gateway_url
+        self.home_zipcode = home_zipcode
+        self._spatial_index: Optional[StoreSpatialIndex] = None
+        self._spatial_index_built: Optional[datetime] = None
+        self.watchlist: Optional[CompiledWatchlist] = None
 
         # Initialize dynamic monitor for API-based operations
         if DYNAMIC_FEATURES_AVAILABLE:
-            self.dynamic_monitor = DynamicAppleMonitor()
+            self.dynamic_monitor = dynamic_monitor or DynamicAppleMonitor()
+            self.store_index = store_index or StoreNameIndex(
+                self.dynamic_monitor.db_path
+            )
+            self.alert_tracker = AlertStateTracker(
+                self.dynamic_monitor.db_path, alert_cooldown, realert_interval
+            )
+            self.outbox = outbox or NotificationOutbox(
+                self.dynamic_monitor.db_path, METRICS
+            )
             _LOGGER.info("Dynamic API-based monitoring enabled")
         else:
             self.dynamic_monitor = None
+            self.store_index = None
+            self.alert_tracker = None
+            self.outbox = None
             _LOGGER.error(
                 "Dynamic monitoring not available - system will not work properly"
             )
 
-    def check_stock(self) -> Dict:
-        """Check stock for all configured stores and products with individual tracking."""
-        results = {
+        self._product_misses: Dict[str, datetime] = {}
+        self._category_crawls: Dict[str, datetime] = {}
+        self._unresolved_stores = set()
+        self._store_discovery_attempts: Dict[str, datetime] = {}
+        self._store_refresh_lock = threading.Lock()
+        self._store_refresh_thread: Optional[threading.Thread] = None
+
+        if self._store_index_stale():
+            self.schedule_store_index_refresh()
+
+    async def async_check_stock(
+        self,
+        watchlist: CompiledWatchlist,
+        fetcher,
+        previous: Optional[Dict] = None,
+    ) -> Tuple[Dict, List[tuple]]:
+        """Check stock on the event loop with one concurrent request per product.
+
+        Returns the results and the stock check rows for persist_cycle or
+        AppleStoreHub._record, which do the blocking database writes and queue
+        the alerts. Pairs the cycle deadline cut off keep their result from
+        previous, marked stale.
+        """
+        results = self._new_results()
+        stock_rows = []
+
+        if not self.dynamic_monitor:
+            _LOGGER.error("Dynamic monitor not available - cannot check stock")
+            return results, stock_rows
+
+        pairs_by_product = watchlist.by_product()
+        responses = await fetcher.async_fetch_products(pairs_by_product, CYCLE_DEADLINE)
+        previous_results = (previous or {}).get("individual_results", {})
+
+        for product_code, pairs in pairs_by_product.items():
+            data = responses[product_code]
+            check_timestamp = datetime.now().isoformat()
+
+            for pair in pairs:
+                if isinstance(data, CycleDeadlineExceeded):
+                    self._record_timeout(
+                        results, pair, previous_results.get(pair.key), check_timestamp
+                    )
+                    continue
+
+                if isinstance(data, BaseException):
+                    _LOGGER.error(
+                        f"Error checking {pair.product_name} at {pair.store_name}: {data}"
+                    )
+                    self._record_error(results, pair, data, check_timestamp)
+                    continue
+
+                availability_result = self.dynamic_monitor.parse_availability(
+                    data, product_code, pair.store_code
+                )
+                available = self._record_result(
+                    results, pair, availability_result, check_timestamp
+                )
+
+                if availability_result["status"] != "not_found":
+                    stock_rows.append(
+                        (
+                            check_timestamp,
+                            pair.store_code,
+                            product_code,
+                            available,
+                            availability_result["status"],
+                            data,
+                        )
+                    )
+
+        return results, stock_rows
+
+    def persist_cycle(self, results: Dict, stock_rows: List[tuple]) -> int:
+        """Save a cycle's stock checks and queue its alerts; returns the count."""
+        self.save_stock_rows(stock_rows)
+        return self.queue_alerts(results)
+
+    def save_stock_rows(self, stock_rows: List[tuple]):
+        """Save stock check rows from async_check_stock in one batch."""
+        if not stock_rows:
+            return
+
+        raw_responses = {}
+        rows = []
+        for row in stock_rows:
+            data = row[-1]
+            if id(data) not in raw_responses:
+                raw_responses[id(data)] = json.dumps(data)
+            rows.append(row[:-1] + (raw_responses[id(data)],))
+
+        self.dynamic_monitor.save_stock_checks(rows)
+
+    def due_alerts(self, results: Dict) -> List[Dict]:
+        """Return the available items this entry should alert about.
+
+        Only pairs that just came into stock alert; the tracker applies the
+        cooldown and re-alert policy and persists the per-pair state.
+        """
+        if not self.sms_gateway_url:
+            return []
+
+        if self.alert_tracker is None:
+            return results["available_items"]
+        return self.alert_tracker.due_alerts(self.sms_gateway_url, results)
+
+    def alert_digest(self, items: List[Dict]) -> List[SMSMessage]:
+        """Build the digest of due items for this entry's SMS gateway."""
+        return build_digest(
+            self.sms_gateway_url,
+            items,
+            self._store_distances({item["store_code"] for item in items}),
+        )
+
+    def _store_distances(self, store_codes) -> Dict[str, float]:
+        """Return miles from the home zipcode to each store, where known."""
+        if not self.home_zipcode or not store_codes or not self.dynamic_monitor:
+            return {}
+
+        home = get_zipcode_coordinates(self.home_zipcode)
+        if home is None:
+            return {}
+
+        # Rebuilt only when the store catalog was refreshed
+        updated = self.store_index.updated if self.store_index is not None else None
+        if self._spatial_index is None or self._spatial_index_built != updated:
+            self._spatial_index = StoreSpatialIndex.from_database(
+                self.dynamic_monitor.db_path
+            )
+            self._spatial_index_built = updated
+
+        nearest = self._spatial_index.nearest(
+            [home], k=len(store_codes), store_codes=store_codes
+        )[0]
+        return {store["code"]: store["distance"] for store in nearest}
+
+    def queue_alerts(self, results: Dict) -> int:
+        """Queue the alerts a cycle's results make due; returns how many."""
+        if self.outbox is None:
+            return 0
+        return self.outbox.enqueue(self.alert_digest(self.due_alerts(results)))
+
+    def set_alert_policy(
+        self, cooldown: timedelta, realert_interval: Optional[timedelta] = None
+    ):
+        """Change the alert cooldown and re-alert interval."""
+        if self.alert_tracker is not None:
+            self.alert_tracker.cooldown = cooldown
+            self.alert_tracker.realert_interval = realert_interval
+
+    def merge_results(
+        self, previous: Optional[Dict], update: Dict, watchlist: CompiledWatchlist
+    ) -> Dict:
+        """Merge a partial check into the previous results for the current watchlist.
+
+        Pairs no longer in the watchlist are dropped and the totals rebuilt, so
+        a config change only needs to check the pairs it added.
+        """
+        results = self._new_results()
+        results["timestamp"] = update["timestamp"]
+
+        individual_results = dict((previous or {}).get("individual_results", {}))
+        individual_results.update(update["individual_results"])
+
+        for pair in watchlist.pairs:
+            individual_result = individual_results.get(pair.key)
+            if individual_result is None:
+                continue
+
+            if individual_result["status"] == "error":
+                results["individual_results"][pair.key] = individual_result
+            else:
+                self._record_result(
+                    results,
+                    pair,
+                    individual_result.get("api_response", individual_result),
+                    individual_result["last_checked"],
+                )
+
+            # Restored pairs stay stale until they are checked again
+            if individual_result.get("stale"):
+                results["individual_results"][pair.key]["stale"] = True
+                results["stale"] = True
+
+        return results
+
+    def _new_results(self) -> Dict:
+        """Return an empty results structure for one check cycle."""
+        return {
             "timestamp": datetime.now().isoformat(),
             "stores_checked": len(self.stores),
             "products_checked": len(self.products),
@@ -58,177 +284,278 @@ class AppleStoreMonitor:
             "product_details": {},  # Product information for each item
         }
 
-        if not self.dynamic_monitor:
-            _LOGGER.error("Dynamic monitor not available - cannot check stock")
-            return results
+    def _record_result(
+        self,
+        results: Dict,
+        pair: WatchlistPair,
+        availability_result: Dict,
+        check_timestamp: str,
+    ) -> bool:
+        """Add one availability result to the cycle results, returning availability."""
+        available = availability_result.get("available", False)
+
+        # Individual tracking for each product/store combination
+        results["individual_results"][pair.key] = {
+            "product_name": pair.product_name,
+            "product_code": pair.product_code,
+            "store_name": pair.store_name,
+            "store_code": pair.store_code,
+            "available": available,
+            "status": availability_result.get("status", "unknown"),
+            "last_checked": check_timestamp,
+            "pickup_available": available,
+            "api_response": availability_result,
+        }
+        results["last_check_times"][pair.product_code] = check_timestamp
+        results["product_details"][pair.product_code] = {
+            "name": pair.product_name,
+            "code": pair.product_code,
+            "category": pair.category,
+        }
 
-        for store_name in self.stores:
-            # Get store code dynamically
-            store_code = self._get_store_code(store_name)
-            if not store_code:
-                _LOGGER.warning(f"Could not find store code for: {store_name}")
-                continue
+        if available:
+            results["available_items"].append(
+                {
+                    "store": pair.store_name,
+                    "product": pair.product_name,
+                    "product_code": pair.product_code,
+                    "store_code": pair.store_code,
+                    "available": True,
+                    "pickup_available": True,
+                    "last_checked": check_timestamp,
+                }
+            )
+            results["total_available"] += 1
 
-            for product_name in self.products:
-                # Get product code dynamically
-                product_code = self._get_product_code(product_name)
-                if not product_code:
-                    _LOGGER.warning(f"Could not find product code for: {product_name}")
-                    continue
+            _LOGGER.info(f"Stock available: {pair.product_name} at {pair.store_name}")
 
-                # Create unique key for this product/store combination
-                product_store_key = f"{product_code}_{store_code}"
-                check_timestamp = datetime.now().isoformat()
+        return available
 
-                try:
-                    # Use dynamic monitor for availability check
-                    availability_result = (
-                        self.dynamic_monitor.check_product_availability(
-                            product_code, store_code
-                        )
-                    )
+    def _record_error(
+        self,
+        results: Dict,
+        pair: WatchlistPair,
+        error: BaseException,
+        check_timestamp: str,
+    ):
+        """Still record a failed check for individual tracking."""
+        results["individual_results"][pair.key] = {
+            "product_name": pair.product_name,
+            "product_code": pair.product_code,
+            "store_name": pair.store_name,
+            "store_code": pair.store_code,
+            "available": False,
+            "status": "error",
+            "last_checked": check_timestamp,
+            "error": str(error),
+            "pickup_available": False,
+        }
 
-                    # Individual tracking for each product/store combination
-                    individual_result = {
-                        "product_name": product_name,
-                        "product_code": product_code,
-                        "store_name": store_name,
-                        "store_code": store_code,
-                        "available": availability_result.get("available", False),
-                        "status": availability_result.get("status", "unknown"),
-                        "last_checked": check_timestamp,
-                        "pickup_available": availability_result.get("available", False),
-                        "api_response": availability_result,
-                    }
-
-                    results["individual_results"][product_store_key] = individual_result
-                    results["last_check_times"][product_code] = check_timestamp
-                    results["product_details"][product_code] = {
-                        "name": product_name,
-                        "code": product_code,
-                        "category": self._detect_product_category(product_name),
-                    }
-
-                    if availability_result.get("available", False):
-                        item = {
-                            "store": store_name,
-                            "product": product_name,
-                            "product_code": product_code,
-                            "store_code": store_code,
-                            "available": True,
-                            "pickup_available": True,
-                            "last_checked": check_timestamp,
-                        }
-                        results["available_items"].append(item)
-                        results["total_available"] += 1
-
-                        # Send notification if SMS gateway is configured
-                        if self.sms_gateway_url:
-                            self._send_sms_notification(store_name, product_name)
-
-                        _LOGGER.info(f"Stock available: {product_name} at {store_name}")
-
-                except Exception as e:
-                    _LOGGER.error(f"Error checking {product_name} at {store_name}: {e}")
-
-                    # Still record the failed check for individual tracking
-                    individual_result = {
-                        "product_name": product_name,
-                        "product_code": product_code,
-                        "store_name": store_name,
-                        "store_code": store_code,
-                        "available": False,
-                        "status": "error",
-                        "last_checked": check_timestamp,
-                        "error": str(e),
-                        "pickup_available": False,
-                    }
-                    results["individual_results"][product_store_key] = individual_result
-
-                # Rate limiting
-                time.sleep(1)
+    def _record_timeout(
+        self,
+        results: Dict,
+        pair: WatchlistPair,
+        previous_result: Optional[Dict],
+        check_timestamp: str,
+    ):
+        """Carry a pair the cycle deadline cut off over from the last cycle, stale."""
+        if previous_result and previous_result["status"] not in ("error", "timeout"):
+            self._record_result(
+                results,
+                pair,
+                previous_result.get("api_response", previous_result),
+                previous_result["last_checked"],
+            )
+        else:
+            results["individual_results"][pair.key] = {
+                "product_name": pair.product_name,
+                "product_code": pair.product_code,
+                "store_name": pair.store_name,
+                "store_code": pair.store_code,
+                "available": False,
+                "status": "timeout",
+                "last_checked": check_timestamp,
+                "pickup_available": False,
+            }
+
+        results["individual_results"][pair.key]["stale"] = True
+        results["stale"] = True
+
+    def get_watchlist(self) -> CompiledWatchlist:
+        """Return the compiled watchlist, compiling it on first use."""
+        if self._store_index_stale():
+            self.schedule_store_index_refresh()
+
+        watchlist = self.watchlist
+        if watchlist is None or not watchlist.matches(self.stores, self.products):
+            return self.compile_watchlist()
+
+        # Names that missed may resolve once the index refresh or miss TTL has passed
+        if not watchlist.complete and (
+            (self.store_index.updated or datetime.min) > watchlist.compiled_at
+            or datetime.now() - watchlist.compiled_at > PRODUCT_MISS_TTL
+        ):
+            return self.compile_watchlist()
+
+        return watchlist
+
+    def compile_watchlist(self) -> CompiledWatchlist:
+        """Resolve every configured name to a code once."""
+        watchlist = CompiledWatchlist.compile(
+            self.stores,
+            self.products,
+            self._get_store_code,
+            self._get_product_code,
+            self._detect_product_category,
+        )
+
+        _LOGGER.debug(
+            f"Compiled watchlist with {len(watchlist.pairs)} pairs "
+            f"({len(watchlist.unresolved_stores)} stores and "
+            f"{len(watchlist.unresolved_products)} products unresolved)"
+        )
+        self.watchlist = watchlist
+        return watchlist
+
+    def update_watchlist(self, stores: List[str], products: List[str]):
+        """Apply changed config entry names, recompiling only if they changed."""
+        self.stores = stores
+        self.products = products
 
-        return results
+        if self.watchlist is None or not self.watchlist.matches(stores, products):
+            self.compile_watchlist()
 
     def _get_store_code(self, store_name: str) -> Optional[str]:
-        """Get store code dynamically from database or API."""
-        if not self.dynamic_monitor:
+        """Get store code from the name index, scheduling a refresh on a miss."""
+        if self.store_index is None:
             return None
 
-        try:
-            # First try to get from database
-            stores = self.dynamic_monitor.get_stores_by_location()
-            for store in stores:
-                if store["store_name"].lower() == store_name.lower():
-                    return store["store_code"]
+        store_code = self.store_index.lookup(store_name)
+        if store_code:
+            return store_code
+
+        with self._store_refresh_lock:
+            newly_missing = store_name not in self._unresolved_stores
+            self._unresolved_stores.add(store_name)
+
+        # Known misses are retried by the periodic refresh, not on every cycle
+        if newly_missing:
+            self.schedule_store_index_refresh()
+        return None
 
-            # If not found, try to discover stores and search again
-            _LOGGER.info(
-                f"Store '{store_name}' not in database, attempting discovery..."
+    def _store_index_stale(self) -> bool:
+        """Return True if the store name index is missing or too old."""
+        if self.store_index is None:
+            return False
+
+        updated = self.store_index.updated
+        return updated is None or datetime.now() - updated > STORE_INDEX_MAX_AGE
+
+    def schedule_store_index_refresh(self):
+        """Refresh the store name index on a background thread."""
+        if self.store_index is None:
+            return
+
+        with self._store_refresh_lock:
+            if self._store_refresh_thread and self._store_refresh_thread.is_alive():
+                return
+
+            self._store_refresh_thread = threading.Thread(
+                target=self.refresh_store_index,
+                name="apple_store_index_refresh",
+                daemon=True,
             )
+            self._store_refresh_thread.start()
 
-            # Try to discover stores near common zipcodes
-            test_zipcodes = [
-                "10001",
-                "90210",
-                "97223",
-                "60601",
-                "33101",
-            ]  # Major cities
-
-            for zipcode in test_zipcodes:
-                discovered_stores = self.dynamic_monitor.discover_all_apple_stores(
-                    zipcode
+    def refresh_store_index(self):
+        """Rebuild the store name index, discovering stores for unknown names."""
+        try:
+            stores = self.dynamic_monitor.get_stores_by_location()
+            self.store_index.rebuild(stores)
+
+            now = datetime.now()
+            with self._store_refresh_lock:
+                missing = {
+                    name
+                    for name in self._unresolved_stores
+                    if not self.store_index.lookup(name)
+                    and now - self._store_discovery_attempts.get(name, datetime.min)
+                    > STORE_INDEX_MAX_AGE
+                }
+                for name in missing:
+                    self._store_discovery_attempts[name] = now
+
+            if missing:
+                _LOGGER.info(
+                    f"Stores {sorted(missing)} not in database, attempting discovery..."
                 )
-                for store in discovered_stores:
-                    if store["store_name"].lower() == store_name.lower():
-                        return store["store_code"]
 
-            _LOGGER.warning(f"Could not find store code for: {store_name}")
-            return None
+                from store_crawler import StoreCatalogCrawler
+
+                StoreCatalogCrawler(
+                    self.dynamic_monitor, seeds=STORE_DISCOVERY_ZIPCODES
+                ).crawl()
+                self.store_index.rebuild(self.dynamic_monitor.get_stores_by_location())
+
+            with self._store_refresh_lock:
+                self._unresolved_stores = {
+                    name
+                    for name in self._unresolved_stores
+                    if not self.store_index.lookup(name)
+                }
+                for store_name in self._unresolved_stores:
+                    _LOGGER.warning(f"Could not find store code for: {store_name}")
 
         except Exception as e:
-            _LOGGER.error(f"Error getting store code for {store_name}: {e}")
-            return None
+            _LOGGER.error(f"Error refreshing store name index: {e}")
 
     def _get_product_code(self, product_name: str) -> Optional[str]:
-        """Get product code dynamically from database or API."""
+        """Get product code from the product index, discovering its category on a miss."""
         if not self.dynamic_monitor:
             return None
 
+        now = datetime.now()
+        miss_key = product_name.casefold()
+        if self._product_misses.get(miss_key, datetime.min) > now:
+            return None
+
         try:
-            # First try exact search in database
-            products = self.dynamic_monitor.search_products(product_name)
-            if products:
-                # Return the first exact match
-                for product in products:
-                    if product["product_name"].lower() == product_name.lower():
-                        return product["product_code"]
-                # If no exact match, return first partial match
-                return products[0]["product_code"]
-
-            # If not found, try to discover products
-            _LOGGER.info(
-                f"Product '{product_name}' not in database, attempting discovery..."
-            )
+            product_code = self._search_product_code(product_name)
+            if product_code:
+                self._product_misses.pop(miss_key, None)
+                return product_code
 
-            # Try to discover products by category
+            # Only crawl the category this name belongs to, once per TTL
             category = self._detect_product_category(product_name)
-            if category:
-                self.dynamic_monitor.discover_all_apple_products()
+            last_crawl = self._category_crawls.get(category, datetime.min)
+            if category != "unknown" and now - last_crawl > PRODUCT_MISS_TTL:
+                _LOGGER.info(
+                    f"Product '{product_name}' not in database, discovering {category} products..."
+                )
+                self._category_crawls[category] = now
+                self.dynamic_monitor.discover_category_products(category)
 
-                # Search again after discovery
-                products = self.dynamic_monitor.search_products(product_name)
-                if products:
-                    return products[0]["product_code"]
+                product_code = self._search_product_code(product_name)
+                if product_code:
+                    return product_code
 
             _LOGGER.warning(f"Could not find product code for: {product_name}")
+            self._product_misses[miss_key] = now + PRODUCT_MISS_TTL
             return None
 
         except Exception as e:
             _LOGGER.error(f"Error getting product code for {product_name}: {e}")
             return None
 
+    def _search_product_code(self, product_name: str) -> Optional[str]:
+        """Return the exact-name match, else the best ranked product match."""
+        products = self.dynamic_monitor.search_products(product_name)
+        for product in products:
+            if product["product_name"].casefold() == product_name.casefold():
+                return product["product_code"]
+
+        return products[0]["product_code"] if products else None
+
     def _detect_product_category(self, product_name: str) -> str:
         """Detect product category from name."""
         product_lower = product_name.lower()
@@ -250,28 +577,6 @@ class AppleStoreMonitor:
         else:
             return "unknown"
 
-    def _send_sms_notification(self, store_name: str, product_name: str):
-        """Send SMS notification via the SMS gateway."""
-        if not self.sms_gateway_url:
-            return
-
-        message = f"🍎 STOCK ALERT: {product_name} is available for pickup at Apple {store_name}!"
-
-        try:
-            response = requests.post(
-                f"{self.sms_gateway_url}/send_sms",
-                json={"message": message},
-                timeout=10,
-            )
-
-            if response.status_code == 200:
-                _LOGGER.info(f"SMS notification sent: {message}")
-            else:
-                _LOGGER.error(f"Failed to send SMS: {response.status_code}")
-
-        except Exception as e:
-            _LOGGER.error(f"Error sending SMS notification: {e}")
-
     def get_restock_predictions(self) -> Dict:
         """Get restock predictions for all monitored products."""
         if not self.dynamic_monitor:
@@ -279,43 +584,37 @@ class AppleStoreMonitor:
 
         predictions = {"timestamp": datetime.now().isoformat(), "predictions": []}
 
-        for store_name in self.stores:
-            store_code = self._get_store_code(store_name)
-            if not store_code:
-                continue
+        for pair in self.get_watchlist().pairs:
+            store_name, store_code = pair.store_name, pair.store_code
+            product_name, product_code = pair.product_name, pair.product_code
 
-            for product_name in self.products:
-                product_code = self._get_product_code(product_name)
-                if not product_code:
-                    continue
-
-                try:
-                    # Use the restock analyzer if available
-                    if hasattr(self.dynamic_monitor, "analyzer"):
-                        patterns = self.dynamic_monitor.analyzer.get_restock_patterns(
-                            store_code, product_code
-                        )
-                        prediction = self.dynamic_monitor.analyzer.predict_next_restock(
-                            store_code, product_code
-                        )
-                    else:
-                        patterns = {"message": "Pattern analysis not available"}
-                        prediction = {"prediction": "Prediction not available"}
-
-                    prediction_summary = {
-                        "store": store_name,
-                        "product": product_name,
-                        "store_code": store_code,
-                        "product_code": product_code,
-                        "patterns": patterns,
-                        "prediction": prediction,
-                    }
-
-                    predictions["predictions"].append(prediction_summary)
-
-                except Exception as e:
-                    _LOGGER.error(
-                        f"Error getting prediction for {product_name} at {store_name}: {e}"
+            try:
+                # Use the restock analyzer if available
+                if hasattr(self.dynamic_monitor, "analyzer"):
+                    patterns = self.dynamic_monitor.analyzer.get_restock_patterns(
+                        store_code, product_code
+                    )
+                    prediction = self.dynamic_monitor.analyzer.predict_next_restock(
+                        store_code, product_code
                     )
+                else:
+                    patterns = {"message": "Pattern analysis not available"}
+                    prediction = {"prediction": "Prediction not available"}
+
+                prediction_summary = {
+                    "store": store_name,
+                    "product": product_name,
+                    "store_code": store_code,
+                    "product_code": product_code,
+                    "patterns": patterns,
+                    "prediction": prediction,
+                }
+
+                predictions["predictions"].append(prediction_summary)
+
+            except Exception as e:
+                _LOGGER.error(
+                    f"Error getting prediction for {product_name} at {store_name}: {e}"
+                )
 
         return predictions
@@ -4,9 +4,9 @@ from homeassistant.components.binary_sensor import BinarySensorEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN
+from .entity import AppleStoreChangeEntity
 
 
 async def async_setup_entry(
@@ -24,9 +24,12 @@ async def async_setup_entry(
     async_add_entities(entities)
 
 
-class AppleStoreAvailabilityBinarySensor(CoordinatorEntity, BinarySensorEntity):
+class AppleStoreAvailabilityBinarySensor(AppleStoreChangeEntity, BinarySensorEntity):
     """Binary sensor for Apple Store stock availability."""
 
+    # Changes every cycle, so keep it out of recorder history
+    _unrecorded_attributes = frozenset({"last_check"})
+
     def __init__(self, coordinator, config_entry):
         """Initialize the binary sensor."""
         super().__init__(coordinator)
@@ -39,26 +42,11 @@ class AppleStoreAvailabilityBinarySensor(CoordinatorEntity, BinarySensorEntity):
     @property
     def is_on(self):
         """Return true if stock is available."""
-        if self.coordinator.data:
-            return self.coordinator.data.get("total_available", 0) > 0
-        return False
+        snapshot = self.coordinator.snapshot
+        return snapshot["binary_on"] if snapshot else False
 
     @property
     def extra_state_attributes(self):
         """Return additional state attributes."""
-        if not self.coordinator.data:
-            return {}
-
-        available_items = self.coordinator.data.get("available_items", [])
-        configured_stores = self.config_entry.data.get("stores", [])
-        configured_products = self.config_entry.data.get("products", [])
-
-        return {
-            "available_count": len(available_items),
-            "available_products": [item["product"] for item in available_items],
-            "available_stores": [item["store"] for item in available_items],
-            "last_check": self.coordinator.data.get("timestamp"),
-            "monitoring_stores": configured_stores,
-            "monitoring_products": configured_products,
-            "status_message": f"Monitoring {len(configured_products)} iPhone models at {len(configured_stores)} stores",
-        }
+        snapshot = self.coordinator.snapshot
+        return snapshot["binary_attributes"] if snapshot else {}
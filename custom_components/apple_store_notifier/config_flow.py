@@ -12,7 +12,12 @@ from .const import (
     CONF_SMS_GATEWAY_URL,
     CONF_CHECK_INTERVAL,
     CONF_PHONE_NUMBERS,
+    CONF_HOME_ZIPCODE,
+    CONF_ALERT_COOLDOWN,
+    CONF_REALERT_INTERVAL,
     DEFAULT_CHECK_INTERVAL,
+    DEFAULT_ALERT_COOLDOWN,
+    DEFAULT_REALERT_INTERVAL,
     DEFAULT_SMS_GATEWAY_URL,
     APPLE_STORES,
     IPHONE_MODELS,
@@ -52,6 +57,13 @@ class AppleStoreNotifierConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     CONF_PRODUCTS, default=product_options[:3]
                 ): cv.multi_select(product_options),
                 vol.Optional(CONF_PHONE_NUMBERS, default=""): str,
+                vol.Optional(CONF_HOME_ZIPCODE, default=""): str,
+                vol.Optional(
+                    CONF_ALERT_COOLDOWN, default=DEFAULT_ALERT_COOLDOWN
+                ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                vol.Optional(
+                    CONF_REALERT_INTERVAL, default=DEFAULT_REALERT_INTERVAL
+                ): vol.All(vol.Coerce(int), vol.Range(min=0)),
             }
         )
 
@@ -119,6 +131,22 @@ class AppleStoreNotifierOptionsFlow(config_entries.OptionsFlow):
                     CONF_PHONE_NUMBERS,
                     default=self.config_entry.data.get(CONF_PHONE_NUMBERS, ""),
                 ): str,
+                vol.Optional(
+                    CONF_HOME_ZIPCODE,
+                    default=self.config_entry.data.get(CONF_HOME_ZIPCODE, ""),
+                ): str,
+                vol.Optional(
+                    CONF_ALERT_COOLDOWN,
+                    default=self.config_entry.data.get(
+                        CONF_ALERT_COOLDOWN, DEFAULT_ALERT_COOLDOWN
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                vol.Optional(
+                    CONF_REALERT_INTERVAL,
+                    default=self.config_entry.data.get(
+                        CONF_REALERT_INTERVAL, DEFAULT_REALERT_INTERVAL
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0)),
             }
         )
 
@@ -1,6 +1,9 @@
 """Constants for Apple Store Notifier."""
 
+from datetime import timedelta
+
 DOMAIN = "apple_store_notifier"
+DATA_HUB = "hub"  # hass.data[DOMAIN] key of the polling hub shared by all entries
 PLATFORMS = ["sensor", "binary_sensor"]
 
 # Configuration keys
@@ -9,14 +12,53 @@ CONF_PRODUCTS = "products"
 CONF_SMS_GATEWAY_URL = "sms_gateway_url"
 CONF_CHECK_INTERVAL = "check_interval"
 CONF_PHONE_NUMBERS = "phone_numbers"
+CONF_ALERT_COOLDOWN = "alert_cooldown"
+CONF_REALERT_INTERVAL = "realert_interval"
+CONF_HOME_ZIPCODE = "home_zipcode"
 
 # Default values
 DEFAULT_CHECK_INTERVAL = 10  # 10 minutes for less frequent checks
 DEFAULT_SMS_GATEWAY_URL = "http://192.168.1.100:5000"
+DEFAULT_ALERT_COOLDOWN = 60  # minutes before a pair that flapped can alert again
+DEFAULT_REALERT_INTERVAL = 0  # minutes between reminders while in stock; 0 = never
 
 # API Configuration
 APPLE_PICKUP_API_URL = "https://www.apple.com/shop/retail/pickup-message"
 APPLE_STORE_DISCOVERY_ZIPCODE = "10001"  # Default zipcode for store discovery
+MAX_CONCURRENT_REQUESTS = 4
+REQUEST_TIMEOUT = 30  # seconds
+CYCLE_DEADLINE = 60  # seconds before a cycle publishes without slow requests
+MAX_CONCURRENT_SMS = 20
+SMS_REQUEST_TIMEOUT = 10  # seconds
+DIGEST_MAX_SEGMENTS = 3  # longest concatenated SMS before a digest is split
+
+# Notification outbox
+OUTBOX_BATCH_SIZE = 50
+OUTBOX_MAX_ATTEMPTS = 6
+OUTBOX_RETRY_BACKOFF = timedelta(seconds=30)  # doubles on every failed attempt
+OUTBOX_MAX_BACKOFF = timedelta(minutes=30)
+OUTBOX_CLAIM_LEASE = timedelta(minutes=15)  # claimed messages are retried after this
+OUTBOX_IDLE_INTERVAL = 300  # seconds between outbox sweeps when nothing is due
+OUTBOX_RETENTION = timedelta(days=7)  # how long sent/failed messages are kept
+STORE_DISCOVERY_ZIPCODES = ["10001", "90210", "97223", "60601", "33101"]
+STORE_INDEX_MAX_AGE = timedelta(hours=24)
+PRODUCT_MISS_TTL = timedelta(hours=6)  # Negative cache for unresolvable product names
+
+# Change detection: result fields whose change warrants a new entity state
+SIGNIFICANT_RESULT_FIELDS = (
+    "available",
+    "status",
+    "pickup_available",
+    "error",
+    "product_name",
+    "store_name",
+    "stale",
+)
+SUMMARY_KEY = "summary"  # Change key for entities built from the whole result
+
+# Last-known result persisted for warm starts
+SNAPSHOT_STORAGE_VERSION = 1
+SNAPSHOT_SAVE_DELAY = 10  # seconds; coalesces writes from back-to-back refreshes
 
 # Database paths
 PRODUCTS_DB_PATH = "apple_products.db"
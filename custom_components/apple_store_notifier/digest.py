@@ -0,0 +1,130 @@
+"""Per-cycle alert digests split to SMS segment limits."""
+
+import math
+from typing import Dict, List, Optional
+
+from .const import DIGEST_MAX_SEGMENTS
+from .sms_dispatcher import SMSMessage
+
+# GSM 03.38 default alphabet; the extension characters take two septets
+GSM7_BASIC = (
+    "@£$¥èéùìòÇ\nØø\rÅåΔ_ΦΓΛΩΠΨΣΘΞÆæßÉ !\"#¤%&'()*+,-./0123456789:;<=>?"
+    "¡ABCDEFGHIJKLMNOPQRSTUVWXYZÄÖÑÜ§¿abcdefghijklmnopqrstuvwxyzäöñüà"
+)
+GSM7_EXTENSION = "^{}\\[~]|€\f"
+_GSM7_BASIC = frozenset(GSM7_BASIC)
+_GSM7_EXTENSION = frozenset(GSM7_EXTENSION)
+
+# (single message limit, per-segment limit once concatenated)
+GSM7_LIMITS = (160, 153)
+UCS2_LIMITS = (70, 67)
+
+
+def _gsm7_length(text: str) -> Optional[int]:
+    """Return the length in septets, or None if the text needs UCS-2."""
+    length = 0
+    for char in text:
+        if char in _GSM7_BASIC:
+            length += 1
+        elif char in _GSM7_EXTENSION:
+            length += 2
+        else:
+            return None
+    return length
+
+
+def sms_segments(text: str) -> int:
+    """Return how many SMS segments a text is billed as."""
+    length = _gsm7_length(text)
+    limits = GSM7_LIMITS
+    if length is None:
+        # UCS-2 counts UTF-16 code units, so emoji take two
+        length = sum(2 if ord(char) > 0xFFFF else 1 for char in text)
+        limits = UCS2_LIMITS
+
+    single, concatenated = limits
+    return 1 if length <= single else math.ceil(length / concatenated)
+
+
+def split_sms(
+    lines: List[str], max_segments: int = DIGEST_MAX_SEGMENTS, reserve: str = ""
+) -> List[str]:
+    """Pack lines into as few messages as fit within max_segments each.
+
+    reserve is text that will be prepended to every message, such as a
+    part counter, and is counted against the limit.
+    """
+
+    def fits(text: str) -> bool:
+        return sms_segments(reserve + text) <= max_segments
+
+    messages = []
+    current = ""
+
+    for line in lines:
+        candidate = f"{current}\n{line}" if current else line
+        if fits(candidate):
+            current = candidate
+            continue
+
+        if current:
+            messages.append(current)
+        current = line
+
+        # A single line over the limit is cut wherever it has to be
+        while not fits(current):
+            cut = len(current)
+            while not fits(current[:cut]):
+                cut -= 1
+            messages.append(current[:cut])
+            current = current[cut:]
+
+    if current:
+        messages.append(current)
+
+    return messages
+
+
+def build_digest(
+    gateway_url: str,
+    items: List[Dict],
+    store_distances: Optional[Dict[str, float]] = None,
+    max_segments: int = DIGEST_MAX_SEGMENTS,
+) -> List[SMSMessage]:
+    """Coalesce one cycle's new availabilities into as few messages as fit.
+
+    Items are grouped by store, closest store first when distances are
+    known, and the text is split only where SMS segment limits require.
+    """
+    if not items:
+        return []
+
+    if len(items) == 1:
+        item = items[0]
+        text = f"🍎 STOCK ALERT: {item['product']} is available for pickup at Apple {item['store']}!"
+        return [SMSMessage(gateway_url, text)]
+
+    store_distances = store_distances or {}
+    by_store: Dict[str, List[Dict]] = {}
+    for item in items:
+        by_store.setdefault(item["store_code"], []).append(item)
+
+    def store_order(store_code: str):
+        distance = store_distances.get(store_code)
+        return (distance is None, distance or 0, by_store[store_code][0]["store"])
+
+    lines = [f"🍎 STOCK ALERT: {len(items)} items available for pickup"]
+    for store_code in sorted(by_store, key=store_order):
+        store_items = by_store[store_code]
+        distance = store_distances.get(store_code)
+        suffix = f" ({distance:.0f} mi)" if distance is not None else ""
+        products = ", ".join(item["product"] for item in store_items)
+        lines.append(f"Apple {store_items[0]['store']}{suffix}: {products}")
+
+    parts = split_sms(lines, max_segments)
+    if len(parts) > 1:
+        # Re-split leaving room for the "(2/3) " part counter
+        parts = split_sms(lines, max_segments, reserve="(99/99) ")
+        parts = [f"({i}/{len(parts)}) {part}" for i, part in enumerate(parts, 1)]
+
+    return [SMSMessage(gateway_url, part) for part in parts]
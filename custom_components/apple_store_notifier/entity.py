@@ -0,0 +1,29 @@
+"""Base entity for Apple Store Notifier."""
+
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import SUMMARY_KEY
+
+
+class AppleStoreChangeEntity(CoordinatorEntity):
+    """Coordinator entity that only writes state when its own data changed."""
+
+    _change_key = SUMMARY_KEY
+
+    def __init__(self, coordinator):
+        """Initialize the entity."""
+        super().__init__(coordinator)
+        self._last_update_success = coordinator.last_update_success
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only if this entity's result or availability changed."""
+        success = self.coordinator.last_update_success
+        if success == self._last_update_success and not self.coordinator.has_changed(
+            self._change_key
+        ):
+            return
+
+        self._last_update_success = success
+        self.async_write_ha_state()
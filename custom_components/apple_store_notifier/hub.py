@@ -0,0 +1,345 @@
+"""Shared polling hub for all Apple Store Notifier config entries."""
+
+import asyncio
+import logging
+import time
+from contextlib import nullcontext
+from datetime import timedelta
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.event import async_track_time_interval
+
+from .const import (
+    CYCLE_DEADLINE,
+    DATA_HUB,
+    DOMAIN,
+    MAX_CONCURRENT_REQUESTS,
+    OUTBOX_IDLE_INTERVAL,
+    REQUEST_TIMEOUT,
+)
+from .sms_dispatcher import AsyncSMSDispatcher
+from .stock_fetcher import AsyncStockFetcher
+
+if TYPE_CHECKING:
+    from . import AppleStoreCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class PrefetchedResponses:
+    """Fetcher stand-in that serves responses the hub already fetched."""
+
+    def __init__(self, responses: Dict):
+        """Initialize with product code -> response (or exception)."""
+        self._responses = responses
+
+    async def async_fetch_products(
+        self, product_codes: Iterable[str], deadline: Optional[float] = None
+    ) -> Dict:
+        """Return the prefetched responses for the given products."""
+        return {code: self._responses[code] for code in product_codes}
+
+
+class AppleStoreHub:
+    """Poll Apple once for the union of every config entry's watchlist."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        dynamic_monitor,
+        store_index,
+        outbox=None,
+        metrics=None,
+    ):
+        """Initialize the hub with the resources shared by every entry."""
+        self.hass = hass
+        self.dynamic_monitor = dynamic_monitor
+        self.store_index = store_index
+        self.outbox = outbox
+        self.metrics = metrics
+        self.fetcher = AsyncStockFetcher(
+            async_get_clientsession(hass),
+            max_concurrency=MAX_CONCURRENT_REQUESTS,
+            request_timeout=REQUEST_TIMEOUT,
+            metrics=metrics,
+        )
+        self.sms = AsyncSMSDispatcher(async_get_clientsession(hass))
+        self._coordinators: Dict[str, "AppleStoreCoordinator"] = {}
+        # Entry whose sensor platform exposes the process-wide metrics
+        self._metrics_entry_id: Optional[str] = None
+        self._interval: Optional[timedelta] = None
+        self._unsub_timer = None
+        self._lock = asyncio.Lock()
+        self._outbox_wakeup = asyncio.Event()
+        self._outbox_task: Optional[asyncio.Task] = None
+
+    @classmethod
+    async def async_get(cls, hass: HomeAssistant) -> "AppleStoreHub":
+        """Return the hub for this Home Assistant instance, creating it once."""
+        domain_data = hass.data.setdefault(DOMAIN, {})
+        lock = domain_data.setdefault(f"{DATA_HUB}_lock", asyncio.Lock())
+
+        async with lock:
+            if DATA_HUB not in domain_data:
+                from . import apple_monitor
+
+                dynamic_monitor = store_index = outbox = None
+                if apple_monitor.DYNAMIC_FEATURES_AVAILABLE:
+                    # One product database, store index and outbox for every entry
+                    dynamic_monitor = await hass.async_add_executor_job(
+                        apple_monitor.DynamicAppleMonitor
+                    )
+                    store_index = await hass.async_add_executor_job(
+                        apple_monitor.StoreNameIndex, dynamic_monitor.db_path
+                    )
+                    outbox = await hass.async_add_executor_job(
+                        apple_monitor.NotificationOutbox,
+                        dynamic_monitor.db_path,
+                        apple_monitor.METRICS,
+                    )
+
+                hub = cls(
+                    hass, dynamic_monitor, store_index, outbox, apple_monitor.METRICS
+                )
+                hub.async_start()
+                domain_data[DATA_HUB] = hub
+
+        return domain_data[DATA_HUB]
+
+    @callback
+    def async_register(self, coordinator) -> None:
+        """Add an entry's coordinator to the polling plan."""
+        self._coordinators[coordinator.entry.entry_id] = coordinator
+        self.async_reschedule()
+
+    @callback
+    def async_claim_metrics(self, entry_id: str) -> bool:
+        """Return True if this entry should expose the shared metric sensors.
+
+        The first entry to ask keeps them until it is unloaded.
+        """
+        if self._metrics_entry_id not in self._coordinators:
+            self._metrics_entry_id = entry_id
+        return self._metrics_entry_id == entry_id
+
+    @callback
+    def async_unregister(self, entry_id: str) -> None:
+        """Remove an entry's coordinator, stopping the hub after the last one."""
+        self._coordinators.pop(entry_id, None)
+
+        if self._coordinators:
+            self.async_reschedule()
+            return
+
+        if self._unsub_timer:
+            self._unsub_timer()
+            self._unsub_timer = None
+        if self._outbox_task:
+            self._outbox_task.cancel()
+            self._outbox_task = None
+        self.hass.data[DOMAIN].pop(DATA_HUB, None)
+
+    @callback
+    def async_start(self) -> None:
+        """Start delivering queued notifications in the background."""
+        if self.outbox is not None and self._outbox_task is None:
+            self._outbox_task = self.hass.async_create_background_task(
+                self._async_outbox_worker(), f"{DOMAIN} notification outbox"
+            )
+
+    @callback
+    def async_wake_outbox(self) -> None:
+        """Have the outbox worker deliver newly queued messages now."""
+        self._outbox_wakeup.set()
+
+    async def _async_outbox_worker(self) -> None:
+        """Deliver queued SMS messages, with retries, until the hub stops."""
+        while True:
+            self._outbox_wakeup.clear()
+            try:
+                items = await self.hass.async_add_executor_job(self.outbox.claim_due)
+                if items:
+                    delivered = await self.sms.async_send_many(
+                        item[1] for item in items
+                    )
+                    await self.hass.async_add_executor_job(
+                        self.outbox.complete, items, delivered
+                    )
+                    continue
+
+                wait = await self.hass.async_add_executor_job(
+                    self.outbox.seconds_until_due
+                )
+            except Exception as err:
+                _LOGGER.error(f"Error delivering queued notifications: {err}")
+                wait = None
+
+            if wait is None or wait > OUTBOX_IDLE_INTERVAL:
+                wait = OUTBOX_IDLE_INTERVAL
+            try:
+                await asyncio.wait_for(self._outbox_wakeup.wait(), wait)
+            except asyncio.TimeoutError:
+                pass
+
+    @callback
+    def async_reschedule(self) -> None:
+        """Poll at the shortest interval any entry asks for."""
+        interval = min(
+            (c.check_interval for c in self._coordinators.values()), default=None
+        )
+        if interval == self._interval and self._unsub_timer:
+            return
+
+        if self._unsub_timer:
+            self._unsub_timer()
+            self._unsub_timer = None
+
+        self._interval = interval
+        if interval:
+            self._unsub_timer = async_track_time_interval(
+                self.hass, self._async_poll, interval
+            )
+
+    async def _async_poll(self, _now=None) -> None:
+        """Check every entry's watchlist and fan the results out."""
+        coordinators = list(self._coordinators.values())
+        start = time.perf_counter()
+
+        try:
+            results = await self.async_check(coordinators)
+        except Exception as err:
+            _LOGGER.error(f"Error polling Apple Store stock: {err}")
+            for coordinator in coordinators:
+                coordinator.async_set_update_error(err)
+            return
+
+        for coordinator in coordinators:
+            await coordinator.async_publish_result(results[coordinator.entry.entry_id])
+
+        if self.metrics:
+            self.metrics.record_cycle(time.perf_counter() - start)
+
+    def phase(self, phase: str):
+        """Time one phase of a check cycle when metrics are available."""
+        return self.metrics.phase(phase) if self.metrics else nullcontext()
+
+    async def async_check(self, coordinators: List) -> Dict[str, Dict]:
+        """Check stock for the given entries with one request per unique product."""
+        async with self._lock:
+            with self.phase("resolve"):
+                watchlists = await self.hass.async_add_executor_job(
+                    lambda: [c.monitor.get_watchlist() for c in coordinators]
+                )
+
+            product_codes = set()
+            for watchlist in watchlists:
+                product_codes.update(watchlist.by_product())
+
+            with self.phase("fetch"):
+                responses = PrefetchedResponses(
+                    await self.fetcher.async_fetch_products(
+                        product_codes, CYCLE_DEADLINE
+                    )
+                )
+
+            results = {}
+            stock_rows = {}
+            with self.phase("parse"):
+                for coordinator, watchlist in zip(coordinators, watchlists):
+                    result, rows = await coordinator.monitor.async_check_stock(
+                        watchlist, responses, coordinator.data
+                    )
+                    results[coordinator.entry.entry_id] = result
+
+                    for row in rows:
+                        stock_rows[(row[1], row[2])] = row
+
+            if self.metrics:
+                errors = sum(
+                    individual_result["status"] == "error"
+                    for result in results.values()
+                    for individual_result in result["individual_results"].values()
+                )
+                if errors:
+                    self.metrics.inc("apple_stock_check_errors", errors)
+
+                # Within a fresh cycle only the deadline leaves pairs stale
+                timeouts = sum(
+                    bool(individual_result.get("stale"))
+                    for result in results.values()
+                    for individual_result in result["individual_results"].values()
+                )
+                if timeouts:
+                    self.metrics.inc("apple_stock_cycle_timeouts", timeouts)
+
+            _LOGGER.debug(
+                f"Checked {len(product_codes)} unique products for "
+                f"{len(coordinators)} config entries"
+            )
+
+            with self.phase("persist"):
+                queued = await self.hass.async_add_executor_job(
+                    self._record, coordinators, results, list(stock_rows.values())
+                )
+
+            # Alerts are only queued here; the outbox worker delivers them
+            if queued:
+                self.async_wake_outbox()
+
+            return results
+
+    async def async_check_pairs(self, coordinator, watchlist) -> Dict:
+        """Check some of one entry's pairs, e.g. those a config change added.
+
+        Holds the polling lock, so it never overlaps a poll on the shared
+        session or the entry's last result.
+        """
+        async with self._lock:
+            result, stock_rows = await coordinator.monitor.async_check_stock(
+                watchlist, self.fetcher, coordinator.data
+            )
+            with self.phase("persist"):
+                queued = await self.hass.async_add_executor_job(
+                    coordinator.monitor.persist_cycle, result, stock_rows
+                )
+
+        if queued:
+            self.async_wake_outbox()
+        return result
+
+    @staticmethod
+    def _record(coordinators: List, results: Dict[str, Dict], stock_rows: List) -> int:
+        """Save the shared stock checks once and queue one digest per recipient."""
+        # Entries watching the same pair share one stored check
+        if stock_rows:
+            coordinators[0].monitor.save_stock_rows(stock_rows)
+
+        outbox = coordinators[0].monitor.outbox
+        if outbox is None:
+            return 0
+
+        # Entries sending to the same gateway share one digest per cycle;
+        # gateway URL -> (monitor building the digest, items by pair)
+        recipients: Dict[str, Tuple] = {}
+        for coordinator in coordinators:
+            monitor = coordinator.monitor
+            items = monitor.due_alerts(results[coordinator.entry.entry_id])
+            if not items:
+                continue
+
+            owner, pending = recipients.setdefault(
+                monitor.sms_gateway_url, (monitor, {})
+            )
+            if monitor.home_zipcode and not owner.home_zipcode:
+                # Order stores by whichever entry knows where home is
+                recipients[monitor.sms_gateway_url] = (monitor, pending)
+            for item in items:
+                pending.setdefault((item["product_code"], item["store_code"]), item)
+
+        messages = []
+        for owner, pending in recipients.values():
+            messages.extend(owner.alert_digest(list(pending.values())))
+
+        return outbox.enqueue(messages)
@@ -5,13 +5,14 @@ from __future__ import annotations
 import logging
 from typing import Any
 
-import aiohttp
 from homeassistant.components.notify import BaseNotificationService
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
 
 from .const import DOMAIN, CONF_SMS_GATEWAY_URL
+from .sms_dispatcher import AsyncSMSDispatcher, SMSMessage
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -42,6 +43,7 @@ class AppleStoreSMSNotificationService(BaseNotificationService):
         self.hass = hass
         self.config_entry = config_entry
         self._sms_gateway_url = config_entry.data.get(CONF_SMS_GATEWAY_URL)
+        self._dispatcher = AsyncSMSDispatcher(async_get_clientsession(hass))
 
     async def async_send_message(self, message: str = "", **kwargs: Any) -> None:
         """Send a message via SMS."""
@@ -53,30 +55,8 @@ class AppleStoreSMSNotificationService(BaseNotificationService):
         if isinstance(targets, str):
             targets = [targets]
 
-        for phone_number in targets:
-            await self._send_sms(phone_number, message)
-
-    async def _send_sms(self, phone_number: str, message: str) -> None:
-        """Send SMS to a specific phone number."""
-        try:
-            async with aiohttp.ClientSession() as session:
-                data = {
-                    "phone_number": phone_number,
-                    "message": message,
-                }
-
-                async with session.post(
-                    f"{self._sms_gateway_url}/send_sms",
-                    json=data,
-                    timeout=10,
-                ) as response:
-                    if response.status == 200:
-                        _LOGGER.info("SMS sent successfully to %s", phone_number)
-                    else:
-                        _LOGGER.error(
-                            "Failed to send SMS to %s: %s",
-                            phone_number,
-                            response.status,
-                        )
-        except Exception as err:
-            _LOGGER.error("Error sending SMS to %s: %s", phone_number, err)
+        # All targets are sent at once over Home Assistant's pooled session
+        await self._dispatcher.async_send_many(
+            SMSMessage(self._sms_gateway_url, message, phone_number)
+            for phone_number in targets
+        )
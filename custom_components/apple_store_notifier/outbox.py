@@ -0,0 +1,233 @@
+"""Durable SQLite outbox decoupling SMS delivery from stock checks."""
+
+import logging
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Tuple
+
+from .const import (
+    OUTBOX_BATCH_SIZE,
+    OUTBOX_CLAIM_LEASE,
+    OUTBOX_MAX_ATTEMPTS,
+    OUTBOX_MAX_BACKOFF,
+    OUTBOX_RETENTION,
+    OUTBOX_RETRY_BACKOFF,
+)
+from .sms_dispatcher import SMSMessage
+
+_LOGGER = logging.getLogger(__name__)
+
+# (outbox id, message, enqueued at)
+OutboxItem = Tuple[int, SMSMessage, datetime]
+
+
+class NotificationOutbox:
+    """Queue of pending SMS messages with retries and exponential backoff.
+
+    Checks only enqueue; a worker claims due messages, sends them and
+    reports back, so a slow or failing gateway never delays a check.
+    """
+
+    def __init__(self, db_path: str, metrics=None):
+        """Initialize the outbox, recording deliveries in an optional registry."""
+        self.db_path = db_path
+        self._metrics = metrics
+        self._lock = threading.Lock()
+        self._init_database()
+
+    def _init_database(self):
+        """Create the outbox table."""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS notification_outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                gateway_url TEXT NOT NULL,
+                message TEXT NOT NULL,
+                phone_number TEXT,
+                status TEXT DEFAULT 'pending',
+                attempts INTEGER DEFAULT 0,
+                enqueued TEXT NOT NULL,
+                next_attempt TEXT NOT NULL,
+                delivered TEXT
+            )
+        """
+        )
+        cursor.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_outbox_due
+            ON notification_outbox(status, next_attempt)
+        """
+        )
+
+        conn.commit()
+        conn.close()
+
+    def enqueue(self, messages: Iterable[SMSMessage]) -> int:
+        """Queue messages for delivery; returns how many were queued."""
+        now = datetime.now().isoformat()
+        rows = [
+            (message.gateway_url, message.message, message.phone_number, now, now)
+            for message in messages
+        ]
+        if not rows:
+            return 0
+
+        with self._lock:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            cursor.executemany(
+                """
+                INSERT INTO notification_outbox
+                (gateway_url, message, phone_number, enqueued, next_attempt)
+                VALUES (?, ?, ?, ?, ?)
+            """,
+                rows,
+            )
+            conn.commit()
+            conn.close()
+
+        return len(rows)
+
+    def claim_due(self, limit: int = OUTBOX_BATCH_SIZE) -> List[OutboxItem]:
+        """Claim pending messages whose next attempt is due, oldest first.
+
+        Claimed messages are leased by pushing their next attempt out by
+        OUTBOX_CLAIM_LEASE in the same transaction, so no other sender picks
+        them up; a claim that is never completed expires into a retry.
+        """
+        now = datetime.now()
+        with self._lock:
+            # Other processes may share the database, so claim under a write lock
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                rows = conn.execute(
+                    """
+                    SELECT id, gateway_url, message, phone_number, enqueued
+                    FROM notification_outbox
+                    WHERE status = 'pending' AND next_attempt <= ?
+                    ORDER BY id
+                    LIMIT ?
+                """,
+                    (now.isoformat(), limit),
+                ).fetchall()
+                conn.executemany(
+                    "UPDATE notification_outbox SET next_attempt = ? WHERE id = ?",
+                    [((now + OUTBOX_CLAIM_LEASE).isoformat(), row[0]) for row in rows],
+                )
+                conn.execute("COMMIT")
+            finally:
+                conn.close()
+
+        return [
+            (row[0], SMSMessage(row[1], row[2], row[3]), datetime.fromisoformat(row[4]))
+            for row in rows
+        ]
+
+    def complete(self, items: List[OutboxItem], delivered: List[bool]):
+        """Record the outcome of one delivery attempt for each claimed message."""
+        now = datetime.now()
+        sent = []
+        failed = []
+
+        for (outbox_id, message, enqueued), ok in zip(items, delivered):
+            if ok:
+                sent.append((now.isoformat(), outbox_id))
+                self._record("sent", (now - enqueued).total_seconds())
+            else:
+                failed.append(outbox_id)
+
+        with self._lock:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+
+            cursor.executemany(
+                """
+                UPDATE notification_outbox
+                SET status = 'sent', attempts = attempts + 1, delivered = ?
+                WHERE id = ?
+            """,
+                sent,
+            )
+
+            for outbox_id in failed:
+                cursor.execute(
+                    "SELECT attempts FROM notification_outbox WHERE id = ?",
+                    (outbox_id,),
+                )
+                attempts = cursor.fetchone()[0] + 1
+
+                if attempts >= OUTBOX_MAX_ATTEMPTS:
+                    cursor.execute(
+                        """
+                        UPDATE notification_outbox
+                        SET status = 'failed', attempts = ?
+                        WHERE id = ?
+                    """,
+                        (attempts, outbox_id),
+                    )
+                    _LOGGER.error(
+                        f"Giving up on SMS {outbox_id} after {attempts} attempts"
+                    )
+                    self._record("failed")
+                else:
+                    cursor.execute(
+                        """
+                        UPDATE notification_outbox
+                        SET attempts = ?, next_attempt = ?
+                        WHERE id = ?
+                    """,
+                        (
+                            attempts,
+                            (now + self._backoff(attempts)).isoformat(),
+                            outbox_id,
+                        ),
+                    )
+                    self._record("retry")
+
+            # Delivered and abandoned messages are kept a while for inspection
+            cursor.execute(
+                "DELETE FROM notification_outbox WHERE status != 'pending' AND next_attempt < ?",
+                ((now - OUTBOX_RETENTION).isoformat(),),
+            )
+
+            conn.commit()
+            conn.close()
+
+    def seconds_until_due(self) -> Optional[float]:
+        """Return how long until the next pending message is due, or None."""
+        with self._lock:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                SELECT MIN(next_attempt) FROM notification_outbox
+                WHERE status = 'pending'
+            """
+            )
+            next_attempt = cursor.fetchone()[0]
+            conn.close()
+
+        if next_attempt is None:
+            return None
+
+        wait = datetime.fromisoformat(next_attempt) - datetime.now()
+        return max(wait.total_seconds(), 0)
+
+    @staticmethod
+    def _backoff(attempts: int) -> timedelta:
+        """Return the delay before retry number `attempts`."""
+        return min(OUTBOX_RETRY_BACKOFF * 2 ** (attempts - 1), OUTBOX_MAX_BACKOFF)
+
+    def _record(self, outcome: str, latency: Optional[float] = None):
+        """Record a delivery outcome and its enqueue-to-delivery latency."""
+        if not self._metrics:
+            return
+
+        self._metrics.inc("apple_stock_notifications", outcome=outcome)
+        if latency is not None:
+            self._metrics.observe("apple_stock_notification_latency_seconds", latency)
@@ -1,24 +1,36 @@
 """Apple Store Notifier sensors for Home Assistant."""
 
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Mapping, Optional
 
 from homeassistant.components.sensor import SensorEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EntityCategory
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import (
     CoordinatorEntity,
     DataUpdateCoordinator,
-    UpdateFailed,
 )
 
 from .const import DOMAIN
-from .apple_monitor import AppleStoreMonitor
+from .entity import AppleStoreChangeEntity
 
 _LOGGER = logging.getLogger(__name__)
 
+# Diagnostic sensors: (metrics summary key, name, unit, icon)
+METRIC_SENSORS = (
+    ("requests", "API Requests", "requests", "mdi:web"),
+    ("request_errors", "API Request Errors", "requests", "mdi:web-off"),
+    ("error_rate_percent", "API Error Rate", "%", "mdi:alert-circle-outline"),
+    ("check_errors", "Stock Check Errors", "checks", "mdi:alert"),
+    ("notifications_sent", "SMS Delivered", "messages", "mdi:message-check"),
+    ("notifications_failed", "SMS Delivery Failures", "messages", "mdi:message-alert"),
+    ("last_cycle_seconds", "Last Cycle Duration", "s", "mdi:timer-outline"),
+    ("average_cycle_seconds", "Average Cycle Duration", "s", "mdi:timer-sand"),
+)
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -27,80 +39,90 @@ async def async_setup_entry(
 ) -> None:
     """Set up Apple Store Notifier sensors."""
 
-    coordinator = hass.data[DOMAIN][config_entry.entry_id]["coordinator"]
-
-    # Create individual sensors for each product/store combination
-    entities = []
+    coordinator = hass.data[DOMAIN][config_entry.entry_id]
 
     # Main summary sensor
-    entities.append(AppleStoreNotifierSensor(coordinator, config_entry))
-
-    # Individual product sensors
-    if coordinator.data and "individual_results" in coordinator.data:
-        for product_store_key, result in coordinator.data["individual_results"].items():
-            entities.append(
-                AppleProductSensor(coordinator, config_entry, product_store_key, result)
+    async_add_entities([AppleStoreNotifierSensor(coordinator, config_entry)])
+
+    # Runtime metrics are process-wide, so only one entry exposes them
+    if coordinator.hub.metrics:
+        if coordinator.hub.async_claim_metrics(config_entry.entry_id):
+            async_add_entities(
+                AppleStoreMetricSensor(coordinator, config_entry, *description)
+                for description in METRIC_SENSORS
             )
-
-    async_add_entities(entities, True)
+        else:
+            _async_remove_metric_sensors(hass, config_entry)
+
+    # Individual product sensors follow the coordinator's set of pairs
+    product_sensors: Dict[str, AppleProductSensor] = {}
+
+    @callback
+    def _async_sync_product_sensors() -> None:
+        """Add sensors for new pairs and remove sensors for dropped ones."""
+        pairs = coordinator.pairs
+
+        new_sensors = [
+            AppleProductSensor(coordinator, config_entry, key, pair._asdict())
+            for key, pair in pairs.items()
+            if key not in product_sensors
+        ]
+        for sensor in new_sensors:
+            product_sensors[sensor.product_store_key] = sensor
+        if new_sensors:
+            async_add_entities(new_sensors)
+
+        registry = er.async_get(hass)
+        for key in set(product_sensors) - set(pairs):
+            sensor = product_sensors.pop(key)
+            if sensor.registry_entry:
+                registry.async_remove(sensor.entity_id)
+            else:
+                hass.async_create_task(sensor.async_remove(force_remove=True))
+
+    _async_sync_product_sensors()
+    config_entry.async_on_unload(
+        coordinator.async_add_listener(_async_sync_product_sensors)
+    )
+
+
+@callback
+def _async_remove_metric_sensors(hass: HomeAssistant, config_entry: ConfigEntry):
+    """Drop metric sensors an entry registered before another took them over."""
+    registry = er.async_get(hass)
+    for key, *_ in METRIC_SENSORS:
+        entity_id = registry.async_get_entity_id(
+            "sensor", DOMAIN, f"{DOMAIN}_{config_entry.entry_id}_metric_{key}"
+        )
+        if entity_id:
+            registry.async_remove(entity_id)
 
 
-class AppleStoreNotifierSensor(CoordinatorEntity, SensorEntity):
+class AppleStoreNotifierSensor(AppleStoreChangeEntity, SensorEntity):
     """Main Apple Store Notifier sensor."""
 
+    # Changes every cycle, so keep it out of recorder history
+    _unrecorded_attributes = frozenset({"last_update"})
+
     def __init__(self, coordinator: DataUpdateCoordinator, config_entry: ConfigEntry):
         """Initialize the sensor."""
         super().__init__(coordinator)
         self._config_entry = config_entry
         self._attr_name = "Apple Store Stock Monitor"
-        self._attr_unique_id = f"{DOMAIN}_main"
+        self._attr_unique_id = f"{DOMAIN}_{config_entry.entry_id}_main"
         self._attr_icon = "mdi:apple"
 
     @property
     def state(self) -> str:
         """Return the state of the sensor."""
-        if not self.coordinator.data:
-            return "unknown"
-
-        total_available = self.coordinator.data.get("total_available", 0)
-        return str(total_available)
+        snapshot = self.coordinator.snapshot
+        return snapshot["summary_state"] if snapshot else "unknown"
 
     @property
-    def extra_state_attributes(self) -> Dict[str, Any]:
+    def extra_state_attributes(self) -> Mapping[str, Any]:
         """Return additional state attributes."""
-        if not self.coordinator.data:
-            return {}
-
-        data = self.coordinator.data
-
-        attributes = {
-            "total_available": data.get("total_available", 0),
-            "products_checked": data.get("products_checked", 0),
-            "stores_checked": data.get("stores_checked", 0),
-            "last_update": data.get("timestamp"),
-            "available_items": data.get("available_items", []),
-        }
-
-        # Add individual product status summary
-        if "individual_results" in data:
-            product_summary = {}
-            for key, result in data["individual_results"].items():
-                product_code = result["product_code"]
-                if product_code not in product_summary:
-                    product_summary[product_code] = {
-                        "name": result["product_name"],
-                        "available_stores": 0,
-                        "total_stores": 0,
-                        "last_checked": result["last_checked"],
-                    }
-
-                product_summary[product_code]["total_stores"] += 1
-                if result["available"]:
-                    product_summary[product_code]["available_stores"] += 1
-
-            attributes["product_summary"] = product_summary
-
-        return attributes
+        snapshot = self.coordinator.snapshot
+        return snapshot["summary_attributes"] if snapshot else {}
 
     @property
     def unit_of_measurement(self) -> str:
@@ -108,9 +130,12 @@ class AppleStoreNotifierSensor(CoordinatorEntity, SensorEntity):
         return "items"
 
 
-class AppleProductSensor(CoordinatorEntity, SensorEntity):
+class AppleProductSensor(AppleStoreChangeEntity, SensorEntity):
     """Individual Apple product sensor."""
 
+    # Changes every cycle, so keep it out of recorder history
+    _unrecorded_attributes = frozenset({"last_checked"})
+
     def __init__(
         self,
         coordinator: DataUpdateCoordinator,
@@ -122,6 +147,7 @@ class AppleProductSensor(CoordinatorEntity, SensorEntity):
         super().__init__(coordinator)
         self._config_entry = config_entry
         self._product_store_key = product_store_key
+        self._change_key = product_store_key
         self._product_code = initial_result["product_code"]
         self._store_code = initial_result["store_code"]
 
@@ -130,82 +156,34 @@ class AppleProductSensor(CoordinatorEntity, SensorEntity):
         store_name = initial_result["store_name"]
 
         self._attr_name = f"{product_name} at {store_name}"
-        self._attr_unique_id = f"{DOMAIN}_{self._product_store_key}"
+        self._attr_unique_id = (
+            f"{DOMAIN}_{config_entry.entry_id}_{self._product_store_key}"
+        )
         self._attr_icon = (
             "mdi:cellphone" if "iphone" in product_name.lower() else "mdi:apple"
         )
 
+    @property
+    def product_store_key(self) -> str:
+        """Return the product/store key this sensor tracks."""
+        return self._product_store_key
+
     @property
     def state(self) -> str:
         """Return the state of the sensor."""
-        if (
-            not self.coordinator.data
-            or "individual_results" not in self.coordinator.data
-        ):
-            return "unknown"
-
-        result = self.coordinator.data["individual_results"].get(
-            self._product_store_key
-        )
-        if not result:
-            return "unknown"
-
-        if result["status"] == "error":
-            return "error"
-        elif result["available"]:
-            return "available"
-        else:
-            return "unavailable"
+        pair = self._snapshot_pair()
+        return pair["state"] if pair else "unknown"
 
     @property
-    def extra_state_attributes(self) -> Dict[str, Any]:
+    def extra_state_attributes(self) -> Mapping[str, Any]:
         """Return additional state attributes."""
-        if (
-            not self.coordinator.data
-            or "individual_results" not in self.coordinator.data
-        ):
-            return {}
-
-        result = self.coordinator.data["individual_results"].get(
-            self._product_store_key
-        )
-        if not result:
-            return {}
-
-        attributes = {
-            "product_name": result["product_name"],
-            "product_code": result["product_code"],
-            "store_name": result["store_name"],
-            "store_code": result["store_code"],
-            "available": result["available"],
-            "pickup_available": result.get("pickup_available", False),
-            "last_checked": result["last_checked"],
-            "status": result["status"],
-        }
-
-        # Add error information if present
-        if "error" in result:
-            attributes["error"] = result["error"]
-
-        # Add store information if available
-        if "store_info" in result and result["store_info"]:
-            attributes["store_info"] = result["store_info"]
-
-        # Add restock prediction if enhanced monitoring is available
-        if hasattr(self.coordinator, "_monitor") and hasattr(
-            self.coordinator._monitor, "enhanced_monitor"
-        ):
-            try:
-                if self.coordinator._monitor.enhanced_monitor:
-                    prediction = self.coordinator._monitor.enhanced_monitor.analyzer.predict_next_restock(
-                        self._store_code, self._product_code
-                    )
-                    if prediction and "prediction" not in prediction:
-                        attributes["restock_prediction"] = prediction
-            except Exception as e:
-                _LOGGER.debug(f"Could not get restock prediction: {e}")
-
-        return attributes
+        pair = self._snapshot_pair()
+        return pair["attributes"] if pair else {}
+
+    def _snapshot_pair(self) -> Optional[Mapping[str, Any]]:
+        """Return this sensor's precomputed state and attributes."""
+        snapshot = self.coordinator.snapshot
+        return snapshot["pairs"].get(self._product_store_key) if snapshot else None
 
     @property
     def device_class(self) -> str:
@@ -215,37 +193,33 @@ class AppleProductSensor(CoordinatorEntity, SensorEntity):
     @property
     def available(self) -> bool:
         """Return if entity is available."""
-        return (
-            self.coordinator.data is not None
-            and "individual_results" in self.coordinator.data
-            and self._product_store_key in self.coordinator.data["individual_results"]
-        )
+        return self._snapshot_pair() is not None
+
 
+class AppleStoreMetricSensor(CoordinatorEntity, SensorEntity):
+    """Diagnostic sensor for one runtime metric of the polling hub."""
 
-class AppleStoreDataUpdateCoordinator(DataUpdateCoordinator):
-    """Class to manage fetching Apple Store data."""
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
 
     def __init__(
         self,
-        hass: HomeAssistant,
-        logger: logging.Logger,
-        monitor: AppleStoreMonitor,
-        update_interval: timedelta,
-    ) -> None:
-        """Initialize the coordinator."""
-        self._monitor = monitor
-        super().__init__(
-            hass,
-            logger,
-            name=DOMAIN,
-            update_interval=update_interval,
-        )
+        coordinator: DataUpdateCoordinator,
+        config_entry: ConfigEntry,
+        key: str,
+        name: str,
+        unit: str,
+        icon: str,
+    ):
+        """Initialize the metric sensor."""
+        super().__init__(coordinator)
+        self._key = key
+        self._attr_name = f"Apple Store {name}"
+        self._attr_unique_id = f"{DOMAIN}_{config_entry.entry_id}_metric_{key}"
+        self._attr_native_unit_of_measurement = unit
+        self._attr_icon = icon
 
-    async def _async_update_data(self) -> Dict[str, Any]:
-        """Update data via library."""
-        try:
-            # Run the stock check in executor to avoid blocking
-            data = await self.hass.async_add_executor_job(self._monitor.check_stock)
-            return data
-        except Exception as exception:
-            raise UpdateFailed(f"Error communicating with Apple Store API: {exception}")
+    @property
+    def native_value(self) -> Optional[float]:
+        """Return the current value of the metric."""
+        # Metrics are recorded on every poll, so read them fresh on each write
+        return self.coordinator.hub.metrics.summary()[self._key]
@@ -0,0 +1,77 @@
+"""Pooled, concurrent SMS gateway dispatch."""
+
+import asyncio
+import logging
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+import aiohttp
+
+from .const import MAX_CONCURRENT_SMS, SMS_REQUEST_TIMEOUT
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class SMSMessage(NamedTuple):
+    """One message for an SMS gateway, optionally to a specific number."""
+
+    gateway_url: str
+    message: str
+    phone_number: Optional[str] = None
+
+    @property
+    def url(self) -> str:
+        """Return the gateway's send endpoint."""
+        return f"{self.gateway_url}/send_sms"
+
+    @property
+    def payload(self) -> Dict[str, str]:
+        """Return the JSON body the gateway expects."""
+        payload = {"message": self.message}
+        if self.phone_number:
+            payload["phone_number"] = self.phone_number
+        return payload
+
+    @property
+    def recipient(self) -> str:
+        """Return a description of the recipient for log lines."""
+        return self.phone_number or self.gateway_url
+
+
+class AsyncSMSDispatcher:
+    """Send SMS messages concurrently over a long-lived aiohttp session."""
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        max_concurrency: int = MAX_CONCURRENT_SMS,
+        request_timeout: float = SMS_REQUEST_TIMEOUT,
+    ):
+        """Initialize the dispatcher with a shared, pooled session."""
+        self._session = session
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._timeout = aiohttp.ClientTimeout(total=request_timeout)
+
+    async def async_send_many(self, messages: Iterable[SMSMessage]) -> List[bool]:
+        """Send all messages at once, returning whether each one was accepted."""
+        return list(
+            await asyncio.gather(*(self.async_send(message) for message in messages))
+        )
+
+    async def async_send(self, message: SMSMessage) -> bool:
+        """Send one message, logging rather than raising on failure."""
+        try:
+            async with self._semaphore:
+                async with self._session.post(
+                    message.url, json=message.payload, timeout=self._timeout
+                ) as response:
+                    if response.status == 200:
+                        _LOGGER.info(f"SMS sent to {message.recipient}")
+                        return True
+
+                    _LOGGER.error(
+                        f"Failed to send SMS to {message.recipient}: {response.status}"
+                    )
+        except Exception as err:
+            _LOGGER.error(f"Error sending SMS to {message.recipient}: {err}")
+
+        return False
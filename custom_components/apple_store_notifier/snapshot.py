@@ -0,0 +1,118 @@
+"""Immutable per-refresh snapshot of everything the entities display."""
+
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional
+
+
+def build_snapshot(
+    result: Dict,
+    stores: List[str],
+    products: List[str],
+    predictions: Optional[Dict[str, Dict]] = None,
+) -> Mapping[str, Any]:
+    """Compute states and attributes for every entity from one stock check."""
+    predictions = predictions or {}
+    individual_results = result.get("individual_results", {})
+    available_items = result.get("available_items", [])
+
+    # Per-product aggregates across stores
+    product_summary = {}
+    for individual_result in individual_results.values():
+        product_code = individual_result["product_code"]
+        if product_code not in product_summary:
+            product_summary[product_code] = {
+                "name": individual_result["product_name"],
+                "available_stores": 0,
+                "total_stores": 0,
+                "last_checked": individual_result["last_checked"],
+            }
+
+        product_summary[product_code]["total_stores"] += 1
+        if individual_result["available"]:
+            product_summary[product_code]["available_stores"] += 1
+
+    summary_attributes = {
+        "total_available": result.get("total_available", 0),
+        "products_checked": result.get("products_checked", 0),
+        "stores_checked": result.get("stores_checked", 0),
+        "last_update": result.get("timestamp"),
+        "stale": result.get("stale", False),
+        "available_items": available_items,
+        "product_summary": product_summary,
+    }
+
+    binary_attributes = {
+        "available_count": len(available_items),
+        "available_products": [item["product"] for item in available_items],
+        "available_stores": [item["store"] for item in available_items],
+        "last_check": result.get("timestamp"),
+        "stale": result.get("stale", False),
+        "monitoring_stores": stores,
+        "monitoring_products": products,
+        "status_message": f"Monitoring {len(products)} iPhone models at {len(stores)} stores",
+    }
+
+    pairs = {
+        key: MappingProxyType(
+            {
+                "state": _pair_state(individual_result),
+                "attributes": MappingProxyType(
+                    _pair_attributes(individual_result, predictions.get(key))
+                ),
+            }
+        )
+        for key, individual_result in individual_results.items()
+    }
+
+    return MappingProxyType(
+        {
+            "summary_state": str(result.get("total_available", 0)),
+            "summary_attributes": MappingProxyType(summary_attributes),
+            "binary_on": result.get("total_available", 0) > 0,
+            "binary_attributes": MappingProxyType(binary_attributes),
+            "product_summary": MappingProxyType(product_summary),
+            "pairs": MappingProxyType(pairs),
+        }
+    )
+
+
+def _pair_state(result: Dict) -> str:
+    """Return the sensor state for one product/store result."""
+    if result["status"] == "error":
+        return "error"
+    elif result["available"]:
+        return "available"
+    else:
+        return "unavailable"
+
+
+def _pair_attributes(result: Dict, prediction: Optional[Dict]) -> Dict[str, Any]:
+    """Return the sensor attributes for one product/store result."""
+    attributes = {
+        "product_name": result["product_name"],
+        "product_code": result["product_code"],
+        "store_name": result["store_name"],
+        "store_code": result["store_code"],
+        "available": result["available"],
+        "pickup_available": result.get("pickup_available", False),
+        "last_checked": result["last_checked"],
+        "status": result["status"],
+    }
+
+    # Restored from the last run and not re-checked yet
+    if result.get("stale"):
+        attributes["stale"] = True
+
+    # Add error information if present
+    if "error" in result:
+        attributes["error"] = result["error"]
+
+    # Add store information if available
+    if result.get("store_info"):
+        attributes["store_info"] = result["store_info"]
+
+    # Add restock prediction when the analyzer has one
+    if prediction and "prediction" not in prediction:
+        attributes["restock_prediction"] = prediction
+
+    return attributes
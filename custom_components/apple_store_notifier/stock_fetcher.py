@@ -0,0 +1,102 @@
+"""Async stock fetcher using Home Assistant's shared aiohttp session."""
+
+import asyncio
+import logging
+import time
+from typing import Dict, Iterable, Optional, Union
+
+import aiohttp
+
+from .const import APPLE_PICKUP_API_URL, APPLE_STORE_DISCOVERY_ZIPCODE
+
+_LOGGER = logging.getLogger(__name__)
+
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
+
+
+class CycleDeadlineExceeded(Exception):
+    """A product fetch was cancelled because the cycle ran out of time."""
+
+
+class AsyncStockFetcher:
+    """Fetch pickup availability for many products concurrently on the event loop."""
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        max_concurrency: int = 4,
+        request_timeout: float = 30,
+        metrics=None,
+    ):
+        """Initialize the fetcher, recording requests in an optional registry."""
+        self._session = session
+        self._metrics = metrics
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._timeout = aiohttp.ClientTimeout(total=request_timeout)
+
+    async def async_fetch_products(
+        self, product_codes: Iterable[str], deadline: Optional[float] = None
+    ) -> Dict[str, Union[Dict, Exception]]:
+        """Fetch one pickup response per product; failures map to the exception.
+
+        Fetches still outstanding after `deadline` seconds are cancelled and
+        map to CycleDeadlineExceeded, so the cycle can publish what it has.
+        """
+        tasks = {
+            code: asyncio.ensure_future(self._async_fetch_product(code))
+            for code in product_codes
+        }
+        if not tasks:
+            return {}
+
+        _, pending = await asyncio.wait(tasks.values(), timeout=deadline)
+        if pending:
+            for task in pending:
+                task.cancel()
+            # Let the cancelled requests release their connections
+            await asyncio.wait(pending)
+            _LOGGER.warning(
+                f"Cycle deadline of {deadline}s cut off {len(pending)} of "
+                f"{len(tasks)} product checks"
+            )
+
+        responses = {}
+        for code, task in tasks.items():
+            if task in pending:
+                responses[code] = CycleDeadlineExceeded(
+                    f"Not checked within the {deadline}s cycle deadline"
+                )
+            else:
+                responses[code] = task.exception() or task.result()
+        return responses
+
+    async def _async_fetch_product(self, product_code: str) -> Dict:
+        """Fetch the pickup response for one product."""
+        params = {
+            "parts.0": product_code,
+            "location": APPLE_STORE_DISCOVERY_ZIPCODE,
+        }
+
+        async with self._semaphore:
+            start = time.perf_counter()
+            status: Union[int, str] = "error"
+            body: Optional[bytes] = None
+            try:
+                async with self._session.get(
+                    APPLE_PICKUP_API_URL,
+                    params=params,
+                    headers={"User-Agent": USER_AGENT},
+                    timeout=self._timeout,
+                ) as response:
+                    status = response.status
+                    response.raise_for_status()
+                    body = await response.read()
+                    return await response.json(content_type=None)
+            finally:
+                if self._metrics:
+                    self._metrics.record_request(
+                        "pickup",
+                        status,
+                        time.perf_counter() - start,
+                        len(body) if body else 0,
+                    )
@@ -0,0 +1,137 @@
+"""Persisted store name index for resolving configured store names to codes."""
+
+import logging
+import re
+import sqlite3
+import threading
+import unicodedata
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+_LOGGER = logging.getLogger(__name__)
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def normalize_store_name(name: str) -> str:
+    """Casefold a store name and drop punctuation, accents and extra spaces."""
+    name = unicodedata.normalize("NFKD", name or "")
+    name = "".join(char for char in name if not unicodedata.combining(char))
+    tokens = _NON_ALNUM.sub(" ", name.casefold()).split()
+
+    # "Apple Fifth Avenue" and "Fifth Avenue" are the same store
+    if len(tokens) > 1 and tokens[0] == "apple":
+        tokens = tokens[1:]
+
+    return " ".join(tokens)
+
+
+class StoreNameIndex:
+    """In-memory name -> store code map backed by a SQLite table."""
+
+    def __init__(self, db_path: str):
+        """Initialize the index and load the persisted entries."""
+        self.db_path = db_path
+        self._index: Dict[str, str] = {}
+        self._updated: Optional[datetime] = None
+        self._lock = threading.Lock()
+        self._init_database()
+        self._load()
+
+    def _init_database(self):
+        """Create the persisted index table."""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS store_name_index (
+                normalized_name TEXT PRIMARY KEY,
+                store_code TEXT NOT NULL,
+                store_name TEXT,
+                updated TEXT
+            )
+        """
+        )
+
+        conn.commit()
+        conn.close()
+
+    def _load(self):
+        """Load the persisted index into memory."""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute(
+            "SELECT normalized_name, store_code, updated FROM store_name_index"
+        )
+        rows = cursor.fetchall()
+        conn.close()
+
+        self._index = {row[0]: row[1] for row in rows}
+        updated = [row[2] for row in rows if row[2]]
+        self._updated = datetime.fromisoformat(min(updated)) if updated else None
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    @property
+    def updated(self) -> Optional[datetime]:
+        """Return when the index was last rebuilt."""
+        return self._updated
+
+    def lookup(self, store_name: str) -> Optional[str]:
+        """Return the store code for a name, or None if it is not indexed."""
+        return self._index.get(normalize_store_name(store_name))
+
+    def rebuild(self, stores: Iterable[Dict]):
+        """Replace the index with entries for the given store records."""
+        now = datetime.now()
+        entries = self._entries(stores, now)
+
+        with self._lock:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM store_name_index")
+            cursor.executemany(
+                """
+                INSERT OR REPLACE INTO store_name_index
+                (normalized_name, store_code, store_name, updated)
+                VALUES (?, ?, ?, ?)
+            """,
+                entries,
+            )
+            conn.commit()
+            conn.close()
+
+            self._index = {entry[0]: entry[1] for entry in entries}
+            self._updated = now
+
+        _LOGGER.debug(f"Store name index rebuilt with {len(entries)} entries")
+
+    @staticmethod
+    def _entries(stores: Iterable[Dict], now: datetime) -> List[tuple]:
+        """Build index rows, keyed by both the name and "name, city"."""
+        entries = {}
+        for store in stores:
+            store_code = store.get("store_code")
+            store_name = store.get("store_name")
+            if not store_code or not store_name:
+                continue
+
+            keys = [store_name]
+            if store.get("city") and store["city"] != "Unknown":
+                keys.append(f"{store_name}, {store['city']}")
+
+            for key in keys:
+                entries.setdefault(
+                    normalize_store_name(key),
+                    (
+                        normalize_store_name(key),
+                        store_code,
+                        store_name,
+                        now.isoformat(),
+                    ),
+                )
+
+        return list(entries.values())
@@ -0,0 +1,101 @@
+"""Compiled watchlist of resolved product/store code pairs."""
+
+from datetime import datetime
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+
+class WatchlistPair(NamedTuple):
+    """One resolved product/store combination to check."""
+
+    product_code: str
+    product_name: str
+    store_code: str
+    store_name: str
+    category: str
+
+    @property
+    def key(self) -> str:
+        """Return the product/store key used in results and entity ids."""
+        return f"{self.product_code}_{self.store_code}"
+
+
+class CompiledWatchlist:
+    """Configured store and product names resolved to codes once."""
+
+    def __init__(
+        self,
+        stores: List[str],
+        products: List[str],
+        pairs: List[WatchlistPair],
+        unresolved_stores: List[str],
+        unresolved_products: List[str],
+    ):
+        """Initialize the compiled watchlist."""
+        self.stores = tuple(stores)
+        self.products = tuple(products)
+        self.pairs = tuple(pairs)
+        self.unresolved_stores = tuple(unresolved_stores)
+        self.unresolved_products = tuple(unresolved_products)
+        self.compiled_at = datetime.now()
+
+    @classmethod
+    def compile(
+        cls,
+        stores: List[str],
+        products: List[str],
+        resolve_store: Callable[[str], Optional[str]],
+        resolve_product: Callable[[str], Optional[str]],
+        detect_category: Callable[[str], str],
+    ) -> "CompiledWatchlist":
+        """Resolve every name once and build the product x store pairs."""
+        store_codes = {name: resolve_store(name) for name in stores}
+        product_codes = {name: resolve_product(name) for name in products}
+
+        pairs = [
+            WatchlistPair(
+                product_code=product_codes[product_name],
+                product_name=product_name,
+                store_code=store_codes[store_name],
+                store_name=store_name,
+                category=detect_category(product_name),
+            )
+            for store_name in stores
+            if store_codes[store_name]
+            for product_name in products
+            if product_codes[product_name]
+        ]
+
+        return cls(
+            stores,
+            products,
+            pairs,
+            [name for name, code in store_codes.items() if not code],
+            [name for name, code in product_codes.items() if not code],
+        )
+
+    @property
+    def complete(self) -> bool:
+        """Return True if every configured name resolved to a code."""
+        return not self.unresolved_stores and not self.unresolved_products
+
+    def by_product(self) -> Dict[str, List[WatchlistPair]]:
+        """Group pairs by product code, one stock query per product."""
+        groups: Dict[str, List[WatchlistPair]] = {}
+        for pair in self.pairs:
+            groups.setdefault(pair.product_code, []).append(pair)
+        return groups
+
+    def subset(self, keys) -> "CompiledWatchlist":
+        """Return a watchlist holding only the pairs with the given keys."""
+        keys = set(keys)
+        return CompiledWatchlist(
+            self.stores,
+            self.products,
+            [pair for pair in self.pairs if pair.key in keys],
+            [],
+            [],
+        )
+
+    def matches(self, stores: List[str], products: List[str]) -> bool:
+        """Return True if this watchlist was compiled from the given names."""
+        return self.stores == tuple(stores) and self.products == tuple(products)
@@ -1,15 +1,118 @@
 """Zipcode utilities for finding nearby Apple Stores."""
 
+import csv
+import heapq
 import math
-import requests
+import os
+import sqlite3
+import struct
+import sys
+import threading
+import zlib
 import logging
-from typing import Dict, List, Tuple, Optional
+from array import array
+from typing import Dict, Iterable, List, Tuple, Optional
+
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
 
 _LOGGER = logging.getLogger(__name__)
 
+EARTH_RADIUS_MILES = 3956
+
+# Bundled US ZIP centroids (source data: the MIT-licensed `zipcodes` package).
+# Layout: header, then zlib-compressed little-endian int32 latitudes for every
+# zipcode 00000-99999 followed by the same for longitudes, in 1e-4 degrees.
+# Missing zipcodes hold _MISSING, so a lookup is a single array index.
+ZIPCODE_TABLE_PATH = os.path.join(os.path.dirname(__file__), "zipcodes.bin")
+
+_HEADER = struct.Struct("<4sHI")
+_MAGIC = b"ZIPC"
+_VERSION = 1
+_SLOTS = 100000
+_SCALE = 10000
+_MISSING = -(2**31)
+
+_table: Optional[array] = None
+_table_lock = threading.Lock()
+
+
+def _load_zipcode_table() -> array:
+    """Load the packed zipcode table on first use."""
+    global _table
+
+    if _table is None:
+        with _table_lock:
+            if _table is None:
+                with open(ZIPCODE_TABLE_PATH, "rb") as f:
+                    magic, version, _count = _HEADER.unpack(f.read(_HEADER.size))
+                    if magic != _MAGIC or version != _VERSION:
+                        raise ValueError(
+                            f"Unsupported zipcode table {ZIPCODE_TABLE_PATH}"
+                        )
+
+                    table = array("i")
+                    table.frombytes(zlib.decompress(f.read()))
+
+                if sys.byteorder != "little":
+                    table.byteswap()
+                _table = table
+
+    return _table
+
+
+def lookup_zipcode(zipcode: str) -> Optional[Tuple[float, float]]:
+    """Get latitude and longitude for a zipcode from the bundled table."""
+    zipcode = str(zipcode).strip()[:5]
+    if len(zipcode) != 5 or not zipcode.isdigit():
+        return None
+
+    try:
+        table = _load_zipcode_table()
+    except (OSError, ValueError, zlib.error) as e:
+        _LOGGER.error(f"Could not load bundled zipcode table: {e}")
+        return None
+
+    index = int(zipcode)
+    lat = table[index]
+    if lat == _MISSING:
+        return None
+
+    return (lat / _SCALE, table[_SLOTS + index] / _SCALE)
+
+
+def get_zipcode_coordinates(
+    zipcode: str, allow_network: bool = False
+) -> Optional[Tuple[float, float]]:
+    """Get latitude and longitude for a zipcode, offline first."""
+    coordinates = lookup_zipcode(zipcode)
+    if coordinates or not allow_network:
+        if not coordinates:
+            _LOGGER.warning(f"Could not find coordinates for zipcode {zipcode}")
+        return coordinates
+
+    return _fetch_zipcode_coordinates(zipcode)
 
-def get_zipcode_coordinates(zipcode: str) -> Optional[Tuple[float, float]]:
+
+# Zipcodes the network lookup resolved; failures are not kept, so a
+# transient error is retried on the next call
+_fetched_coordinates: Dict[str, Tuple[float, float]] = {}
+_FETCHED_MAX = 256
+
+
+def _fetch_zipcode_coordinates(zipcode: str) -> Optional[Tuple[float, float]]:
     """Get latitude and longitude for a zipcode using a free API."""
+    coordinates = _fetched_coordinates.get(zipcode)
+    if coordinates is not None:
+        return coordinates
+
+    import requests
+
     try:
         # Using zippopotam.us - free zipcode API
         url = f"http://api.zippopotam.us/us/{zipcode}"
@@ -19,6 +122,9 @@ def get_zipcode_coordinates(zipcode: str) -> Optional[Tuple[float, float]]:
             data = response.json()
             lat = float(data["places"][0]["latitude"])
             lon = float(data["places"][0]["longitude"])
+            if len(_fetched_coordinates) >= _FETCHED_MAX:
+                _fetched_coordinates.pop(next(iter(_fetched_coordinates)))
+            _fetched_coordinates[zipcode] = (lat, lon)
             return (lat, lon)
         else:
             _LOGGER.warning(f"Could not find coordinates for zipcode {zipcode}")
@@ -29,6 +135,31 @@ def get_zipcode_coordinates(zipcode: str) -> Optional[Tuple[float, float]]:
         return None
 
 
+def build_zipcode_table(csv_path: str, output_path: str = ZIPCODE_TABLE_PATH) -> int:
+    """Pack a `zipcode,latitude,longitude` CSV into the bundled table format."""
+    table = array("i", [_MISSING]) * (2 * _SLOTS)
+    count = 0
+
+    with open(csv_path, newline="") as f:
+        for row in csv.reader(f):
+            if len(row) < 3 or not row[0].strip().isdigit():
+                continue
+
+            index = int(row[0].strip()[:5])
+            table[index] = round(float(row[1]) * _SCALE)
+            table[_SLOTS + index] = round(float(row[2]) * _SCALE)
+            count += 1
+
+    if sys.byteorder != "little":
+        table.byteswap()
+
+    with open(output_path, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, _VERSION, count))
+        f.write(zlib.compress(table.tobytes(), 9))
+
+    return count
+
+
 def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     """Calculate distance between two points using Haversine formula."""
     # Convert latitude and longitude from degrees to radians
@@ -43,42 +174,232 @@ def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> fl
     )
     c = 2 * math.asin(math.sqrt(a))
 
-    # Radius of earth in miles
-    r = 3956
+    return c * EARTH_RADIUS_MILES
+
+
+class StoreSpatialIndex:
+    """Nearest-store and radius queries over store coordinates.
 
-    return c * r
+    Distances for many origins are computed at once with vectorized NumPy
+    haversine when NumPy is installed, and with plain Python otherwise.
+    """
+
+    def __init__(self, stores: Iterable[Dict]):
+        """Index stores given as dicts with code, name, state, lat and lon."""
+        self.stores = [
+            store
+            for store in stores
+            if store.get("lat") is not None and store.get("lon") is not None
+        ]
+
+        lats = [math.radians(store["lat"]) for store in self.stores]
+        lons = [math.radians(store["lon"]) for store in self.stores]
+
+        if NUMPY_AVAILABLE:
+            self._lat = np.array(lats, dtype=float)
+            self._lon = np.array(lons, dtype=float)
+            self._cos_lat = np.cos(self._lat)
+        else:
+            self._lat = lats
+            self._lon = lons
+            self._cos_lat = [math.cos(lat) for lat in lats]
+
+    def __len__(self) -> int:
+        return len(self.stores)
+
+    @classmethod
+    def from_stores_data(cls, stores_data: Dict) -> "StoreSpatialIndex":
+        """Build an index from a {name: {code, state, lat, lon}} mapping."""
+        return cls(
+            {
+                "name": store_name,
+                "code": store_info["code"],
+                "state": store_info.get("state"),
+                "lat": store_info["lat"],
+                "lon": store_info["lon"],
+            }
+            for store_name, store_info in stores_data.items()
+        )
+
+    @classmethod
+    def from_database(cls, db_path: str) -> "StoreSpatialIndex":
+        """Build an index from the stores table of the products database."""
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+
+        cursor.execute(
+            """
+            SELECT store_code, store_name, state, latitude, longitude
+            FROM stores
+            WHERE is_active = 1 AND latitude IS NOT NULL AND longitude IS NOT NULL
+        """
+        )
+
+        rows = cursor.fetchall()
+        conn.close()
+
+        return cls(
+            {
+                "code": row[0],
+                "name": row[1],
+                "state": row[2],
+                "lat": row[3],
+                "lon": row[4],
+            }
+            for row in rows
+        )
+
+    def distances(self, origins: List[Tuple[float, float]]):
+        """Return an origins x stores matrix of distances in miles."""
+        if NUMPY_AVAILABLE:
+            origins_rad = np.radians(np.asarray(origins, dtype=float).reshape(-1, 2))
+            lat = origins_rad[:, 0:1]
+            lon = origins_rad[:, 1:2]
+
+            a = (
+                np.sin((self._lat - lat) / 2) ** 2
+                + np.cos(lat) * self._cos_lat * np.sin((self._lon - lon) / 2) ** 2
+            )
+            return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+        matrix = []
+        for origin_lat, origin_lon in origins:
+            lat = math.radians(origin_lat)
+            lon = math.radians(origin_lon)
+            cos_lat = math.cos(lat)
+
+            row = []
+            for store_lat, store_lon, store_cos in zip(
+                self._lat, self._lon, self._cos_lat
+            ):
+                a = (
+                    math.sin((store_lat - lat) / 2) ** 2
+                    + cos_lat * store_cos * math.sin((store_lon - lon) / 2) ** 2
+                )
+                row.append(2 * EARTH_RADIUS_MILES * math.asin(math.sqrt(min(a, 1.0))))
+            matrix.append(row)
+
+        return matrix
+
+    def nearest(
+        self,
+        origins: List[Tuple[float, float]],
+        k: int = 1,
+        max_distance: Optional[float] = None,
+        store_codes: Optional[Iterable[str]] = None,
+    ) -> List[List[Dict]]:
+        """Return the k nearest stores for each origin, closest first.
+
+        store_codes restricts the candidates, e.g. to stores that have stock.
+        """
+        candidates = self._candidates(store_codes)
+        if not origins or not candidates or k <= 0:
+            return [[] for _ in origins]
+
+        results = []
+        for row in self.distances(origins):
+            if NUMPY_AVAILABLE:
+                row = row[candidates]
+                count = min(k, len(candidates))
+                order = np.argpartition(row, count - 1)[:count]
+                order = order[np.argsort(row[order])]
+                matches = [(float(row[i]), candidates[i]) for i in order]
+            else:
+                matches = heapq.nsmallest(k, ((row[i], i) for i in candidates))
+
+            results.append(
+                [
+                    self._result(index, distance)
+                    for distance, index in matches
+                    if max_distance is None or distance <= max_distance
+                ]
+            )
+
+        return results
+
+    def within(
+        self,
+        origins: List[Tuple[float, float]],
+        max_distance: float,
+        store_codes: Optional[Iterable[str]] = None,
+    ) -> List[List[Dict]]:
+        """Return every store within max_distance miles of each origin."""
+        candidates = self._candidates(store_codes)
+        if not origins or not candidates:
+            return [[] for _ in origins]
+
+        results = []
+        for row in self.distances(origins):
+            if NUMPY_AVAILABLE:
+                row = row[candidates]
+                inside = np.nonzero(row <= max_distance)[0]
+                inside = inside[np.argsort(row[inside])]
+                matches = [(float(row[i]), candidates[i]) for i in inside]
+            else:
+                matches = sorted(
+                    (row[i], i) for i in candidates if row[i] <= max_distance
+                )
+
+            results.append(
+                [self._result(index, distance) for distance, index in matches]
+            )
+
+        return results
+
+    def _candidates(self, store_codes: Optional[Iterable[str]]) -> List[int]:
+        """Return the indexes of stores eligible for a query."""
+        if store_codes is None:
+            return list(range(len(self.stores)))
+
+        store_codes = set(store_codes)
+        return [
+            index
+            for index, store in enumerate(self.stores)
+            if store["code"] in store_codes
+        ]
+
+    def _result(self, index: int, distance: float) -> Dict:
+        """Format one store match like find_nearby_stores results."""
+        store = self.stores[index]
+        return {
+            "name": store["name"],
+            "code": store["code"],
+            "state": store["state"],
+            "distance": round(distance, 1),
+            "lat": store["lat"],
+            "lon": store["lon"],
+        }
+
+
+# Index of the stores_data last passed to find_nearby_stores, kept with it
+_nearby_index: Optional[Tuple[Dict, StoreSpatialIndex]] = None
 
 
 def find_nearby_stores(
-    zipcode: str, stores_data: Dict, max_distance: float = 50.0
+    zipcode: str,
+    stores_data: Dict,
+    max_distance: float = 50.0,
+    allow_network: bool = False,
+    index: Optional[StoreSpatialIndex] = None,
 ) -> List[Dict]:
-    """Find Apple Stores within max_distance miles of zipcode."""
-    coordinates = get_zipcode_coordinates(zipcode)
+    """Find Apple Stores within max_distance miles of zipcode.
+
+    The index built for stores_data is reused while callers pass the same
+    mapping; pass index to share a prebuilt one instead. A mapping that is
+    changed in place needs a new index, passed explicitly.
+    """
+    global _nearby_index
+
+    coordinates = get_zipcode_coordinates(zipcode, allow_network)
     if not coordinates:
         return []
 
-    user_lat, user_lon = coordinates
-    nearby_stores = []
-
-    for store_name, store_info in stores_data.items():
-        store_lat = store_info["lat"]
-        store_lon = store_info["lon"]
-
-        distance = calculate_distance(user_lat, user_lon, store_lat, store_lon)
-
-        if distance <= max_distance:
-            nearby_stores.append(
-                {
-                    "name": store_name,
-                    "code": store_info["code"],
-                    "state": store_info["state"],
-                    "distance": round(distance, 1),
-                    "lat": store_lat,
-                    "lon": store_lon,
-                }
-            )
-
-    # Sort by distance
-    nearby_stores.sort(key=lambda x: x["distance"])
+    if index is None:
+        cached = _nearby_index
+        if cached is not None and cached[0] is stores_data:
+            index = cached[1]
+        else:
+            index = StoreSpatialIndex.from_stores_data(stores_data)
+            _nearby_index = (stores_data, index)
 
-    return nearby_stores
+    return index.within([coordinates], max_distance)[0]
@@ -6,26 +6,136 @@ Dynamic Apple Product Monitor - Automatically discovers products and stores
 import requests
 import json
 import re
-from bs4 import BeautifulSoup
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional
 import time
 from datetime import datetime
 import sqlite3
+import threading
+
+from metrics import METRICS
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
 
 
 class DynamicAppleMonitor:
     """Dynamically discover and monitor any Apple product at any store."""
 
+    PICKUP_URL = "https://www.apple.com/shop/retail/pickup-message"
+    DEFAULT_LOCATION = "10001"  # Use NYC zipcode to get all stores
+    CONNECT_TIMEOUT = 10  # seconds to establish a connection
+    RESPONSE_CHUNK_BYTES = 65536  # most body bytes read between deadline checks
+
+    # Apple product categories to scan
+    PRODUCT_CATEGORIES = {
+        "iphone": [
+            "iphone-17-pro",
+            "iphone-17",
+            "iphone-air",
+            "iphone-16",
+            "iphone-16-pro",
+            "iphone-15-pro",
+            "iphone-15",
+        ],
+        "ipad": ["ipad-pro", "ipad-air", "ipad", "ipad-mini"],
+        "mac": [
+            "macbook-air",
+            "macbook-pro",
+            "imac",
+            "mac-mini",
+            "mac-studio",
+            "mac-pro",
+        ],
+        "watch": ["apple-watch-series-10", "apple-watch-se", "apple-watch-ultra"],
+        "airpods": ["airpods-pro", "airpods", "airpods-max"],
+    }
+
     def __init__(self, db_path: str = "apple_products.db"):
         self.db_path = db_path
-        self.session = requests.Session()
-        self.session.headers.update(
-            {
-                "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
-            }
-        )
+        self._local = threading.local()
         self._init_database()
 
+    @property
+    def session(self) -> requests.Session:
+        """HTTP session of the calling thread; sessions are not thread-safe."""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+            session.headers.update(
+                {
+                    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
+                }
+            )
+        return session
+
+    def _get(
+        self, endpoint: str, url: str, deadline: Optional[float] = None, **kwargs
+    ) -> requests.Response:
+        """GET through the shared session, recording request metrics.
+
+        deadline is a time.monotonic() value the whole request must finish by.
+        """
+        start = time.perf_counter()
+        try:
+            if deadline is None:
+                response = self.session.get(url, **kwargs)
+            else:
+                response = self._get_by_deadline(url, deadline, **kwargs)
+        except Exception:
+            METRICS.record_request(endpoint, "error", time.perf_counter() - start)
+            raise
+
+        METRICS.record_request(
+            endpoint,
+            response.status_code,
+            time.perf_counter() - start,
+            len(response.content),
+        )
+        return response
+
+    def _get_by_deadline(
+        self, url: str, deadline: float, timeout: float = 30, **kwargs
+    ) -> requests.Response:
+        """GET that gives up once the deadline passes, even mid-body.
+
+        requests' timeout only bounds each socket operation, so a response
+        trickling in slowly could run on indefinitely; the body is streamed
+        and the clock checked between socket reads.
+        """
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise requests.Timeout(f"Deadline passed before requesting {url}")
+
+        read_timeout = min(timeout, remaining)
+        response = self.session.get(
+            url,
+            stream=True,
+            timeout=(min(self.CONNECT_TIMEOUT, read_timeout), read_timeout),
+            **kwargs,
+        )
+        # read1 makes one socket read at most, so a trickle cannot hold up the
+        # check between clock checks; urllib3 before 2.x only has full reads
+        if hasattr(response.raw, "read1"):
+            reads = iter(
+                lambda: response.raw.read1(
+                    self.RESPONSE_CHUNK_BYTES, decode_content=True
+                ),
+                b"",
+            )
+        else:
+            reads = response.iter_content(self.RESPONSE_CHUNK_BYTES)
+
+        with response:
+            chunks = []
+            for chunk in reads:
+                chunks.append(chunk)
+                if time.monotonic() >= deadline:
+                    raise requests.Timeout(f"Deadline passed while reading {url}")
+
+        # Fully read, so content and json() work as on a non-streamed response
+        response._content = b"".join(chunks)
+        return response
+
     def _init_database(self):
         """Initialize database to store discovered products and stores."""
         conn = sqlite3.connect(self.db_path)
@@ -67,6 +177,32 @@ class DynamicAppleMonitor:
         """
         )
 
+        # Full-text index over product names and codes
+        try:
+            cursor.execute(
+                """
+                CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+                    product_code,
+                    product_name,
+                    tokenize = 'unicode61'
+                )
+            """
+            )
+            self.fts_enabled = True
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5, searches fall back to LIKE
+            self.fts_enabled = False
+
+        if self.fts_enabled:
+            cursor.execute("SELECT COUNT(*) FROM products_fts")
+            if cursor.fetchone()[0] == 0:
+                cursor.execute(
+                    """
+                    INSERT INTO products_fts (product_code, product_name)
+                    SELECT product_code, product_name FROM products
+                """
+                )
+
         # Stock checks table
         cursor.execute(
             """
@@ -92,55 +228,39 @@ class DynamicAppleMonitor:
 
         print("🔍 Discovering All Apple Products...")
 
-        # Apple product categories to scan
-        categories = {
-            "iphone": [
-                "iphone-17-pro",
-                "iphone-17",
-                "iphone-air",
-                "iphone-16",
-                "iphone-16-pro",
-                "iphone-15-pro",
-                "iphone-15",
-            ],
-            "ipad": ["ipad-pro", "ipad-air", "ipad", "ipad-mini"],
-            "mac": [
-                "macbook-air",
-                "macbook-pro",
-                "imac",
-                "mac-mini",
-                "mac-studio",
-                "mac-pro",
-            ],
-            "watch": ["apple-watch-series-10", "apple-watch-se", "apple-watch-ultra"],
-            "airpods": ["airpods-pro", "airpods", "airpods-max"],
-        }
-
         all_products = {}
 
-        for category, models in categories.items():
-            print(f"\n📱 Scanning {category.upper()} products...")
-            category_products = []
+        for category in self.PRODUCT_CATEGORIES:
+            category_products = self.discover_category_products(category)
+            if category_products:
+                all_products[category] = category_products
 
-            for model in models:
-                try:
-                    products = self._discover_product_variants(category, model)
-                    if products:
-                        category_products.extend(products)
-                        print(f"   ✅ {model}: {len(products)} variants")
-                    else:
-                        print(f"   ❌ {model}: No variants found")
+        return all_products
 
-                    time.sleep(1)  # Rate limiting
+    def discover_category_products(self, category: str) -> List[Dict]:
+        """Discover the current products of a single category."""
 
-                except Exception as e:
-                    print(f"   ❌ {model}: Error - {e}")
+        print(f"\n📱 Scanning {category.upper()} products...")
+        category_products = []
 
-            if category_products:
-                all_products[category] = category_products
-                self._save_products_to_db(category_products, category)
+        for model in self.PRODUCT_CATEGORIES.get(category, []):
+            try:
+                products = self._discover_product_variants(category, model)
+                if products:
+                    category_products.extend(products)
+                    print(f"   ✅ {model}: {len(products)} variants")
+                else:
+                    print(f"   ❌ {model}: No variants found")
 
-        return all_products
+                time.sleep(1)  # Rate limiting
+
+            except Exception as e:
+                print(f"   ❌ {model}: Error - {e}")
+
+        if category_products:
+            self._save_products_to_db(category_products, category)
+
+        return category_products
 
     def _discover_product_variants(self, category: str, model: str) -> List[Dict]:
         """Discover all variants of a specific product model."""
@@ -148,7 +268,7 @@ class DynamicAppleMonitor:
         url = f"https://www.apple.com/shop/buy-{category}/{model}"
 
         try:
-            response = self.session.get(url, timeout=15)
+            response = self._get("product_page", url, timeout=15)
             if response.status_code != 200:
                 return []
 
@@ -159,6 +279,9 @@ class DynamicAppleMonitor:
             if not codes:
                 return []
 
+            # Only product discovery parses HTML, so bs4 is imported on demand
+            from bs4 import BeautifulSoup
+
             # Try to extract product names and details
             soup = BeautifulSoup(response.text, "html.parser")
 
@@ -188,7 +311,7 @@ class DynamicAppleMonitor:
             return []
 
     def _extract_product_details(
-        self, soup: BeautifulSoup, code: str, model: str, category: str
+        self, soup: "BeautifulSoup", code: str, model: str, category: str
     ) -> Dict:
         """Extract product details from the page."""
 
@@ -216,75 +339,58 @@ class DynamicAppleMonitor:
 
         print(f"🏪 Discovering Apple Stores near {zipcode}...")
 
-        url = "https://www.apple.com/shop/retail/pickup-message"
-        params = {"location": zipcode}
-
-        try:
-            response = self.session.get(url, params=params, timeout=15)
-            if response.status_code != 200:
-                return []
-
-            data = response.json()
-
-            if "body" not in data or "availabilityStores" not in data["body"]:
-                return []
-
-            store_codes = data["body"]["availabilityStores"].split(",")
-            stores = []
-
-            print(f"   Found {len(store_codes)} stores")
-
-            # Get detailed store information
-            for store_code in store_codes:
-                store_info = self._get_store_details(store_code, zipcode)
-                if store_info:
-                    stores.append(store_info)
+        stores = self.fetch_stores_near(zipcode)
+        print(f"   Found {len(stores)} stores")
 
+        if stores:
             self._save_stores_to_db(stores)
-            return stores
-
-        except Exception as e:
-            print(f"Error discovering stores: {e}")
-            return []
+        return stores
 
-    def _get_store_details(
-        self, store_code: str, zipcode: str = "10001"
-    ) -> Optional[Dict]:
-        """Get detailed information about a specific store."""
+    def fetch_stores_near(self, location: str) -> List[Dict]:
+        """Fetch every store Apple reports near a location in a single request."""
 
-        # Try to get store details by making a pickup request with zipcode
         url = "https://www.apple.com/shop/retail/pickup-message"
         params = {
             "parts.0": "MFXP4LL/A",  # Use a known working product code
-            "location": zipcode,  # Use zipcode, not store code
+            "location": location,
         }
 
         try:
-            response = self.session.get(url, params=params, timeout=10)
+            response = self._get("stores", url, params=params, timeout=15)
             if response.status_code != 200:
-                return None
+                return []
 
             data = response.json()
 
-            if "body" in data and "stores" in data["body"]:
-                for store in data["body"]["stores"]:
-                    if store.get("storeNumber") == store_code:
-                        return {
-                            "store_code": store_code,
-                            "store_name": store.get("storeName", "Unknown"),
-                            "city": store.get("city", "Unknown"),
-                            "state": store.get("state", "Unknown"),
-                            "country": store.get("country", "US"),
-                            "latitude": store.get("latitude"),
-                            "longitude": store.get("longitude"),
-                            "discovered_date": datetime.now().isoformat(),
-                        }
+            if "body" not in data or "stores" not in data["body"]:
+                return []
 
-            return None
+            return [
+                self._parse_store_record(store)
+                for store in data["body"]["stores"]
+                if store.get("storeNumber")
+            ]
 
         except Exception as e:
-            print(f"Error getting details for store {store_code}: {e}")
-            return None
+            print(f"Error discovering stores near {location}: {e}")
+            return []
+
+    @staticmethod
+    def _parse_store_record(store: Dict) -> Dict:
+        """Normalize a store entry from a pickup-message response."""
+        distance = store.get("storedistance")
+
+        return {
+            "store_code": store.get("storeNumber"),
+            "store_name": store.get("storeName", "Unknown"),
+            "city": store.get("city", "Unknown"),
+            "state": store.get("state", "Unknown"),
+            "country": store.get("country", "US"),
+            "latitude": store.get("latitude", store.get("storelatitude")),
+            "longitude": store.get("longitude", store.get("storelongitude")),
+            "distance": float(distance) if distance is not None else None,
+            "discovered_date": datetime.now().isoformat(),
+        }
 
     def _save_products_to_db(self, products: List[Dict], category: str):
         """Save discovered products to database."""
@@ -311,6 +417,19 @@ class DynamicAppleMonitor:
                 ),
             )
 
+        if self.fts_enabled:
+            cursor.executemany(
+                "DELETE FROM products_fts WHERE product_code = ?",
+                [(product["product_code"],) for product in products],
+            )
+            cursor.executemany(
+                "INSERT INTO products_fts (product_code, product_name) VALUES (?, ?)",
+                [
+                    (product["product_code"], product["product_name"])
+                    for product in products
+                ],
+            )
+
         conn.commit()
         conn.close()
 
@@ -429,58 +548,49 @@ class DynamicAppleMonitor:
         conn.close()
         return stores
 
-    def check_product_availability(self, product_code: str, store_code: str) -> Dict:
-        """Check if a specific product is available at a specific store."""
+    def check_product_availability(
+        self,
+        product_code: str,
+        store_code: str,
+        timeout: float = 30,
+        deadline: Optional[float] = None,
+    ) -> Dict:
+        """Check if a specific product is available at a specific store.
 
-        url = "https://www.apple.com/shop/retail/pickup-message"
-        params = {
-            "parts.0": product_code,
-            "location": "10001",  # Use NYC zipcode to get all stores
-        }
+        With a deadline (a time.monotonic() value) the request is abandoned
+        once it passes and the check reported as an error.
+        """
 
         try:
-            response = self.session.get(url, params=params, timeout=30)
-            response.raise_for_status()
+            with METRICS.phase("fetch"):
+                response = self._get(
+                    "pickup",
+                    self.PICKUP_URL,
+                    params=self.pickup_params(product_code),
+                    timeout=timeout,
+                    deadline=deadline,
+                )
+                response.raise_for_status()
 
-            data = response.json()
+            with METRICS.phase("parse"):
+                data = response.json()
+                result = self.parse_availability(data, product_code, store_code)
 
-            if "body" in data and "stores" in data["body"]:
-                for store in data["body"]["stores"]:
-                    if store.get("storeNumber") == store_code:
-                        parts_availability = store.get("partsAvailability", {})
-                        if product_code in parts_availability:
-                            part_info = parts_availability[product_code]
-                            pickup_display = part_info.get(
-                                "pickupDisplay", "unavailable"
-                            )
-
-                            # Save to database
-                            self._save_stock_check(
-                                store_code,
-                                product_code,
-                                pickup_display == "available",
-                                pickup_display,
-                                json.dumps(data),
-                            )
-
-                            return {
-                                "available": pickup_display == "available",
-                                "status": pickup_display,
-                                "store_name": store.get("storeName", ""),
-                                "store_code": store_code,
-                                "product_code": product_code,
-                                "timestamp": datetime.now().isoformat(),
-                            }
+            if result["status"] != "not_found":
+                # Save to database
+                with METRICS.phase("persist"):
+                    self._save_stock_check(
+                        store_code,
+                        product_code,
+                        result["available"],
+                        result["status"],
+                        json.dumps(data),
+                    )
 
-            return {
-                "available": False,
-                "status": "not_found",
-                "store_code": store_code,
-                "product_code": product_code,
-                "timestamp": datetime.now().isoformat(),
-            }
+            return result
 
         except Exception as e:
+            METRICS.inc("apple_stock_check_errors")
             return {
                 "available": False,
                 "status": "error",
@@ -490,6 +600,43 @@ class DynamicAppleMonitor:
                 "timestamp": datetime.now().isoformat(),
             }
 
+    @classmethod
+    def pickup_params(cls, product_code: str) -> Dict:
+        """Query parameters for a pickup availability request."""
+        return {
+            "parts.0": product_code,
+            "location": cls.DEFAULT_LOCATION,
+        }
+
+    @staticmethod
+    def parse_availability(data: Dict, product_code: str, store_code: str) -> Dict:
+        """Extract one store's availability for a product from a pickup response."""
+
+        if "body" in data and "stores" in data["body"]:
+            for store in data["body"]["stores"]:
+                if store.get("storeNumber") == store_code:
+                    parts_availability = store.get("partsAvailability", {})
+                    if product_code in parts_availability:
+                        part_info = parts_availability[product_code]
+                        pickup_display = part_info.get("pickupDisplay", "unavailable")
+
+                        return {
+                            "available": pickup_display == "available",
+                            "status": pickup_display,
+                            "store_name": store.get("storeName", ""),
+                            "store_code": store_code,
+                            "product_code": product_code,
+                            "timestamp": datetime.now().isoformat(),
+                        }
+
+        return {
+            "available": False,
+            "status": "not_found",
+            "store_code": store_code,
+            "product_code": product_code,
+            "timestamp": datetime.now().isoformat(),
+        }
+
     def _save_stock_check(
         self,
         store_code: str,
@@ -500,43 +647,74 @@ class DynamicAppleMonitor:
     ):
         """Save stock check result to database."""
 
+        self.save_stock_checks(
+            [
+                (
+                    datetime.now().isoformat(),
+                    store_code,
+                    product_code,
+                    available,
+                    pickup_display,
+                    raw_response,
+                )
+            ]
+        )
+
+    def save_stock_checks(self, rows: List[tuple]):
+        """Save a batch of stock check rows in one transaction.
+
+        Rows are (timestamp, store_code, product_code, available,
+        pickup_display, raw_response) tuples.
+        """
+
+        if not rows:
+            return
+
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
 
-        cursor.execute(
+        cursor.executemany(
             """
             INSERT INTO stock_checks 
             (timestamp, store_code, product_code, available, pickup_display, raw_response)
             VALUES (?, ?, ?, ?, ?, ?)
         """,
-            (
-                datetime.now().isoformat(),
-                store_code,
-                product_code,
-                available,
-                pickup_display,
-                raw_response,
-            ),
+            rows,
         )
 
         conn.commit()
         conn.close()
 
     def search_products(self, search_term: str) -> List[Dict]:
-        """Search for products by name or model."""
+        """Search for products by name or model, best matches first."""
 
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
 
-        cursor.execute(
-            """
-            SELECT product_code, product_name, category, price, url
-            FROM products 
-            WHERE (product_name LIKE ? OR product_code LIKE ?) AND is_active = 1
-            ORDER BY product_name
-        """,
-            (f"%{search_term}%", f"%{search_term}%"),
-        )
+        fts_query = self._build_fts_query(search_term)
+
+        if self.fts_enabled and fts_query:
+            # Every term must match a token prefix, ranked by bm25
+            cursor.execute(
+                """
+                SELECT p.product_code, p.product_name, p.category, p.price, p.url
+                FROM products_fts
+                JOIN products p ON p.product_code = products_fts.product_code
+                WHERE products_fts MATCH ? AND p.is_active = 1
+                ORDER BY bm25(products_fts), p.product_name
+            """,
+                (fts_query,),
+            )
+        else:
+            cursor.execute(
+                """
+                SELECT product_code, product_name, category, price, url
+                FROM products 
+                WHERE (product_name LIKE ? OR product_code LIKE ?) AND is_active = 1
+                ORDER BY product_name
+            """,
+                (f"%{search_term}%", f"%{search_term}%"),
+            )
 
         products = []
         for row in cursor.fetchall():
@@ -553,6 +731,12 @@ class DynamicAppleMonitor:
         conn.close()
         return products
 
+    @staticmethod
+    def _build_fts_query(search_term: str) -> str:
+        """Turn free text into an FTS5 query of quoted prefix terms."""
+        tokens = re.findall(r"\w+", search_term.lower())
+        return " ".join(f'"{token}"*' for token in tokens)
+
 
 def main():
     """Demonstrate the dynamic Apple monitor."""
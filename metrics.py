@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Runtime Metrics - Request counts, latencies and cycle timings in OpenMetrics text
+"""
+
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple
+
+# Latency buckets in seconds, from a fast API call up to a slow full cycle
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+METRIC_DEFINITIONS = {
+    "apple_stock_requests": ("counter", "HTTP requests by endpoint and status"),
+    "apple_stock_response_bytes": ("counter", "Response bytes received by endpoint"),
+    "apple_stock_request_duration_seconds": (
+        "histogram",
+        "HTTP request latency by endpoint",
+    ),
+    "apple_stock_phase_duration_seconds": (
+        "histogram",
+        "Time spent per check phase (resolve, fetch, parse, persist, analyze)",
+    ),
+    "apple_stock_cycle_duration_seconds": (
+        "histogram",
+        "Duration of a full stock check cycle",
+    ),
+    "apple_stock_check_errors": ("counter", "Product/store checks that failed"),
+    "apple_stock_cycle_timeouts": (
+        "counter",
+        "Product/store checks cut off by the cycle deadline",
+    ),
+    "apple_stock_skipped_cycles": (
+        "counter",
+        "Scheduled cycles dropped because the previous one overran",
+    ),
+    "apple_stock_notifications": (
+        "counter",
+        "SMS delivery attempts by outcome (sent, retry, failed)",
+    ),
+    "apple_stock_notification_latency_seconds": (
+        "histogram",
+        "Time from queueing an SMS to its delivery",
+    ),
+}
+
+LabelSet = Tuple[Tuple[str, str], ...]
+
+
+class MetricsRegistry:
+    """Thread-safe counters and histograms rendered as OpenMetrics text."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelSet, float]] = {}
+        # Per series: [bucket counts..., count, sum]
+        self._histograms: Dict[str, Dict[LabelSet, List[float]]] = {}
+        self._last_cycle_seconds = None
+
+    def inc(self, name: str, value: float = 1, **labels):
+        """Increase a counter."""
+        key = self._label_set(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        """Record one observation in a histogram."""
+        key = self._label_set(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            values = series.get(key)
+            if values is None:
+                values = series[key] = [0] * (len(self.buckets) + 2)
+
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    values[i] += 1
+            values[-2] += 1
+            values[-1] += value
+
+    @contextmanager
+    def time(self, name: str, **labels) -> Iterator[None]:
+        """Observe the wall time of a block in a histogram."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def phase(self, phase: str):
+        """Time one phase of a check cycle."""
+        return self.time("apple_stock_phase_duration_seconds", phase=phase)
+
+    def record_request(
+        self, endpoint: str, status, duration: float, response_bytes: int = 0
+    ):
+        """Record one HTTP request; status is the HTTP code or "error"."""
+        self.inc("apple_stock_requests", endpoint=endpoint, status=str(status))
+        self.observe(
+            "apple_stock_request_duration_seconds", duration, endpoint=endpoint
+        )
+        if response_bytes:
+            self.inc("apple_stock_response_bytes", response_bytes, endpoint=endpoint)
+
+    def summary(self) -> Dict:
+        """Return headline totals, e.g. for diagnostic sensors."""
+        with self._lock:
+            requests = self._counters.get("apple_stock_requests", {})
+            total = sum(requests.values())
+            failed = sum(
+                count
+                for labels, count in requests.items()
+                if not dict(labels)["status"].startswith("2")
+            )
+            cycles = self._histograms.get("apple_stock_cycle_duration_seconds", {})
+            cycle_count = sum(values[-2] for values in cycles.values())
+            cycle_sum = sum(values[-1] for values in cycles.values())
+            notifications = {
+                dict(labels)["outcome"]: count
+                for labels, count in self._counters.get(
+                    "apple_stock_notifications", {}
+                ).items()
+            }
+
+            return {
+                "requests": int(total),
+                "request_errors": int(failed),
+                "error_rate_percent": round(100 * failed / total, 2) if total else 0.0,
+                "response_bytes": int(
+                    sum(self._counters.get("apple_stock_response_bytes", {}).values())
+                ),
+                "check_errors": int(
+                    sum(self._counters.get("apple_stock_check_errors", {}).values())
+                ),
+                "notifications_sent": int(notifications.get("sent", 0)),
+                "notifications_failed": int(notifications.get("failed", 0)),
+                "cycles": int(cycle_count),
+                "average_cycle_seconds": (
+                    round(cycle_sum / cycle_count, 3) if cycle_count else None
+                ),
+                "last_cycle_seconds": self._last_cycle_seconds,
+            }
+
+    def record_cycle(self, duration: float):
+        """Record the duration of a full check cycle."""
+        self._last_cycle_seconds = round(duration, 3)
+        self.observe("apple_stock_cycle_duration_seconds", duration)
+
+    def render(self) -> str:
+        """Render every metric in the OpenMetrics text format."""
+        lines = []
+        with self._lock:
+            for name, (kind, help_text) in METRIC_DEFINITIONS.items():
+                lines.append(f"# TYPE {name} {kind}")
+                lines.append(f"# HELP {name} {help_text}")
+
+                if kind == "counter":
+                    for labels, value in sorted(self._counters.get(name, {}).items()):
+                        lines.append(
+                            f"{name}_total{self._format_labels(labels)} "
+                            f"{self._format_value(value)}"
+                        )
+                    continue
+
+                for labels, values in sorted(self._histograms.get(name, {}).items()):
+                    for bound, count in zip(self.buckets, values):
+                        bucket_labels = labels + (("le", f"{bound:g}"),)
+                        lines.append(
+                            f"{name}_bucket{self._format_labels(bucket_labels)} {count}"
+                        )
+                    inf_labels = labels + (("le", "+Inf"),)
+                    lines.append(
+                        f"{name}_bucket{self._format_labels(inf_labels)} {values[-2]}"
+                    )
+                    lines.append(
+                        f"{name}_count{self._format_labels(labels)} {values[-2]}"
+                    )
+                    lines.append(
+                        f"{name}_sum{self._format_labels(labels)} "
+                        f"{self._format_value(values[-1])}"
+                    )
+
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str):
+        """Atomically write the OpenMetrics text to a file for scrapers."""
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(self.render())
+            # mkstemp creates 0600; textfile collectors often run as another user
+            os.chmod(temp_path, 0o644)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    @staticmethod
+    def _format_value(value: float) -> str:
+        # Full precision: integers as-is, everything else as a round-trip float
+        if float(value).is_integer():
+            return str(int(value))
+        return repr(float(value))
+
+    @staticmethod
+    def _label_set(labels: Dict) -> LabelSet:
+        return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    @staticmethod
+    def _format_labels(labels: LabelSet) -> str:
+        if not labels:
+            return ""
+        escaped = (
+            (key, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+            for key, value in labels
+        )
+        return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+# Process-wide registry shared by the monitors and the CLI/HA surfaces
+METRICS = MetricsRegistry()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Cycle Scheduler - Drift-free check cycles on monotonic deadlines
+"""
+
+import random
+import time
+from typing import Callable, NamedTuple, Optional
+
+# What to do with deadlines that passed while a cycle overran
+OVERRUN_SKIP = "skip"  # drop them and wait for the next future deadline
+OVERRUN_COMPRESS = "compress"  # run one catch-up cycle now, then realign
+
+
+class ScheduledCycle(NamedTuple):
+    """When the next cycle fires and how the last one fit its slot."""
+
+    number: int
+    deadline: float  # monotonic grid point the cycle belongs to
+    fire_at: float  # monotonic time, jitter included
+    delay: float  # seconds from now until fire_at
+    slack: float  # seconds left in the slot; negative when the cycle overran
+    skipped: int  # deadlines dropped because of an overrun
+
+
+class CycleScheduler:
+    """Align cycles to a fixed grid of monotonic deadlines.
+
+    Deadlines are spaced exactly one interval apart, so cycle time never
+    accumulates into drift. Each cycle fires at a random offset of up to
+    `jitter` seconds past its deadline, so instances started together do
+    not stay in lockstep; the offset never carries over to later deadlines.
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        jitter: float = 0.0,
+        overrun: str = OVERRUN_SKIP,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self._clock = clock
+        self._sleep = sleep
+        self.reschedule(interval, jitter, overrun)
+        # Deadline of the cycle that ran last; the first one runs immediately
+        self._deadline = clock()
+        self._number = 1
+
+    def reschedule(
+        self, interval: float, jitter: float = 0.0, overrun: str = OVERRUN_SKIP
+    ):
+        """Change the period; the grid continues from the last cycle's deadline."""
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        if overrun not in (OVERRUN_SKIP, OVERRUN_COMPRESS):
+            raise ValueError(f"Unknown overrun policy: {overrun}")
+
+        self.interval = interval
+        # Jitter past a whole interval would reorder cycles
+        self.jitter = min(max(jitter, 0.0), interval)
+        self.overrun = overrun
+
+    def next_cycle(self) -> ScheduledCycle:
+        """Plan the cycle after the one that ran last.
+
+        Planning again before waiting, e.g. after reschedule(), replaces
+        the earlier plan.
+        """
+        now = self._clock()
+        deadline = self._deadline + self.interval
+        slack = deadline - now
+        skipped = 0
+
+        if slack < 0:
+            # Every deadline at or before now was missed
+            missed = int(-slack // self.interval) + 1
+            if self.overrun == OVERRUN_SKIP:
+                skipped = missed
+                deadline += missed * self.interval
+            else:
+                # Run the latest missed deadline right away, drop the rest
+                skipped = missed - 1
+                deadline += skipped * self.interval
+
+        if deadline > now:
+            fire_at = deadline + random.uniform(0, self.jitter)
+        else:
+            fire_at = now
+
+        return ScheduledCycle(
+            self._number + 1, deadline, fire_at, fire_at - now, slack, skipped
+        )
+
+    def wait(
+        self,
+        cycle: ScheduledCycle,
+        interrupt: Optional[Callable[[], bool]] = None,
+        poll_interval: float = 5.0,
+    ) -> bool:
+        """Sleep until the planned cycle is due and mark it as running.
+
+        With an interrupt callback, it is polled every poll_interval seconds
+        and a true result ends the wait early; the cycle then stays pending
+        and False is returned so the caller can plan again.
+        """
+        while True:
+            remaining = cycle.fire_at - self._clock()
+            if remaining <= 0:
+                break
+
+            if interrupt is None:
+                self._sleep(remaining)
+                continue
+
+            self._sleep(min(remaining, poll_interval))
+            if interrupt():
+                return False
+
+        self._deadline = cycle.deadline
+        self._number = cycle.number
+        return True
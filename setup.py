@@ -28,22 +28,24 @@ def quick_setup_iphone_17_pro():
     print("🍎 Quick Setup: iPhone 17 Pro Deep Blue 512GB")
     print("=" * 50)
 
-    # Add the iPhone 17 Pro Deep Blue 512GB
-    os.system(
-        'python apple_monitor.py add-product MG7Q4LL/A "iPhone 17 Pro 512GB Deep Blue"'
-    )
+    from apple_monitor import AppleStockMonitor
 
-    # Add some common stores
-    print("\n🏪 Adding common Apple stores...")
+    # The iPhone 17 Pro Deep Blue 512GB and some common stores, in one write
+    products = [
+        {"product_code": "MG7Q4LL/A", "product_name": "iPhone 17 Pro 512GB Deep Blue"}
+    ]
     stores = [
-        ("R090", "Washington Square, Tigard"),
-        ("R191", "Pioneer Place, Portland"),
-        ("R409", "Fifth Avenue, NYC"),
-        ("R014", "SoHo, NYC"),
+        {"store_code": "R090", "store_name": "Washington Square, Tigard"},
+        {"store_code": "R191", "store_name": "Pioneer Place, Portland"},
+        {"store_code": "R409", "store_name": "Fifth Avenue, NYC"},
+        {"store_code": "R014", "store_name": "SoHo, NYC"},
     ]
 
-    for store_code, store_name in stores:
-        os.system(f'python apple_monitor.py add-store {store_code} "{store_name}"')
+    print("\n🏪 Adding iPhone 17 Pro and common Apple stores...")
+    added_products, added_stores = AppleStockMonitor().import_watchlist(
+        products, stores
+    )
+    print(f"✅ Added {added_products} products and {added_stores} stores")
 
     print("\n✅ Quick setup complete!")
     print("🚀 Start monitoring with: python apple_monitor.py run")
@@ -78,6 +80,8 @@ def interactive_setup():
 
     print("\nTo add a store, use:")
     print("python apple_monitor.py add-store <CODE> <NAME>")
+    print("Or add many at once from a CSV or JSON file:")
+    print("python apple_monitor.py import <FILE>")
 
     print("\n✅ Setup complete!")
     print("📊 Check status with: python apple_monitor.py status")
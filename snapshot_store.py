@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Snapshot Store - Persist the last completed stock check for fast warm starts
+"""
+
+import gzip
+import json
+import os
+import stat
+import tempfile
+from typing import Dict, Optional
+
+
+class SnapshotStore:
+    """Save and load the last completed check result as compact gzipped JSON."""
+
+    def __init__(self, path: str = "last_snapshot.json.gz"):
+        self.path = path
+
+    def save(self, results: Dict):
+        """Atomically replace the stored snapshot with a completed result."""
+        payload = json.dumps(results, separators=(",", ":")).encode("utf-8")
+
+        # Write to a temp file in the same directory, then rename over the old
+        # snapshot so a crash mid-write never leaves a truncated file behind
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(gzip.compress(payload))
+            # mkstemp creates 0600; keep the mode the snapshot already had
+            try:
+                mode = stat.S_IMODE(os.stat(self.path).st_mode)
+            except FileNotFoundError:
+                mode = 0o644
+            os.chmod(temp_path, mode)
+            os.replace(temp_path, self.path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def load(self) -> Optional[Dict]:
+        """Return the stored snapshot marked as stale, or None if there is none."""
+        try:
+            with gzip.open(self.path, "rb") as f:
+                results = json.loads(f.read().decode("utf-8"))
+        except (OSError, EOFError, ValueError):
+            return None
+
+        return mark_stale(results)
+
+
+def mark_stale(results: Dict) -> Dict:
+    """Flag a restored result and each of its pairs as stale."""
+    results["stale"] = True
+    for individual_result in results.get("individual_results", {}).values():
+        individual_result["stale"] = True
+    return results
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Stock Events - Typed availability changes derived from pair results as they arrive
+"""
+
+from typing import Dict, NamedTuple, Optional, Tuple
+
+BECAME_AVAILABLE = "became_available"
+BECAME_UNAVAILABLE = "became_unavailable"
+STATUS_CHANGED = "status_changed"  # e.g. unavailable -> ineligible
+ERROR = "error"
+
+
+class StockEvent(NamedTuple):
+    """One change in a product's availability at a store."""
+
+    kind: str
+    product_code: str
+    store_code: str
+    product_name: str
+    store_name: str
+    status: str
+    previous_status: Optional[str]
+    timestamp: str
+    error: Optional[str] = None
+
+
+class StockEventTracker:
+    """Turn pair results into change events against the last known state.
+
+    A pair seen for the first time only produces an event if it is
+    available. Errors are reported every time but do not replace the last
+    known state, so a failed check between two identical ones is no change.
+    """
+
+    def __init__(self):
+        # (product_code, store_code) -> (available, status)
+        self._state: Dict[Tuple[str, str], Tuple[bool, str]] = {}
+
+    def seed(self, results: Dict):
+        """Take the known state from a previous cycle's results."""
+        for key, individual_result in results.get("individual_results", {}).items():
+            # Errors and entries the deadline left stale say nothing about stock
+            stale = individual_result.get("stale")
+            if individual_result.get("status") == "error" or stale:
+                continue
+            product_code, _, store_code = key.partition("_")
+            self._state[(product_code, store_code)] = (
+                individual_result["available"],
+                individual_result["status"],
+            )
+
+    def observe(self, product: Dict, store: Dict, result: Dict) -> Optional[StockEvent]:
+        """Record one pair result; return the event it amounts to, if any."""
+        pair = (product["product_code"], store["store_code"])
+        available = result.get("available", False)
+        status = result.get("status", "unknown")
+        previous = self._state.get(pair)
+
+        if status == "error":
+            kind = ERROR
+        else:
+            self._state[pair] = (available, status)
+            if previous is None:
+                kind = BECAME_AVAILABLE if available else None
+            elif available != previous[0]:
+                kind = BECAME_AVAILABLE if available else BECAME_UNAVAILABLE
+            elif status != previous[1]:
+                kind = STATUS_CHANGED
+            else:
+                kind = None
+
+        if kind is None:
+            return None
+
+        return StockEvent(
+            kind,
+            product["product_code"],
+            store["store_code"],
+            product["product_name"],
+            store["store_name"],
+            status,
+            previous[1] if previous else None,
+            result.get("timestamp", ""),
+            result.get("error"),
+        )
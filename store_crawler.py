@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Apple Store Catalog Crawler - Sweep seed locations to build a nationwide store catalog
+"""
+
+import json
+import sqlite3
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from dynamic_apple_monitor import DynamicAppleMonitor
+
+# One zipcode per metro area, ordered so early waves spread across the country
+DEFAULT_SEED_ZIPCODES = [
+    "10001",  # New York, NY
+    "90210",  # Los Angeles, CA
+    "60601",  # Chicago, IL
+    "77002",  # Houston, TX
+    "33101",  # Miami, FL
+    "98101",  # Seattle, WA
+    "80202",  # Denver, CO
+    "30303",  # Atlanta, GA
+    "02108",  # Boston, MA
+    "85004",  # Phoenix, AZ
+    "94103",  # San Francisco, CA
+    "75201",  # Dallas, TX
+    "19103",  # Philadelphia, PA
+    "20001",  # Washington, DC
+    "48226",  # Detroit, MI
+    "55401",  # Minneapolis, MN
+    "97223",  # Portland, OR
+    "89101",  # Las Vegas, NV
+    "84101",  # Salt Lake City, UT
+    "63101",  # St. Louis, MO
+    "28202",  # Charlotte, NC
+    "37203",  # Nashville, TN
+    "70112",  # New Orleans, LA
+    "92101",  # San Diego, CA
+    "78701",  # Austin, TX
+    "32801",  # Orlando, FL
+    "44113",  # Cleveland, OH
+    "46204",  # Indianapolis, IN
+    "64105",  # Kansas City, MO
+    "15222",  # Pittsburgh, PA
+    "53202",  # Milwaukee, WI
+    "73102",  # Oklahoma City, OK
+    "87102",  # Albuquerque, NM
+    "96813",  # Honolulu, HI
+    "99501",  # Anchorage, AK
+    "06103",  # Hartford, CT
+    "21202",  # Baltimore, MD
+    "23219",  # Richmond, VA
+    "40202",  # Louisville, KY
+    "68102",  # Omaha, NE
+    "83702",  # Boise, ID
+    "95814",  # Sacramento, CA
+    "35203",  # Birmingham, AL
+    "29201",  # Columbia, SC
+    "72201",  # Little Rock, AR
+    "50309",  # Des Moines, IA
+    "59101",  # Billings, MT
+    "04101",  # Portland, ME
+]
+
+# ZIP prefixes outside the contiguous US (PR/VI, HI, Guam, AK). No mainland
+# seed's results reach these stores, so they are crawled before the idle
+# cutoff can end the sweep
+OUTLYING_ZIP_PREFIXES = (
+    *("006", "007", "008", "009"),  # Puerto Rico, Virgin Islands
+    *("967", "968"),  # Hawaii
+    "969",  # Guam and the Pacific territories
+    *("995", "996", "997", "998", "999"),  # Alaska
+)
+
+
+def is_outlying(zipcode: str) -> bool:
+    """Return True for a zipcode outside the contiguous US."""
+    return zipcode.startswith(OUTLYING_ZIP_PREFIXES)
+
+
+class StoreCatalogCrawler:
+    """Sweep seed locations concurrently and merge every store into the catalog."""
+
+    def __init__(
+        self,
+        monitor: Optional[DynamicAppleMonitor] = None,
+        seeds: Optional[List[str]] = None,
+        max_workers: int = 4,
+        max_idle_waves: int = 2,
+    ):
+        self.monitor = monitor or DynamicAppleMonitor()
+        self.db_path = self.monitor.db_path
+        # Stable sort: outlying seeds first, the rest in their given order
+        self.seeds = sorted(
+            seeds or DEFAULT_SEED_ZIPCODES, key=lambda seed: not is_outlying(seed)
+        )
+        self.max_workers = max(1, max_workers)
+        self.max_idle_waves = max(1, max_idle_waves)
+        self._init_database()
+
+    def _init_database(self):
+        """Initialize the table mapping each seed to the stores it covers."""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS store_coverage (
+                seed TEXT NOT NULL,
+                store_code TEXT NOT NULL,
+                distance REAL,
+                crawled_date TEXT,
+                PRIMARY KEY (seed, store_code)
+            )
+        """
+        )
+
+        conn.commit()
+        conn.close()
+
+    def crawl(self) -> Dict:
+        """Crawl seeds in waves until new waves stop finding new stores."""
+        print(f"🗺️  Crawling Apple stores from {len(self.seeds)} seed locations...")
+
+        catalog: Dict[str, Dict] = {}
+        coverage: Dict[str, List[Dict]] = {}
+        idle_waves = 0
+        wave_number = 0
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for start in range(0, len(self.seeds), self.max_workers):
+                wave = self.seeds[start : start + self.max_workers]
+                wave_number += 1
+                new_stores = 0
+
+                for seed, stores in zip(wave, pool.map(self._fetch_seed, wave)):
+                    coverage[seed] = stores
+                    for store in stores:
+                        if store["store_code"] not in catalog:
+                            catalog[store["store_code"]] = store
+                            new_stores += 1
+
+                print(
+                    f"   Wave {wave_number} ({', '.join(wave)}): "
+                    f"{new_stores} new, {len(catalog)} total"
+                )
+
+                if new_stores:
+                    idle_waves = 0
+                    continue
+
+                idle_waves += 1
+                if idle_waves >= self.max_idle_waves:
+                    print(f"   No new stores in {idle_waves} waves, stopping")
+                    break
+
+        if catalog:
+            self.monitor._save_stores_to_db(list(catalog.values()))
+        self._save_coverage(coverage)
+
+        print(f"✅ Catalog has {len(catalog)} stores from {len(coverage)} seeds")
+
+        return {
+            "stores": list(catalog.values()),
+            "coverage": {
+                seed: [store["store_code"] for store in stores]
+                for seed, stores in coverage.items()
+            },
+            "seeds_crawled": len(coverage),
+        }
+
+    def _fetch_seed(self, seed: str) -> List[Dict]:
+        """Fetch stores near one seed, deduped by store number."""
+        stores = {}
+        for store in self.monitor.fetch_stores_near(seed):
+            stores.setdefault(store["store_code"], store)
+        return list(stores.values())
+
+    def _save_coverage(self, coverage: Dict[str, List[Dict]]):
+        """Replace the stored coverage rows for every crawled seed."""
+        now = datetime.now().isoformat()
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.executemany(
+            "DELETE FROM store_coverage WHERE seed = ?",
+            [(seed,) for seed in coverage],
+        )
+        cursor.executemany(
+            """
+            INSERT OR REPLACE INTO store_coverage
+            (seed, store_code, distance, crawled_date)
+            VALUES (?, ?, ?, ?)
+        """,
+            [
+                (seed, store["store_code"], store.get("distance"), now)
+                for seed, stores in coverage.items()
+                for store in stores
+            ],
+        )
+
+        conn.commit()
+        conn.close()
+
+    def get_coverage_map(self) -> Dict[str, List[str]]:
+        """Get the stored seed -> store codes coverage map."""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute(
+            """
+            SELECT seed, store_code FROM store_coverage
+            ORDER BY seed, distance
+        """
+        )
+
+        coverage: Dict[str, List[str]] = {}
+        for seed, store_code in cursor.fetchall():
+            coverage.setdefault(seed, []).append(store_code)
+
+        conn.close()
+        return coverage
+
+    def seeds_covering(self, store_codes: Iterable[str]) -> Dict[str, List[str]]:
+        """Pick a small set of seeds whose responses include every given store.
+
+        Greedy set cover over the coverage map: each returned seed maps to the
+        requested stores one query from that seed will answer for.
+        """
+        remaining = set(store_codes)
+        coverage = {
+            seed: set(codes) & remaining
+            for seed, codes in self.get_coverage_map().items()
+        }
+
+        plan: Dict[str, List[str]] = {}
+        while remaining:
+            seed = max(coverage, key=lambda s: len(coverage[s]), default=None)
+            if seed is None or not coverage[seed]:
+                break
+
+            covered = coverage.pop(seed)
+            plan[seed] = sorted(covered)
+            remaining -= covered
+            for codes in coverage.values():
+                codes -= covered
+
+        return plan
+
+
+def main():
+    """Crawl the nationwide store catalog."""
+    seeds = sys.argv[1:] or None
+    crawler = StoreCatalogCrawler(seeds=seeds)
+    result = crawler.crawl()
+
+    print("\nCoverage:")
+    print(json.dumps(result["coverage"], indent=2))
+
+
+if __name__ == "__main__":
+    main()
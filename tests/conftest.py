@@ -0,0 +1,17 @@
+"""Make the CLI modules and the integration's pure modules importable."""
+
+import os
+import sys
+import types
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+INTEGRATION = "custom_components.apple_store_notifier"
+
+sys.path.insert(0, REPO_DIR)
+
+# The integration's __init__ imports homeassistant; register the package
+# without running it so modules such as digest and outbox load on their own
+if INTEGRATION not in sys.modules:
+    package = types.ModuleType(INTEGRATION)
+    package.__path__ = [os.path.join(REPO_DIR, *INTEGRATION.split("."))]
+    sys.modules[INTEGRATION] = package
@@ -0,0 +1,103 @@
+"""Tests for per-pair alert transitions, cooldown and re-alerts."""
+
+from datetime import timedelta
+
+import pytest
+
+from custom_components.apple_store_notifier.alert_state import AlertStateTracker
+
+HOUR = timedelta(hours=1)
+
+
+def cycle(available=(), unavailable=(), error=(), stale=()):
+    """Build the results of one cycle from lists of (product, store) pairs."""
+    results = {"available_items": [], "individual_results": {}}
+
+    def record(pair, is_available, status, **extra):
+        product_code, store_code = pair
+        results["individual_results"][f"{product_code}_{store_code}"] = dict(
+            product_code=product_code,
+            store_code=store_code,
+            available=is_available,
+            status=status,
+            **extra,
+        )
+        if is_available:
+            results["available_items"].append(
+                {"product_code": product_code, "store_code": store_code}
+            )
+
+    for pair in available:
+        record(pair, True, "available")
+    for pair in unavailable:
+        record(pair, False, "unavailable")
+    for pair in error:
+        record(pair, False, "error")
+    for pair in stale:
+        record(pair, False, "timeout", stale=True)
+    return results
+
+
+PAIR = ("MX1", "R1")
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "alerts.db")
+
+
+def test_alerts_once_when_a_pair_comes_into_stock(db_path):
+    tracker = AlertStateTracker(db_path, cooldown=HOUR)
+
+    assert tracker.due_alerts("gw", cycle(unavailable=[PAIR])) == []
+    assert len(tracker.due_alerts("gw", cycle(available=[PAIR]))) == 1
+    assert tracker.due_alerts("gw", cycle(available=[PAIR])) == []
+
+
+def test_cooldown_suppresses_a_quick_restock(db_path):
+    tracker = AlertStateTracker(db_path, cooldown=HOUR)
+    tracker.due_alerts("gw", cycle(available=[PAIR]))
+    tracker.due_alerts("gw", cycle(unavailable=[PAIR]))
+
+    assert tracker.due_alerts("gw", cycle(available=[PAIR])) == []
+
+
+def test_restock_after_the_cooldown_alerts_again(db_path):
+    tracker = AlertStateTracker(db_path, cooldown=timedelta(0))
+    tracker.due_alerts("gw", cycle(available=[PAIR]))
+    tracker.due_alerts("gw", cycle(unavailable=[PAIR]))
+
+    assert len(tracker.due_alerts("gw", cycle(available=[PAIR]))) == 1
+
+
+def test_realert_interval_repeats_while_available(db_path):
+    tracker = AlertStateTracker(db_path, cooldown=HOUR, realert_interval=HOUR)
+    tracker.due_alerts("gw", cycle(available=[PAIR]))
+    assert tracker.due_alerts("gw", cycle(available=[PAIR])) == []
+
+    tracker.realert_interval = timedelta(0)
+    assert len(tracker.due_alerts("gw", cycle(available=[PAIR]))) == 1
+
+
+def test_errors_and_stale_results_keep_the_previous_state(db_path):
+    tracker = AlertStateTracker(db_path, cooldown=timedelta(0))
+    tracker.due_alerts("gw", cycle(available=[PAIR]))
+    tracker.due_alerts("gw", cycle(error=[PAIR]))
+    tracker.due_alerts("gw", cycle(stale=[PAIR]))
+
+    # Still available as far as the tracker knows, so no restock alert
+    assert tracker.due_alerts("gw", cycle(available=[PAIR])) == []
+
+
+def test_recipients_are_tracked_separately(db_path):
+    tracker = AlertStateTracker(db_path, cooldown=HOUR)
+    tracker.due_alerts("gw1", cycle(available=[PAIR]))
+
+    assert len(tracker.due_alerts("gw2", cycle(available=[PAIR]))) == 1
+
+
+def test_state_survives_a_restart(db_path):
+    AlertStateTracker(db_path, cooldown=HOUR).due_alerts("gw", cycle(available=[PAIR]))
+
+    tracker = AlertStateTracker(db_path, cooldown=HOUR)
+    assert tracker.due_alerts("gw", cycle(available=[PAIR])) == []
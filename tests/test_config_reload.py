@@ -0,0 +1,110 @@
+"""Tests for config validation, diffing and hot reload."""
+
+import json
+import os
+
+import pytest
+
+from apple_monitor import AppleStockMonitor
+
+validate = AppleStockMonitor._validate_config
+diff = AppleStockMonitor._diff_config
+
+
+def config(**overrides):
+    base = {
+        "products_to_monitor": [{"product_code": "MX1/A", "product_name": "iPhone"}],
+        "stores_to_monitor": [{"store_code": "R014", "store_name": "SoHo"}],
+        "check_interval_minutes": 10,
+    }
+    base.update(overrides)
+    return base
+
+
+def test_valid_config_has_no_problems():
+    assert validate(config(workers=2, overrun_policy="compress")) == []
+
+
+@pytest.mark.parametrize(
+    "bad, problem",
+    [
+        ([], "not a JSON object"),
+        (config(products_to_monitor={}), "products_to_monitor must be a list"),
+        (config(stores_to_monitor=[{"store_code": "R1"}]), "needs store_name"),
+        (config(stores_to_monitor=["R1"]), "needs store_code, store_name"),
+        (config(check_interval_minutes=0), "check_interval_minutes must be"),
+        (config(check_interval_minutes="10"), "check_interval_minutes must be"),
+        (config(check_jitter_seconds=-1), "check_jitter_seconds must be"),
+        (config(workers=1.5), "workers must be an integer"),
+        (config(workers=True), "workers must be an integer"),
+        (config(overrun_policy="later"), "unknown overrun_policy"),
+        (config(snapshot_file=5), "snapshot_file must be a path"),
+    ],
+)
+def test_invalid_configs_are_reported(bad, problem):
+    assert any(problem in message for message in validate(bad))
+
+
+def test_zero_jitter_is_allowed():
+    assert validate(config(check_jitter_seconds=0)) == []
+
+
+def test_diff_reports_watchlist_changes_first():
+    new = config(check_interval_minutes=5)
+    new["products_to_monitor"] = [
+        {"product_code": "MX2/A", "product_name": "iPad"},
+        {"product_code": "MX3/A", "product_name": "Mac"},
+    ]
+
+    assert diff(config(), new) == [
+        "+2 products",
+        "-1 products",
+        "check_interval_minutes 10 → 5",
+    ]
+
+
+def test_diff_of_equal_configs_is_empty():
+    assert diff(config(), config()) == []
+
+
+@pytest.fixture
+def monitor(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps(config()))
+    return AppleStockMonitor(str(path))
+
+
+def edit(monitor, content):
+    """Rewrite the config file so its modification time visibly changes."""
+    with open(monitor.config_file, "w") as f:
+        f.write(content)
+    stat = os.stat(monitor.config_file)
+    os.utime(monitor.config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+def test_reload_applies_a_valid_edit(monitor):
+    assert not monitor.reload_config_if_changed()
+
+    edit(monitor, json.dumps(config(check_interval_minutes=5)))
+
+    assert monitor.reload_config_if_changed()
+    assert monitor.config["check_interval_minutes"] == 5
+
+
+@pytest.mark.parametrize(
+    "content", ['{"products_to_monitor": [', json.dumps(config(workers=0))]
+)
+def test_reload_keeps_the_previous_config_on_a_bad_edit(monitor, content):
+    monitor.progress = lambda message: None
+
+    edit(monitor, content)
+
+    assert not monitor.reload_config_if_changed()
+    assert monitor.config == config()
+
+
+def test_own_saves_are_not_reloaded(monitor):
+    monitor.config["check_interval_minutes"] = 5
+    monitor._save_config()
+
+    assert not monitor.reload_config_if_changed()
@@ -0,0 +1,100 @@
+"""Tests for SMS segment counting and alert digests."""
+
+import pytest
+
+from custom_components.apple_store_notifier.digest import (
+    build_digest,
+    sms_segments,
+    split_sms,
+)
+
+
+@pytest.mark.parametrize(
+    "text, segments",
+    [
+        ("", 1),
+        ("a" * 160, 1),
+        ("a" * 161, 2),
+        ("a" * 306, 2),
+        ("a" * 307, 3),
+        # Extension characters take two septets
+        ("€" * 80, 1),
+        ("€" * 81, 2),
+        # Outside GSM-7 the message falls back to UCS-2
+        ("ł" * 70, 1),
+        ("ł" * 71, 2),
+        ("ł" * 134, 2),
+        ("ł" * 135, 3),
+        # Emoji are two UTF-16 code units each
+        ("🍎" * 35, 1),
+        ("🍎" * 36, 2),
+    ],
+)
+def test_sms_segments(text, segments):
+    assert sms_segments(text) == segments
+
+
+def test_one_non_gsm_character_switches_the_whole_text_to_ucs2():
+    assert sms_segments("a" * 70) == 1
+    assert sms_segments("a" * 69 + "ł") == 1
+    assert sms_segments("a" * 70 + "ł") == 2
+
+
+def test_split_sms_packs_lines_within_the_limit():
+    lines = [f"line {i} " + "x" * 40 for i in range(20)]
+
+    messages = split_sms(lines, max_segments=1)
+
+    assert len(messages) > 1
+    assert all(sms_segments(message) == 1 for message in messages)
+    assert "\n".join(messages).split("\n") == lines
+
+
+def test_split_sms_cuts_a_line_longer_than_the_limit():
+    messages = split_sms(["a" * 400], max_segments=1)
+
+    assert [len(message) for message in messages] == [160, 160, 80]
+
+
+def test_split_sms_counts_the_reserve():
+    messages = split_sms(["a" * 160], max_segments=1, reserve="(1/2) ")
+
+    assert all(sms_segments("(1/2) " + message) == 1 for message in messages)
+    assert "".join(messages) == "a" * 160
+
+
+def item(product, store, store_code):
+    return {"product": product, "store": store, "store_code": store_code}
+
+
+def test_single_item_digest():
+    (message,) = build_digest("http://gw", [item("iPhone", "SoHo", "R014")])
+
+    assert message.gateway_url == "http://gw"
+    assert "iPhone" in message.message and "SoHo" in message.message
+
+
+def test_digest_groups_by_store_closest_first():
+    items = [
+        item("iPhone", "Far", "R1"),
+        item("iPad", "Near", "R2"),
+        item("Mac", "Near", "R2"),
+    ]
+
+    (message,) = build_digest("http://gw", items, {"R1": 40.0, "R2": 3.0})
+
+    lines = message.message.split("\n")
+    assert lines[0].startswith("🍎 STOCK ALERT: 3 items")
+    assert lines[1] == "Apple Near (3 mi): iPad, Mac"
+    assert lines[2] == "Apple Far (40 mi): iPhone"
+
+
+def test_long_digest_is_split_with_part_counters():
+    items = [item(f"Product {i} " + "x" * 30, f"Store {i}", f"R{i}") for i in range(30)]
+
+    messages = build_digest("http://gw", items, max_segments=1)
+
+    assert len(messages) > 1
+    for number, message in enumerate(messages, 1):
+        assert message.message.startswith(f"({number}/{len(messages)}) ")
+        assert sms_segments(message.message) == 1
@@ -0,0 +1,151 @@
+"""Tests for the durable SMS outbox."""
+
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from custom_components.apple_store_notifier import outbox as outbox_module
+from custom_components.apple_store_notifier.const import (
+    OUTBOX_CLAIM_LEASE,
+    OUTBOX_MAX_ATTEMPTS,
+    OUTBOX_RETENTION,
+    OUTBOX_RETRY_BACKOFF,
+)
+from custom_components.apple_store_notifier.outbox import NotificationOutbox
+from custom_components.apple_store_notifier.sms_dispatcher import SMSMessage
+
+SECOND = timedelta(seconds=1)
+
+
+class Clock:
+    """Controllable stand-in for datetime.now() inside the outbox module."""
+
+    now = datetime(2025, 1, 1, 12, 0, 0)
+
+    def advance(self, delta: timedelta):
+        Clock.now += delta
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return Clock.now
+
+    Clock.now = datetime(2025, 1, 1, 12, 0, 0)
+    monkeypatch.setattr(outbox_module, "datetime", FrozenDatetime)
+    return Clock()
+
+
+class Recorder:
+    """Metrics registry that remembers what it was told."""
+
+    def __init__(self):
+        self.counts = {}
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        self.counts[key] = self.counts.get(key, 0) + value
+
+    def observe(self, name, value):
+        pass
+
+    def outcome(self, outcome):
+        return self.counts.get(
+            ("apple_stock_notifications", (("outcome", outcome),)), 0
+        )
+
+
+@pytest.fixture
+def metrics():
+    return Recorder()
+
+
+@pytest.fixture
+def outbox(tmp_path, clock, metrics):
+    return NotificationOutbox(str(tmp_path / "outbox.db"), metrics)
+
+
+def messages(count):
+    return [SMSMessage("http://gw", f"message {i}") for i in range(count)]
+
+
+def row_count(outbox):
+    conn = sqlite3.connect(outbox.db_path)
+    count = conn.execute("SELECT COUNT(*) FROM notification_outbox").fetchone()[0]
+    conn.close()
+    return count
+
+
+def test_claims_due_messages_oldest_first(outbox):
+    assert outbox.enqueue(messages(3)) == 3
+
+    items = outbox.claim_due(limit=2)
+
+    assert [item[1].message for item in items] == ["message 0", "message 1"]
+
+
+def test_claimed_messages_are_leased(outbox, clock):
+    outbox.enqueue(messages(2))
+    claimed = outbox.claim_due()
+
+    # A second sender sees nothing until the lease runs out
+    other = NotificationOutbox(outbox.db_path)
+    assert other.claim_due() == []
+    assert outbox.seconds_until_due() == OUTBOX_CLAIM_LEASE.total_seconds()
+
+    clock.advance(OUTBOX_CLAIM_LEASE)
+    assert [item[0] for item in other.claim_due()] == [item[0] for item in claimed]
+
+
+def test_delivered_messages_are_not_claimed_again(outbox, clock, metrics):
+    outbox.enqueue(messages(1))
+    outbox.complete(outbox.claim_due(), [True])
+
+    clock.advance(OUTBOX_CLAIM_LEASE)
+    assert outbox.claim_due() == []
+    assert outbox.seconds_until_due() is None
+    assert metrics.outcome("sent") == 1
+
+
+def test_failed_messages_retry_with_exponential_backoff(outbox, clock, metrics):
+    outbox.enqueue(messages(1))
+    items = outbox.claim_due()
+
+    for backoff in (OUTBOX_RETRY_BACKOFF, OUTBOX_RETRY_BACKOFF * 2):
+        outbox.complete(items, [False])
+
+        clock.advance(backoff - SECOND)
+        assert outbox.claim_due() == []
+        clock.advance(SECOND)
+        items = outbox.claim_due()
+        assert len(items) == 1
+
+    assert metrics.outcome("retry") == 2
+
+
+def test_gives_up_after_the_last_attempt(outbox, clock, metrics):
+    outbox.enqueue(messages(1))
+
+    for _ in range(OUTBOX_MAX_ATTEMPTS):
+        items = outbox.claim_due()
+        assert len(items) == 1
+        outbox.complete(items, [False])
+        clock.advance(timedelta(hours=1))
+
+    assert outbox.claim_due() == []
+    assert metrics.outcome("failed") == 1
+
+
+def test_finished_messages_are_deleted_after_retention(outbox, clock):
+    outbox.enqueue(messages(1))
+    outbox.complete(outbox.claim_due(), [True])
+    assert row_count(outbox) == 1
+
+    clock.advance(OUTBOX_CLAIM_LEASE + OUTBOX_RETENTION + SECOND)
+    outbox.enqueue(messages(1))
+    outbox.complete(outbox.claim_due(), [True])
+
+    assert row_count(outbox) == 1
@@ -0,0 +1,72 @@
+"""Tests for FTS5 product search."""
+
+import pytest
+
+from dynamic_apple_monitor import DynamicAppleMonitor
+
+build_query = DynamicAppleMonitor._build_fts_query
+
+
+@pytest.mark.parametrize(
+    "term, query",
+    [
+        ("iPhone 17 Pro", '"iphone"* "17"* "pro"*'),
+        ('say "hi"', '"say"* "hi"*'),
+        ("MG7Q4LL/A", '"mg7q4ll"* "a"*'),
+        # FTS5 operators and syntax become plain terms
+        ("pro OR max", '"pro"* "or"* "max"*'),
+        ("NOT mini", '"not"* "mini"*'),
+        ("-air* (m4)", '"air"* "m4"*'),
+        ("product_code:R1", '"product_code"* "r1"*'),
+        ("", ""),
+        ("!!!", ""),
+    ],
+)
+def test_build_fts_query(term, query):
+    assert build_query(term) == query
+
+
+@pytest.fixture
+def monitor(tmp_path):
+    monitor = DynamicAppleMonitor(str(tmp_path / "products.db"))
+    if not monitor.fts_enabled:
+        pytest.skip("SQLite built without FTS5")
+
+    monitor._save_products_to_db(
+        [
+            {
+                "product_code": code,
+                "product_name": name,
+                "category": "iphone",
+                "price": None,
+                "url": None,
+                "discovered_date": None,
+            }
+            for code, name in (
+                ("MG7Q4LL/A", "iPhone 17 Pro 512GB Deep Blue"),
+                ("MG8A4LL/A", "iPhone 17 Pro Max 256GB Silver"),
+                ("MG9B4LL/A", "iPhone Air 256GB Sky Blue"),
+            )
+        ],
+        "iphone",
+    )
+    return monitor
+
+
+def names(products):
+    return [product["product_name"] for product in products]
+
+
+def test_every_term_must_match_a_prefix(monitor):
+    assert names(monitor.search_products("iph 17 pro max")) == [
+        "iPhone 17 Pro Max 256GB Silver"
+    ]
+
+
+def test_search_by_product_code(monitor):
+    assert names(monitor.search_products("MG9B4LL")) == ["iPhone Air 256GB Sky Blue"]
+
+
+@pytest.mark.parametrize("term", ['"', "blue OR", "NEAR(", "* AND -", ")"])
+def test_fts_syntax_in_search_terms_is_harmless(monitor, term):
+    monitor.search_products(term)
@@ -0,0 +1,100 @@
+"""Tests for the drift-free cycle scheduler."""
+
+import pytest
+
+from scheduler import OVERRUN_COMPRESS, OVERRUN_SKIP, CycleScheduler
+
+
+class FakeClock:
+    """Monotonic clock that only moves when told to, or when slept on."""
+
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.now += seconds
+
+
+def make_scheduler(overrun=OVERRUN_SKIP, interval=10.0, jitter=0.0):
+    clock = FakeClock()
+    scheduler = CycleScheduler(
+        interval, jitter, overrun, clock=clock, sleep=clock.sleep
+    )
+    return scheduler, clock
+
+
+def test_on_time_cycle_waits_for_the_next_deadline():
+    scheduler, clock = make_scheduler()
+    clock.now = 3.0
+
+    cycle = scheduler.next_cycle()
+
+    assert cycle.number == 2
+    assert cycle.deadline == 10.0
+    assert cycle.delay == pytest.approx(7.0)
+    assert cycle.slack == pytest.approx(7.0)
+    assert cycle.skipped == 0
+
+
+def test_skip_drops_missed_deadlines():
+    scheduler, clock = make_scheduler(OVERRUN_SKIP)
+    clock.now = 25.0
+
+    cycle = scheduler.next_cycle()
+
+    assert cycle.skipped == 2
+    assert cycle.deadline == 30.0
+    assert cycle.delay == pytest.approx(5.0)
+    assert cycle.slack == pytest.approx(-15.0)
+
+
+def test_compress_runs_the_latest_missed_deadline_now():
+    scheduler, clock = make_scheduler(OVERRUN_COMPRESS)
+    clock.now = 25.0
+
+    cycle = scheduler.next_cycle()
+
+    assert cycle.skipped == 1
+    assert cycle.deadline == 20.0
+    assert cycle.fire_at == 25.0
+    assert cycle.delay == 0.0
+
+
+def test_deadlines_do_not_drift_with_cycle_time():
+    scheduler, clock = make_scheduler()
+
+    for number in range(2, 6):
+        cycle = scheduler.next_cycle()
+        assert scheduler.wait(cycle)
+        assert clock.now == pytest.approx((number - 1) * 10.0)
+        # Work inside the slot does not push the next deadline back
+        clock.now += 4.0
+
+
+def test_jitter_stays_within_the_slot():
+    scheduler, clock = make_scheduler(interval=10.0, jitter=3.0)
+
+    for _ in range(20):
+        cycle = scheduler.next_cycle()
+        assert cycle.deadline <= cycle.fire_at <= cycle.deadline + 3.0
+
+
+def test_interrupted_wait_leaves_the_cycle_pending():
+    scheduler, clock = make_scheduler()
+    cycle = scheduler.next_cycle()
+
+    assert not scheduler.wait(cycle, interrupt=lambda: True, poll_interval=1.0)
+    assert clock.now == pytest.approx(1.0)
+    assert scheduler.next_cycle().number == cycle.number
+
+
+def test_reschedule_rejects_bad_settings():
+    scheduler, _ = make_scheduler()
+
+    with pytest.raises(ValueError):
+        scheduler.reschedule(0)
+    with pytest.raises(ValueError):
+        scheduler.reschedule(10.0, overrun="later")
@@ -0,0 +1,98 @@
+"""Tests for nearest-store and radius queries."""
+
+import pytest
+
+from custom_components.apple_store_notifier import zipcode_utils
+from custom_components.apple_store_notifier.zipcode_utils import StoreSpatialIndex
+
+STORES = [
+    {
+        "code": "R1",
+        "name": "Fifth Avenue",
+        "state": "NY",
+        "lat": 40.7637,
+        "lon": -73.9730,
+    },
+    {
+        "code": "R2",
+        "name": "Walnut Street",
+        "state": "PA",
+        "lat": 39.9500,
+        "lon": -75.1700,
+    },
+    {
+        "code": "R3",
+        "name": "The Grove",
+        "state": "CA",
+        "lat": 34.0722,
+        "lon": -118.3570,
+    },
+    {"code": "R4", "name": "No Location", "state": "TX", "lat": None, "lon": None},
+]
+
+MANHATTAN = (40.7128, -74.0060)
+LOS_ANGELES = (34.0522, -118.2437)
+
+
+@pytest.fixture(params=[True, False], ids=["numpy", "python"])
+def index(request, monkeypatch):
+    if request.param:
+        pytest.importorskip("numpy")
+    monkeypatch.setattr(zipcode_utils, "NUMPY_AVAILABLE", request.param)
+    return StoreSpatialIndex(STORES)
+
+
+def codes(matches):
+    return [match["code"] for match in matches]
+
+
+def test_stores_without_coordinates_are_left_out(index):
+    assert len(index) == 3
+
+
+def test_nearest_orders_by_distance_per_origin(index):
+    manhattan, los_angeles = index.nearest([MANHATTAN, LOS_ANGELES], k=2)
+
+    assert codes(manhattan) == ["R1", "R2"]
+    assert codes(los_angeles) == ["R3", "R2"]
+    assert manhattan[0]["distance"] == pytest.approx(4.0, abs=0.5)
+    assert manhattan[1]["distance"] == pytest.approx(81, abs=2)
+
+
+def test_nearest_respects_max_distance_and_store_codes(index):
+    (near,) = index.nearest([MANHATTAN], k=3, max_distance=100)
+    (restricted,) = index.nearest([MANHATTAN], k=3, store_codes=["R3"])
+
+    assert codes(near) == ["R1", "R2"]
+    assert codes(restricted) == ["R3"]
+
+
+def test_nearest_with_more_k_than_stores(index):
+    (matches,) = index.nearest([MANHATTAN], k=10)
+
+    assert codes(matches) == ["R1", "R2", "R3"]
+
+
+def test_within_returns_every_store_in_the_radius(index):
+    (matches,) = index.within([MANHATTAN], 100)
+    (none,) = index.within([MANHATTAN], 1)
+    (restricted,) = index.within([MANHATTAN], 100, store_codes=["R2"])
+
+    assert codes(matches) == ["R1", "R2"]
+    assert none == []
+    assert codes(restricted) == ["R2"]
+
+
+def test_empty_queries(index):
+    assert index.nearest([], k=1) == []
+    assert index.nearest([MANHATTAN], k=1, store_codes=[]) == [[]]
+    assert index.within([MANHATTAN], 100, store_codes=["R9"]) == [[]]
+
+
+def test_from_stores_data_keys_stores_by_name():
+    index = StoreSpatialIndex.from_stores_data(
+        {"Fifth Avenue": {"code": "R1", "state": "NY", "lat": 40.76, "lon": -73.97}}
+    )
+
+    (matches,) = index.nearest([MANHATTAN])
+    assert matches[0]["name"] == "Fifth Avenue"
@@ -0,0 +1,95 @@
+"""Tests for watchlist import and export."""
+
+import json
+
+import pytest
+
+from apple_monitor import AppleStockMonitor
+from watchlist_io import read_watchlist, write_watchlist
+
+PRODUCTS = [
+    {"product_code": "MX1/A", "product_name": "iPhone 17 Pro", "category": "iphone"},
+    {"product_code": "MX2/A", "product_name": "iPad Air", "category": "ipad"},
+]
+STORES = [
+    {"store_code": "R014", "store_name": "SoHo", "city": "New York", "state": "NY"},
+    {"store_code": "R090", "store_name": "Washington Square", "city": "", "state": ""},
+]
+
+
+@pytest.mark.parametrize("name", ["watchlist.csv", "watchlist.json"])
+def test_round_trip(tmp_path, name):
+    path = str(tmp_path / name)
+
+    write_watchlist(PRODUCTS, STORES, path)
+
+    assert read_watchlist(path) == (PRODUCTS, STORES)
+
+
+def test_reads_the_config_layout_and_numeric_values(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text(
+        json.dumps(
+            {
+                "products_to_monitor": [{"product_code": 123, "product_name": " A "}],
+                "stores_to_monitor": [{"store_code": "R1", "store_name": None}],
+            }
+        )
+    )
+
+    products, stores = read_watchlist(str(path))
+
+    assert products == [{"product_code": "123", "product_name": "A", "category": ""}]
+    assert stores == [{"store_code": "R1", "store_name": "", "city": "", "state": ""}]
+
+
+def test_csv_rows_without_a_code_are_skipped(tmp_path):
+    path = tmp_path / "watchlist.csv"
+    path.write_text("product_code,product_name,store_code\n,No code,\nMX1/A,Phone,\n")
+
+    products, stores = read_watchlist(str(path))
+
+    assert [product["product_code"] for product in products] == ["MX1/A"]
+    assert stores == []
+
+
+@pytest.fixture
+def monitor(tmp_path):
+    return AppleStockMonitor(str(tmp_path / "config.json"))
+
+
+def test_import_dedupes_by_code(monitor):
+    monitor.import_watchlist(PRODUCTS[:1], STORES[:1])
+
+    added = monitor.import_watchlist(PRODUCTS + PRODUCTS, STORES + STORES)
+
+    assert added == (1, 1)
+    assert [p["product_code"] for p in monitor.config["products_to_monitor"]] == [
+        "MX1/A",
+        "MX2/A",
+    ]
+    assert [s["store_code"] for s in monitor.config["stores_to_monitor"]] == [
+        "R014",
+        "R090",
+    ]
+
+
+def test_import_fills_in_missing_names_and_categories(monitor):
+    monitor.import_watchlist(
+        [{"product_code": "MX3/A", "product_name": "MacBook Air"}],
+        [{"store_code": "R191"}],
+    )
+
+    product = monitor.config["products_to_monitor"][0]
+    store = monitor.config["stores_to_monitor"][0]
+    assert product["category"] == "mac"
+    assert store["store_name"] == "R191"
+
+
+def test_import_is_saved_and_exports_back(monitor, tmp_path):
+    monitor.import_watchlist(PRODUCTS, STORES)
+    path = str(tmp_path / "export.json")
+
+    AppleStockMonitor(monitor.config_file).export_watchlist(path)
+
+    assert read_watchlist(path) == (PRODUCTS, STORES)
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Watchlist Import/Export - Read and write products and stores as CSV or JSON
+"""
+
+import csv
+import io
+import json
+import sys
+from typing import Dict, List, Tuple
+
+PRODUCT_FIELDS = ("product_code", "product_name", "category")
+STORE_FIELDS = ("store_code", "store_name", "city", "state")
+CSV_FIELDS = PRODUCT_FIELDS + STORE_FIELDS
+
+
+def read_watchlist(path: str = "-") -> Tuple[List[Dict], List[Dict]]:
+    """Read (products, stores) from a CSV or JSON file, or stdin for "-".
+
+    JSON is either the config.json layout or a list of entries; CSV has a
+    header row with any of the product and store columns. Either way an
+    entry is a product if it has a product_code and a store if it has a
+    store_code.
+    """
+    if path == "-":
+        text = sys.stdin.read()
+    else:
+        with open(path, "r", newline="") as f:
+            text = f.read()
+
+    if path.lower().endswith(".json") or text.lstrip()[:1] in ("[", "{"):
+        data = json.loads(text)
+        if isinstance(data, dict):
+            entries = data.get("products_to_monitor", []) + data.get(
+                "stores_to_monitor", []
+            )
+        else:
+            entries = data
+    else:
+        entries = list(csv.DictReader(io.StringIO(text)))
+
+    products = []
+    stores = []
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        if entry.get("product_code"):
+            products.append(_pick(entry, PRODUCT_FIELDS))
+        if entry.get("store_code"):
+            stores.append(_pick(entry, STORE_FIELDS))
+
+    return products, stores
+
+
+def write_watchlist(
+    products: List[Dict], stores: List[Dict], path: str = "-", fmt: str = None
+):
+    """Write products and stores as CSV or JSON to a file, or stdout for "-"."""
+    if fmt is None:
+        fmt = "csv" if path.lower().endswith(".csv") else "json"
+
+    out = sys.stdout if path == "-" else open(path, "w", newline="")
+    try:
+        if fmt == "csv":
+            writer = csv.DictWriter(out, fieldnames=CSV_FIELDS, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(products)
+            writer.writerows(stores)
+        else:
+            json.dump(
+                {"products_to_monitor": products, "stores_to_monitor": stores},
+                out,
+                indent=2,
+            )
+            out.write("\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+def _pick(entry: Dict, fields: Tuple[str, ...]) -> Dict:
+    """Return the entry's fields as strings, in order, with missing ones left empty.
+
+    JSON imports may carry numbers, e.g. a numeric store code.
+    """
+    return {field: str(entry.get(field) or "").strip() for field in fields}
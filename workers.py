@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Sharded Workers - Split a stock check across worker processes under one rate budget
+"""
+
+import json
+import multiprocessing
+import os
+import queue
+import socket
+import sqlite3
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from dynamic_apple_monitor import DynamicAppleMonitor
+from metrics import METRICS
+
+LEASE_SECONDS = 60  # shortest time a silent worker is presumed alive
+LEASE_REQUEST_INTERVALS = 3  # leases also outlast this many paced requests
+IDLE_POLL_SECONDS = 0.25  # how often an idle worker looks for expired leases
+
+# One pickup request covers every store near a location for a product, so a
+# query is (product_code, location) and carries the stores to read from it
+Query = Tuple[str, str, List[str]]
+
+# (product_code, store_code, availability result, stock_checks row)
+PairResult = Tuple[str, str, Dict, tuple]
+
+
+def build_query_plan(
+    product_codes: List[str], locations: Dict[str, List[str]]
+) -> List[Query]:
+    """Return one query per (product, location), each answering that location's stores.
+
+    locations maps a location, such as a covering seed from
+    StoreCatalogCrawler.seeds_covering(), to the stores its response includes.
+    """
+    return [
+        (product_code, location, list(store_codes))
+        for product_code in product_codes
+        for location, store_codes in locations.items()
+    ]
+
+
+def lease_seconds(request_interval: float) -> float:
+    """Return a lease long enough that pacing alone never lets it lapse."""
+    return max(LEASE_SECONDS, LEASE_REQUEST_INTERVALS * request_interval)
+
+
+def shard_plan(plan: List[Query], shard_count: int) -> List[List[Query]]:
+    """Deal queries round-robin into at most shard_count non-empty shards."""
+    shards = [plan[i::shard_count] for i in range(max(shard_count, 1))]
+    return [shard for shard in shards if shard]
+
+
+class ShardLeases:
+    """Shard ownership for one check cycle, kept in a local SQLite lease table.
+
+    A worker owns a shard while its lease is unexpired and renews it after
+    every request. A shard whose owner stops renewing is picked up by any
+    other worker once the lease runs out.
+    """
+
+    def __init__(self, db_path: str, lease_seconds: float = LEASE_SECONDS):
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self._init_database()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Every worker contends for the same rows, so wait out short locks
+        return sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+
+    def _init_database(self):
+        """Create the lease table."""
+        conn = self._connect()
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS worker_leases (
+                cycle_id TEXT NOT NULL,
+                shard_id INTEGER NOT NULL,
+                queries TEXT NOT NULL,
+                owner TEXT,
+                lease_expires REAL DEFAULT 0,
+                done BOOLEAN DEFAULT 0,
+                PRIMARY KEY (cycle_id, shard_id)
+            )
+        """
+        )
+        conn.close()
+
+    def publish(self, cycle_id: str, shards: List[List[Query]]):
+        """Register a cycle's shards, replacing leases left by older cycles."""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DELETE FROM worker_leases")
+        conn.executemany(
+            """
+            INSERT INTO worker_leases (cycle_id, shard_id, queries)
+            VALUES (?, ?, ?)
+        """,
+            [(cycle_id, i, json.dumps(shard)) for i, shard in enumerate(shards)],
+        )
+        conn.execute("COMMIT")
+        conn.close()
+
+    def claim(self, cycle_id: str, owner: str) -> Tuple[int, List[Query]]:
+        """Take an unowned or expired shard; returns (-1, []) if none is free."""
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                """
+                SELECT shard_id, queries FROM worker_leases
+                WHERE cycle_id = ? AND done = 0 AND lease_expires < ?
+                ORDER BY shard_id LIMIT 1
+            """,
+                (cycle_id, now),
+            ).fetchone()
+
+            if row is None:
+                conn.execute("COMMIT")
+                return -1, []
+
+            conn.execute(
+                """
+                UPDATE worker_leases SET owner = ?, lease_expires = ?
+                WHERE cycle_id = ? AND shard_id = ?
+            """,
+                (owner, now + self.lease_seconds, cycle_id, row[0]),
+            )
+            conn.execute("COMMIT")
+            return row[0], [tuple(query) for query in json.loads(row[1])]
+        finally:
+            conn.close()
+
+    def renew(self, cycle_id: str, shard_id: int, owner: str) -> bool:
+        """Extend a held lease; False if another worker has taken the shard."""
+        conn = self._connect()
+        cursor = conn.execute(
+            """
+            UPDATE worker_leases SET lease_expires = ?
+            WHERE cycle_id = ? AND shard_id = ? AND owner = ? AND done = 0
+        """,
+            (time.time() + self.lease_seconds, cycle_id, shard_id, owner),
+        )
+        conn.close()
+        return cursor.rowcount == 1
+
+    def finish(self, cycle_id: str, shard_id: int):
+        """Mark a shard done so no other worker picks it up."""
+        conn = self._connect()
+        conn.execute(
+            "UPDATE worker_leases SET done = 1 WHERE cycle_id = ? AND shard_id = ?",
+            (cycle_id, shard_id),
+        )
+        conn.close()
+
+    def pending(self, cycle_id: str) -> int:
+        """Return how many of a cycle's shards are not done yet."""
+        conn = self._connect()
+        count = conn.execute(
+            "SELECT COUNT(*) FROM worker_leases WHERE cycle_id = ? AND done = 0",
+            (cycle_id,),
+        ).fetchone()[0]
+        conn.close()
+        return count
+
+
+def run_worker(
+    db_path: str, cycle_id: str, results: multiprocessing.Queue, request_interval: float
+):
+    """Fetch shards until the cycle has none left, sending results to the writer.
+
+    Workers never write stock data themselves; each finished shard goes to
+    the coordinator's queue as one message. request_interval is this
+    worker's share of the global rate budget.
+    """
+    owner = f"{socket.gethostname()}:{os.getpid()}"
+    leases = ShardLeases(db_path, lease_seconds(request_interval))
+    monitor = DynamicAppleMonitor(db_path)
+    next_request = 0.0
+
+    while True:
+        shard_id, queries = leases.claim(cycle_id, owner)
+        if shard_id < 0:
+            if not leases.pending(cycle_id):
+                return
+            # Another worker holds the rest; wait in case its lease lapses
+            time.sleep(IDLE_POLL_SECONDS)
+            continue
+
+        shard_results: List[PairResult] = []
+        for product_code, location, store_codes in queries:
+            delay = next_request - time.monotonic()
+            if delay > 0:
+                # Waiting our turn is not silence; keep the shard through it
+                if not leases.renew(cycle_id, shard_id, owner):
+                    shard_results = None
+                    break
+                time.sleep(delay)
+            next_request = time.monotonic() + request_interval
+
+            shard_results.extend(
+                fetch_query(monitor, product_code, location, store_codes)
+            )
+            if not leases.renew(cycle_id, shard_id, owner):
+                # Our lease lapsed and the shard was reassigned
+                shard_results = None
+                break
+
+        if shard_results is not None:
+            results.put((shard_id, shard_results))
+            leases.finish(cycle_id, shard_id)
+
+
+def fetch_query(
+    monitor: DynamicAppleMonitor,
+    product_code: str,
+    location: str,
+    store_codes: List[str],
+) -> List[PairResult]:
+    """Run one pickup request and read every requested store from it."""
+    timestamp = datetime.now().isoformat()
+    try:
+        params = dict(monitor.pickup_params(product_code), location=location)
+        response = monitor._get("pickup", monitor.PICKUP_URL, params=params, timeout=30)
+        response.raise_for_status()
+        data = response.json()
+    except Exception as e:
+        return [
+            (
+                product_code,
+                store_code,
+                {
+                    "available": False,
+                    "status": "error",
+                    "error": str(e),
+                    "store_code": store_code,
+                    "product_code": product_code,
+                    "timestamp": timestamp,
+                },
+                None,
+            )
+            for store_code in store_codes
+        ]
+
+    raw_response = json.dumps(data)
+    pair_results = []
+    for store_code in store_codes:
+        result = monitor.parse_availability(data, product_code, store_code)
+        row = None
+        if result["status"] != "not_found":
+            row = (
+                result["timestamp"],
+                store_code,
+                product_code,
+                result["available"],
+                result["status"],
+                raw_response,
+            )
+        pair_results.append((product_code, store_code, result, row))
+
+    return pair_results
+
+
+class ShardedChecker:
+    """Coordinator that shards a check across worker processes.
+
+    The coordinator publishes the shards, starts the workers and is the
+    only process that writes stock results, in one batch per shard.
+    """
+
+    def __init__(
+        self,
+        monitor: DynamicAppleMonitor,
+        workers: int,
+        requests_per_second: float = 1.0,
+        progress: Callable[[str], None] = print,
+    ):
+        self.monitor = monitor
+        self.progress = progress
+        self.workers = max(workers, 1)
+        self.requests_per_second = requests_per_second
+        # Each worker gets an equal slice of the global request budget
+        self.request_interval = self.workers / requests_per_second
+        self.leases = ShardLeases(monitor.db_path, lease_seconds(self.request_interval))
+
+    def check(
+        self, plan: List[Query], deadline: Optional[float] = None
+    ) -> Iterator[Tuple[str, str, Dict]]:
+        """Yield (product_code, store_code, result) as shards complete.
+
+        deadline is a time.monotonic() value; shards still outstanding then
+        are abandoned and their workers stopped.
+        """
+        # More shards than workers lets a fast worker take over a slow one's share
+        shards = shard_plan(plan, self.workers * 4)
+        if not shards:
+            return
+
+        cycle_id = datetime.now().isoformat()
+        self.leases.publish(cycle_id, shards)
+
+        results = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(
+                target=run_worker,
+                args=(self.monitor.db_path, cycle_id, results, self.request_interval),
+                daemon=True,
+            )
+            for _ in range(min(self.workers, len(shards)))
+        ]
+        for process in processes:
+            process.start()
+
+        received = set()
+        try:
+            while len(received) < len(shards):
+                if deadline is not None and time.monotonic() >= deadline:
+                    self.progress(
+                        f"⏱️  Cycle deadline reached with "
+                        f"{len(shards) - len(received)} shards outstanding"
+                    )
+                    for process in processes:
+                        process.terminate()
+                    return
+
+                try:
+                    shard_id, shard_results = results.get(timeout=IDLE_POLL_SECONDS)
+                except queue.Empty:
+                    if not any(process.is_alive() for process in processes):
+                        self.progress(
+                            f"❌ All workers exited with "
+                            f"{len(shards) - len(received)} shards unchecked"
+                        )
+                        return
+                    continue
+
+                # A shard can arrive twice if a slow worker lost its lease
+                if shard_id in received:
+                    continue
+                received.add(shard_id)
+
+                self.monitor.save_stock_checks(
+                    [row for _, _, _, row in shard_results if row is not None]
+                )
+                for product_code, store_code, result, _ in shard_results:
+                    if result["status"] == "error":
+                        METRICS.inc("apple_stock_check_errors")
+                    yield product_code, store_code, result
+        finally:
+            for process in processes:
+                process.join(timeout=self.leases.lease_seconds)
+                if process.is_alive():
+                    process.terminate()